@@ -5,6 +5,7 @@ import secrets
 import base64
 import hashlib
 import re
+from urllib.parse import quote
 
 # Using the system's jwt library instead of requiring external pyjwt
 # since we're using uv for dependency management
@@ -188,9 +189,13 @@ PROJECT_NAME={env_vars.get('PROJECT_NAME', 'TheSuperProject').strip('"')}
 SUPABASE_URL={supabase_url}
 SUPABASE_ANON_KEY={anon_key}
 SUPABASE_SERVICE_KEY={service_role_key}
+SUPABASE_JWT_SECRET={jwt_secret}
 API_PREFIX={env_vars.get('API_PREFIX', '/api/v1')}
 API_PORT={env_vars.get('API_PORT', '8000')}
 CORS_ORIGINS={cors_origins}
+
+# Direct Postgres reads through the Supavisor transaction pooler (enable with PROFILE_READ_BACKEND=postgres)
+DATABASE_URL=postgresql://postgres.{env_vars.get('POOLER_TENANT_ID', 'your-tenant-id')}:{quote(env_vars.get('PASSWORD_POSTGRES', 'passwordpostgres').strip('"'), safe='')}@localhost:{env_vars.get('POOLER_PROXY_PORT_TRANSACTION', '6543')}/postgres
 """
     
     # Add OAuth secrets (backend only)
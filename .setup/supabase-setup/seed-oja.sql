@@ -12,13 +12,36 @@ $$;
 create table if not exists public.user_profiles (
     id uuid primary key references auth.users (id) on delete cascade,
     username text unique,
+    first_name text,
+    last_name text,
     full_name text,
     email text unique,
     phone text,
     role user_role not null default 'user',
-    created_at timestamptz not null default now()
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
 );
 
+-- Colonnes ajoutées après la première version de la table
+alter table public.user_profiles
+    add column if not exists first_name text,
+    add column if not exists last_name text,
+    add column if not exists updated_at timestamptz not null default now();
+
+-- Trigger pour mettre à jour updated_at automatiquement
+create or replace function public.update_updated_at_column()
+returns trigger as $$
+begin
+    new.updated_at = timezone('utc'::text, now());
+    return new;
+end;
+$$ language plpgsql;
+
+drop trigger if exists update_user_profiles_updated_at on public.user_profiles;
+create trigger update_user_profiles_updated_at
+    before update on public.user_profiles
+    for each row execute function public.update_updated_at_column();
+
 -- 3. Trigger pour auto-créer le profil à chaque nouvel utilisateur
 create or replace function public.handle_new_user()
 returns trigger as $$
@@ -40,10 +63,12 @@ begin
     end if;
 
     -- Insertion dans la table user_profiles
-    insert into public.user_profiles (id, username, full_name, email, phone)
+    insert into public.user_profiles (id, username, first_name, last_name, full_name, email, phone)
     values (
         new.id,
         new.email,  -- username = email par défaut
+        v_first_name,
+        v_last_name,
         v_full_name,
         new.email,
         v_phone
@@ -66,4 +91,99 @@ BEGIN
   AFTER INSERT ON auth.users
   FOR EACH ROW EXECUTE FUNCTION public.handle_new_user();
 END
-$$;
\ No newline at end of file
+$$;
+
+-- 5. Recherche indexée d'un utilisateur par email (connexion OAuth)
+-- S'appuie sur l'index unique partiel users_email_partial_key de GoTrue
+create or replace function public.get_user_id_by_email(p_email text)
+returns uuid as $$
+    select id
+    from auth.users
+    where email = lower(p_email)
+      and is_sso_user = false
+    limit 1;
+$$ language sql stable security definer
+   set search_path = public, auth;
+
+-- Réservée au backend (clé de service)
+revoke execute on function public.get_user_id_by_email(text) from public, anon, authenticated;
+grant execute on function public.get_user_id_by_email(text) to service_role;
+
+
+-- 6. Mise à jour d'un profil en un seul aller-retour
+-- full_name est reconstruit côté base quand seuls first_name / last_name changent
+create or replace function public.update_user_profile(
+    p_id uuid,
+    p_first_name text default null,
+    p_last_name text default null,
+    p_full_name text default null,
+    p_phone text default null
+)
+returns setof public.user_profiles as $$
+    update public.user_profiles
+    set first_name = coalesce(p_first_name, first_name),
+        last_name  = coalesce(p_last_name, last_name),
+        full_name  = case
+            when p_full_name is not null then p_full_name
+            when p_first_name is not null or p_last_name is not null then
+                trim(concat_ws(' ', coalesce(p_first_name, first_name), coalesce(p_last_name, last_name)))
+            else full_name
+        end,
+        phone      = coalesce(p_phone, phone)
+    where id = p_id
+    returning *;
+$$ language sql volatile security definer
+   set search_path = public;
+
+revoke execute on function public.update_user_profile(uuid, text, text, text, text) from public, anon, authenticated;
+grant execute on function public.update_user_profile(uuid, text, text, text, text) to service_role;
+
+
+-- 7. Export des utilisateurs par pagination keyset sur (created_at, id)
+create index if not exists users_created_at_id_idx on auth.users (created_at, id);
+
+create or replace function public.export_users(
+    p_after_created_at timestamptz default null,
+    p_after_id uuid default null,
+    p_limit integer default 1000
+)
+returns table (
+    id uuid,
+    email text,
+    phone text,
+    created_at timestamptz,
+    last_sign_in_at timestamptz,
+    email_confirmed_at timestamptz,
+    user_metadata jsonb,
+    profile jsonb
+) as $$
+    select
+        u.id,
+        u.email::text,
+        u.phone::text,
+        u.created_at,
+        u.last_sign_in_at,
+        u.email_confirmed_at,
+        u.raw_user_meta_data,
+        to_jsonb(p) - 'id'
+    from auth.users u
+    left join public.user_profiles p on p.id = u.id
+    -- Un seul prédicat de ligne, sans OR : la fonction (security definer) n'est jamais
+    -- inlinée et son plan générique doit garder une Index Cond sur users_created_at_id_idx
+    -- pour chaque page, sinon chaque page reparcourt l'index depuis le début
+    where (u.created_at, u.id) > (
+        coalesce(p_after_created_at, '-infinity'::timestamptz),
+        coalesce(p_after_id, '00000000-0000-0000-0000-000000000000'::uuid)
+    )
+    order by u.created_at, u.id
+    limit least(greatest(p_limit, 1), 5000);
+$$ language sql stable security definer
+   set search_path = public, auth;
+
+revoke execute on function public.export_users(timestamptz, uuid, integer) from public, anon, authenticated;
+grant execute on function public.export_users(timestamptz, uuid, integer) to service_role;
+
+
+-- 8. Index couvrant pour la vérification du rôle (require_admin) : index-only scan
+-- Index déclarés dans backend/api/schemas (python -m api.schemas check / diff)
+create index if not exists user_profiles_id_role_idx on public.user_profiles (id) include (role);
@@ -1,11 +1,73 @@
 """
 Application FastAPI principale
 """
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from api.config import settings
-from api.views import auth_router, user_router, base_router
+from api.helpers import (
+    clients,
+    token_verifier,
+    readiness_probe,
+    cache_invalidations,
+    postgres_reader,
+    FastJSONResponse,
+    has_native_json_serialization,
+    MetricsMiddleware,
+    track_in_progress,
+    UpstreamUnavailable
+)
+from api.openapi import load_prebuilt_schema
+from api.views import auth_router, user_router, base_router, admin_router
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_up_clients() -> None:
+    """Importe le SDK Supabase et crée les clients sans bloquer le démarrage du worker"""
+    try:
+        await asyncio.to_thread(clients.open)
+    except Exception as e:
+        # Les clients seront de nouveau ouverts à la première utilisation
+        logger.warning("Supabase clients warm-up failed: %s", e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Cycle de vie de l'application : ouvre les clients Supabase partagés (en
+    tâche de fond), le rafraîchissement du JWKS, les sondes de disponibilité et
+    la réception des invalidations du cache partagé et le pool Postgres direct
+    au démarrage du worker, les ferme à l'arrêt
+    """
+    warm_up = asyncio.create_task(_warm_up_clients())
+    token_verifier.start()
+    readiness_probe.start()
+    cache_invalidations.start()
+    postgres_reader.start()
+    try:
+        yield
+    finally:
+        await postgres_reader.stop()
+        await cache_invalidations.stop()
+        await readiness_probe.stop()
+        await token_verifier.stop()
+        await warm_up
+        clients.close()
+
+
+async def upstream_unavailable_handler(request: Request, exc: UpstreamUnavailable) -> JSONResponse:
+    """Échec rapide quand une dépendance Supabase est coupée ou trop lente"""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 
 def create_app() -> FastAPI:
@@ -18,11 +80,23 @@ def create_app() -> FastAPI:
     # Valider les variables d'environnement
     settings.validate_env_vars()
     
+    # Sérialisation JSON rapide (orjson), sauf si FastAPI sérialise déjà
+    # les réponses directement via pydantic-core
+    app_options = {}
+    if not has_native_json_serialization():
+        app_options["default_response_class"] = FastJSONResponse
+    
+    # Suivi des requêtes en cours par route (complète MetricsMiddleware)
+    if settings.METRICS_ENABLED:
+        app_options["dependencies"] = [Depends(track_in_progress)]
+    
     # Créer l'instance FastAPI
     app = FastAPI(
         title=f"{settings.PROJECT_NAME} API",
         description=settings.DESCRIPTION,
-        version=settings.VERSION
+        version=settings.VERSION,
+        lifespan=lifespan,
+        **app_options
     )
     
     # Ajouter le middleware CORS
@@ -35,10 +109,22 @@ def create_app() -> FastAPI:
         expose_headers=["Access-Control-Allow-Origin"]
     )
     
+    # Ajouter le middleware de métriques (latence et volume par gabarit de route)
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+    
+    # Dépendance amont indisponible : 503 + Retry-After
+    app.add_exception_handler(UpstreamUnavailable, upstream_unavailable_handler)
+    
     # Enregistrer les routeurs
     app.include_router(base_router)
     app.include_router(auth_router)
     app.include_router(user_router)
+    app.include_router(admin_router)
+    
+    # Schéma OpenAPI pré-généré au build (évite de le reconstruire dans chaque worker)
+    if settings.OPENAPI_SCHEMA_PATH:
+        load_prebuilt_schema(app, settings.OPENAPI_SCHEMA_PATH)
     
     return app
 
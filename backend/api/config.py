@@ -24,11 +24,109 @@ class Settings:
     # Configuration CORS
     CORS_ORIGINS: List[str] = (os.getenv("CORS_ORIGINS", "http://localhost:3000")).split(",")
     
+    # Sondes de disponibilité (/ready) : intervalle, délai d'une sonde, âge maximal d'un résultat
+    READINESS_PROBE_INTERVAL: float = float(os.getenv("READINESS_PROBE_INTERVAL", "5"))
+    READINESS_PROBE_TIMEOUT: float = float(os.getenv("READINESS_PROBE_TIMEOUT", "2"))
+    READINESS_STALE_AFTER: float = float(os.getenv("READINESS_STALE_AFTER", str(3 * READINESS_PROBE_INTERVAL)))
+    
+    # Schéma OpenAPI pré-généré (python -m api.openapi openapi.json), chargé au démarrage
+    OPENAPI_SCHEMA_PATH: str = os.getenv("OPENAPI_SCHEMA_PATH", "")
+    
+    # Métriques Prometheus (/metrics)
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    
     # Configuration Supabase
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_ANON_KEY: str = os.getenv("SUPABASE_ANON_KEY", "")
     SUPABASE_SERVICE_KEY: str = os.getenv("SUPABASE_SERVICE_KEY", "")
     
+    # Pool de connexions HTTP vers Supabase (partagé par worker)
+    SUPABASE_POOL_MAX_CONNECTIONS: int = int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", "100"))
+    SUPABASE_POOL_MAX_KEEPALIVE: int = int(os.getenv("SUPABASE_POOL_MAX_KEEPALIVE", "20"))
+    SUPABASE_POOL_KEEPALIVE_EXPIRY: float = float(os.getenv("SUPABASE_POOL_KEEPALIVE_EXPIRY", "30"))
+    SUPABASE_HTTP_TIMEOUT: float = float(os.getenv("SUPABASE_HTTP_TIMEOUT", "10"))
+    # Appels bloquants du SDK exécutés simultanément par worker (pool de threads)
+    SUPABASE_MAX_CONCURRENCY: int = int(os.getenv("SUPABASE_MAX_CONCURRENCY", "40"))
+    # Cloisonnement par dépendance : appels simultanés et délai maximal (attente comprise)
+    AUTH_MAX_CONCURRENCY: int = int(os.getenv("AUTH_MAX_CONCURRENCY", str(SUPABASE_MAX_CONCURRENCY)))
+    POSTGREST_MAX_CONCURRENCY: int = int(os.getenv("POSTGREST_MAX_CONCURRENCY", str(SUPABASE_MAX_CONCURRENCY)))
+    AUTH_TIMEOUT: float = float(os.getenv("AUTH_TIMEOUT", "5"))
+    POSTGREST_TIMEOUT: float = float(os.getenv("POSTGREST_TIMEOUT", "5"))
+    
+    # Lectures de user_profiles : "postgrest" (HTTP via Kong) ou "postgres" (connexion
+    # directe au pooler Supavisor, POOLER_PROXY_PORT_TRANSACTION ; extra optionnel "postgres")
+    PROFILE_READ_BACKEND: str = os.getenv("PROFILE_READ_BACKEND", "postgrest").lower()
+    # Ex : postgresql://postgres.<POOLER_TENANT_ID>:<mot de passe>@localhost:6543/postgres
+    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    DATABASE_POOL_MIN_SIZE: int = int(os.getenv("DATABASE_POOL_MIN_SIZE", "1"))
+    DATABASE_POOL_MAX_SIZE: int = int(os.getenv("DATABASE_POOL_MAX_SIZE", "10"))
+    # Requêtes préparées gardées par connexion (0 si le pooler ne les supporte pas en mode transaction)
+    DATABASE_STATEMENT_CACHE_SIZE: int = int(os.getenv("DATABASE_STATEMENT_CACHE_SIZE", "100"))
+    # Délai maximal d'une lecture directe, attente d'une connexion comprise
+    DATABASE_TIMEOUT: float = float(os.getenv("DATABASE_TIMEOUT", "2"))
+    
+    # Disjoncteur par dépendance (ouvert quand le taux d'échec de la fenêtre dépasse le seuil)
+    BREAKER_FAILURE_RATE: float = float(os.getenv("BREAKER_FAILURE_RATE", "0.5"))
+    BREAKER_MIN_CALLS: int = int(os.getenv("BREAKER_MIN_CALLS", "20"))
+    BREAKER_WINDOW: float = float(os.getenv("BREAKER_WINDOW", "30"))
+    BREAKER_RESET_TIMEOUT: float = float(os.getenv("BREAKER_RESET_TIMEOUT", "15"))
+    
+    # Niveau de cache partagé entre les workers : "local" (aucun), "shm" (SQLite
+    # en mémoire partagée, même hôte) ou "redis" (extra optionnel "redis")
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "local").lower()
+    # Fichier de la base partagée (par défaut dans un répertoire privé de /dev/shm,
+    # api-cache-<uid>-<déploiement>/cache.sqlite3) ; son répertoire doit être privé
+    CACHE_SHARED_PATH: str = os.getenv("CACHE_SHARED_PATH", "")
+    CACHE_REDIS_URL: str = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    CACHE_REDIS_CHANNEL: str = os.getenv("CACHE_REDIS_CHANNEL", "api-cache-invalidations")
+    CACHE_REDIS_TIMEOUT: float = float(os.getenv("CACHE_REDIS_TIMEOUT", "0.05"))
+    # Durée de vie maximale d'une entrée dans le niveau local quand un niveau partagé est actif
+    CACHE_LOCAL_TTL: float = float(os.getenv("CACHE_LOCAL_TTL", "5"))
+    # Intervalle de lecture des invalidations diffusées par les autres workers
+    CACHE_INVALIDATION_POLL_INTERVAL: float = float(os.getenv("CACHE_INVALIDATION_POLL_INTERVAL", "0.2"))
+    # Niveau partagé ignoré pendant ce délai après une erreur (secondes)
+    CACHE_SHARED_RETRY_AFTER: float = float(os.getenv("CACHE_SHARED_RETRY_AFTER", "5"))
+    
+    # Cache des tokens vérifiés par GoTrue (auth.get_user) en mode "local" (clé de signature
+    # inconnue), TTL borné par l'expiration du token ; jamais utilisé en mode "strict"
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_TTL: float = float(os.getenv("TOKEN_CACHE_TTL", "30"))
+    
+    # Cache de résolution email -> id utilisateur (connexion OAuth)
+    EMAIL_LOOKUP_CACHE_SIZE: int = int(os.getenv("EMAIL_LOOKUP_CACHE_SIZE", "10000"))
+    EMAIL_LOOKUP_CACHE_TTL: float = float(os.getenv("EMAIL_LOOKUP_CACHE_TTL", "300"))
+    
+    # Cache des profils utilisateur (GET /user/profile)
+    PROFILE_CACHE_SIZE: int = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+    PROFILE_CACHE_TTL: float = float(os.getenv("PROFILE_CACHE_TTL", "60"))
+    # Nombre maximum d'ids par appel à GET /user/profiles
+    PROFILE_BATCH_MAX_SIZE: int = int(os.getenv("PROFILE_BATCH_MAX_SIZE", "100"))
+    # Regroupement des lectures unitaires de user_profiles (fenêtre en secondes, 0 pour désactiver)
+    PROFILE_LOADER_WINDOW: float = float(os.getenv("PROFILE_LOADER_WINDOW", "0.002"))
+    PROFILE_LOADER_MAX_BATCH: int = int(os.getenv("PROFILE_LOADER_MAX_BATCH", "100"))
+    
+    # Export des utilisateurs (taille d'une page keyset)
+    EXPORT_PAGE_SIZE: int = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))
+    
+    # Import des utilisateurs
+    IMPORT_CONCURRENCY: int = int(os.getenv("IMPORT_CONCURRENCY", "8"))
+    IMPORT_BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+    # Taille du fichier importé gardée en mémoire avant de basculer sur disque (octets)
+    IMPORT_SPOOL_MAX_SIZE: int = int(os.getenv("IMPORT_SPOOL_MAX_SIZE", str(10 * 1024 * 1024)))
+    # Taille maximale du fichier importé (octets), 413 au-delà
+    IMPORT_MAX_SIZE: int = int(os.getenv("IMPORT_MAX_SIZE", str(100 * 1024 * 1024)))
+    
+    # Vérification des tokens JWT
+    # "local" : signature/exp/aud/role vérifiés localement, appel GoTrue seulement si la clé est inconnue
+    # "strict" : chaque token est validé par GoTrue (auth.get_user)
+    AUTH_VERIFY_MODE: str = os.getenv("AUTH_VERIFY_MODE", "local").lower()
+    SUPABASE_JWT_SECRET: str = os.getenv("SUPABASE_JWT_SECRET", "")
+    AUTH_JWT_AUDIENCE: str = os.getenv("AUTH_JWT_AUDIENCE", "authenticated")
+    AUTH_ALLOWED_ROLES: List[str] = (os.getenv("AUTH_ALLOWED_ROLES", "authenticated")).split(",")
+    AUTH_JWT_LEEWAY: float = float(os.getenv("AUTH_JWT_LEEWAY", "10"))
+    # Intervalle de rafraîchissement du JWKS en secondes (0 pour désactiver)
+    AUTH_JWKS_REFRESH_INTERVAL: float = float(os.getenv("AUTH_JWKS_REFRESH_INTERVAL", "600"))
+    
     # Validation des variables d'environnement critiques
     def validate_env_vars(self) -> None:
         """Valide que toutes les variables d'environnement critiques sont définies"""
@@ -44,6 +142,24 @@ class Settings:
             raise ValueError(
                 f"Variables d'environnement manquantes : {', '.join(missing_vars)}"
             )
+        
+        if self.CACHE_BACKEND not in ("local", "shm", "redis"):
+            raise ValueError(
+                f"CACHE_BACKEND invalide : {self.CACHE_BACKEND} (attendu : local, shm ou redis)"
+            )
+        
+        if self.PROFILE_READ_BACKEND not in ("postgrest", "postgres"):
+            raise ValueError(
+                f"PROFILE_READ_BACKEND invalide : {self.PROFILE_READ_BACKEND} (attendu : postgrest ou postgres)"
+            )
+        
+        if self.PROFILE_READ_BACKEND == "postgres" and not self.DATABASE_URL:
+            raise ValueError("DATABASE_URL est requise avec PROFILE_READ_BACKEND=postgres")
+        
+        if self.AUTH_VERIFY_MODE not in ("local", "strict"):
+            raise ValueError(
+                f"AUTH_VERIFY_MODE invalide : {self.AUTH_VERIFY_MODE} (attendu : local ou strict)"
+            )
 
 
 # Instance globale des paramètres
@@ -1,12 +1,89 @@
 # API helpers package
-from .auth import security, get_supabase_client, get_supabase_service_client, verify_token
+from .auth import security, get_supabase_client, get_supabase_service_client, get_supabase_session_client, verify_token, require_admin, has_admin_role, refresh_session, token_lookups, refresh_lookups, token_cache
+from .clients import SupabaseClientRegistry, clients
+from .tokens import TokenVerifier, token_verifier
+from .resilience import UpstreamUnavailable, CircuitBreaker, breakers, is_upstream_failure
+from .upstream import run_upstream, run_auth, run_postgrest
+from .database import PostgresReader, postgres_reader
+from .repositories import UserProfileRepository, user_profiles, model_columns
+from .probes import ReadinessProbe, readiness_probe
+from .lifecycle import reset_after_fork, preload_in_master
+from .cache import TTLCache, TieredCache, CacheInvalidationListener, cache_invalidations
+from .cache_backends import SharedCacheBackend, SqliteSharedBackend, RedisBackend, shared_backend
+from .singleflight import SingleFlight
+from .loader import BatchLoader
+from .users import find_user_id_by_email, normalize_email, email_lookup_cache, email_lookups
+from .profiles import CachedProfile, profile_cache, public_profile_cache, profile_lookups, profile_loader, load_profile_row, cache_profile, build_profile_data, build_user_profile, get_own_profile, get_profiles_by_ids, get_public_profiles_by_ids
+from .responses import FastJSONResponse, has_native_json_serialization, make_etag, etag_matches
+from .metrics import MetricsMiddleware, track_in_progress, render_metrics, observe_upstream
 from .utils import generate_random_password, construct_full_name, extract_oauth_user_info
 
 __all__ = [
     "security",
     "get_supabase_client",
     "get_supabase_service_client", 
+    "get_supabase_session_client",
+    "SupabaseClientRegistry",
+    "clients",
+    "TokenVerifier",
+    "token_verifier",
+    "UpstreamUnavailable",
+    "CircuitBreaker",
+    "breakers",
+    "is_upstream_failure",
+    "run_upstream",
+    "run_auth",
+    "run_postgrest",
+    "PostgresReader",
+    "postgres_reader",
+    "UserProfileRepository",
+    "user_profiles",
+    "model_columns",
+    "ReadinessProbe",
+    "readiness_probe",
+    "reset_after_fork",
+    "preload_in_master",
+    "TTLCache",
+    "TieredCache",
+    "CacheInvalidationListener",
+    "cache_invalidations",
+    "SharedCacheBackend",
+    "SqliteSharedBackend",
+    "RedisBackend",
+    "shared_backend",
+    "token_cache",
+    "SingleFlight",
+    "token_lookups",
+    "refresh_lookups",
+    "email_lookups",
+    "profile_lookups",
+    "BatchLoader",
+    "profile_loader",
+    "load_profile_row",
+    "find_user_id_by_email",
+    "normalize_email",
+    "email_lookup_cache",
+    "CachedProfile",
+    "profile_cache",
+    "public_profile_cache",
+    "cache_profile",
+    "build_profile_data",
+    "build_user_profile",
+    "get_own_profile",
+    "get_profiles_by_ids",
+    "get_public_profiles_by_ids",
     "verify_token",
+    "require_admin",
+    "has_admin_role",
+    "refresh_session",
+    "FastJSONResponse",
+    "has_native_json_serialization",
+    "make_etag",
+    "etag_matches",
+    "MetricsMiddleware",
+    "track_in_progress",
+    "render_metrics",
+    "observe_upstream",
     "generate_random_password",
     "construct_full_name",
     "extract_oauth_user_info"
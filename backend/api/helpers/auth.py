@@ -1,43 +1,180 @@
 """
 Helpers pour l'authentification Supabase
 """
+import hashlib
+import time
+from typing import TYPE_CHECKING, Optional
+
+import jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from supabase import create_client, Client
 from api.config import settings
+from api.models import AuthenticatedUser, UserRole
+from api.helpers.cache import TieredCache
+from api.helpers.cache_backends import shared_backend
+from api.helpers.clients import clients
+from api.helpers.repositories import user_profiles
+from api.helpers.singleflight import SingleFlight
+from api.helpers.tokens import token_verifier
+from api.helpers.resilience import UpstreamUnavailable, is_upstream_failure
+from api.helpers.upstream import run_auth
+
+if TYPE_CHECKING:
+    from supabase import Client, SupabaseAuthClient
+    from supabase_auth.types import AuthResponse
 
 # Configuration de sécurité
 security = HTTPBearer()
 
+# Rôles applicatifs (user_profiles.role) autorisés sur les routes d'administration
+ADMIN_ROLES = ("admin", "superadmin")
+
+# Vérifications distantes en vol, par token (requêtes parallèles d'une même page)
+token_lookups = SingleFlight("auth.get_user")
+
+# Renouvellements de session en vol, par refresh token : les onglets d'un même
+# navigateur qui renouvellent ensemble reçoivent la même nouvelle session
+refresh_lookups = SingleFlight("auth.refresh_session")
+
+# Utilisateurs des tokens validés par GoTrue, par empreinte SHA-256 du token
+# (le token lui-même n'est jamais écrit dans le niveau partagé)
+token_cache = TieredCache(
+    "tokens",
+    maxsize=settings.TOKEN_CACHE_SIZE,
+    ttl=settings.TOKEN_CACHE_TTL,
+    encode=lambda user: user.model_dump_json().encode(),
+    decode=AuthenticatedUser.model_validate_json,
+    backend=shared_backend
+)
+
+
+def get_supabase_client() -> "Client":
+    """Retourne le client Supabase partagé avec la clé anonyme"""
+    return clients.anon
 
-def get_supabase_client() -> Client:
-    """Retourne un client Supabase avec la clé anonyme"""
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
 
+def get_supabase_service_client() -> "Client":
+    """Retourne le client Supabase partagé avec la clé de service (pour les opérations backend)"""
+    return clients.service
 
-def get_supabase_service_client() -> Client:
-    """Retourne un client Supabase avec la clé de service (pour les opérations backend)"""
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
 
+def get_supabase_session_client() -> "SupabaseAuthClient":
+    """Retourne un client d'authentification dédié aux opérations qui ouvrent une session"""
+    return clients.session_auth_client()
 
-async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+
+async def refresh_session(refresh_token: str) -> "AuthResponse":
     """
-    Vérifie le token JWT et retourne les informations utilisateur
+    Échange un refresh token contre une nouvelle session (grant refresh_token de GoTrue)
+    
+    Aucun mot de passe n'est vérifié : une session se prolonge ainsi sans
+    recalcul bcrypt côté GoTrue. GoTrue fait tourner le refresh token ; les
+    renouvellements concurrents du même token partagent un seul appel.
     """
+    return await refresh_lookups.do(
+        refresh_token,
+        run_auth, "auth.refresh_session", get_supabase_session_client().refresh_session, refresh_token
+    )
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _token_cache_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _token_cache_ttl(token: str) -> Optional[float]:
+    """TTL du cache pour un token validé par GoTrue : jamais au-delà de son expiration"""
+    try:
+        expires_at = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.InvalidTokenError:
+        return None
+    if not isinstance(expires_at, (int, float)):
+        return None
+    ttl = min(settings.TOKEN_CACHE_TTL, expires_at - time.time())
+    return ttl if ttl > 0 else None
+
+
+async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> AuthenticatedUser:
+    """
+    Vérifie le token JWT et retourne l'utilisateur authentifié
+    
+    FastAPI met en cache les dépendances pendant une requête : les routes
+    injectent directement ce résultat au lieu de résoudre le token à nouveau.
+    
+    En mode "local", le token est vérifié sans appel réseau ; GoTrue n'est
+    interrogé que si la clé de signature est inconnue, et sa réponse est mise
+    en cache (TOKEN_CACHE_TTL, partagé entre workers). En mode "strict",
+    chaque token est validé par GoTrue, sans cache : un token révoqué ou
+    déconnecté est refusé immédiatement.
+    """
+    if settings.AUTH_VERIFY_MODE == "local":
+        try:
+            claims = token_verifier.verify(credentials.credentials)
+        except jwt.InvalidTokenError:
+            raise _credentials_exception()
+        if claims is not None:
+            return AuthenticatedUser.from_claims(claims)
+    
+    token = credentials.credentials
+    use_cache = settings.AUTH_VERIFY_MODE == "local" and settings.TOKEN_CACHE_TTL > 0
+    cache_key = _token_cache_key(token) if use_cache else None
+    if cache_key is not None:
+        cached_user = await token_cache.get(cache_key)
+        if cached_user is not None:
+            return cached_user
+    
     try:
         supabase_service = get_supabase_service_client()
-        user_response = supabase_service.auth.get_user(credentials.credentials)
+        user_response = await token_lookups.do(
+            token,
+            run_auth, "auth.get_user", supabase_service.auth.get_user, token
+        )
         
         if not user_response or not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return user_response
+            raise _credentials_exception()
+        user = AuthenticatedUser.from_user(user_response.user)
+        ttl = _token_cache_ttl(token) if cache_key is not None else None
+        if ttl is not None:
+            await token_cache.set(cache_key, user, ttl=ttl)
+        return user
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
+        # GoTrue en panne : ne pas faire croire au client que son token est invalide
+        if is_upstream_failure(e):
+            raise UpstreamUnavailable("auth", "auth.get_user failed")
+        raise _credentials_exception()
+
+
+
+async def has_admin_role(user_id: str) -> bool:
+    """
+    Indique si l'utilisateur a un rôle d'administration
+    
+    Le rôle applicatif est lu dans user_profiles.role (le rôle du JWT vaut
+    toujours "authenticated"), sans cache : un rôle retiré l'est immédiatement.
+    """
+    try:
+        row = await user_profiles.select_by_id("user_profiles.select_role", user_id, UserRole)
+    except UpstreamUnavailable:
+        raise
+    except Exception:
+        return False
+    return bool(row) and row.get("role") in ADMIN_ROLES
+
+
+async def require_admin(current_user: AuthenticatedUser = Depends(verify_token)) -> AuthenticatedUser:
+    """Vérifie que l'utilisateur authentifié a un rôle d'administration"""
+    if not await has_admin_role(current_user.id):
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
\ No newline at end of file
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+    return current_user
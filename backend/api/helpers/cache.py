@@ -0,0 +1,408 @@
+"""
+Caches de l'API
+
+- TTLCache : cache en mémoire borné (LRU) avec expiration (TTL), propre au worker.
+- TieredCache : TTLCache devant un niveau partagé entre les workers
+  (api/helpers/cache_backends.py, choisi par CACHE_BACKEND), avec diffusion
+  des invalidations et métriques de hits / misses par niveau.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from anyio import to_thread
+
+from api.config import settings
+from api.helpers.cache_backends import Invalidation, SharedCacheBackend
+from api.helpers.metrics import CACHE_BACKEND_ERRORS, CACHE_INVALIDATIONS, CACHE_REQUESTS
+from api.helpers.upstream import CACHE, get_limiter
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Cache LRU borné dont les entrées expirent après `ttl` secondes
+
+    Les compteurs hits / misses / evictions permettent de suivre
+    l'efficacité du cache. Sûr pour un usage multi-thread.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retourne la valeur associée à `key` si elle est présente et non expirée"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Ajoute ou remplace une entrée, en évinçant la moins récemment utilisée si besoin"""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Supprime une entrée"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Vide le cache"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Retourne les compteurs du cache"""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class TieredCache:
+    """
+    Cache à deux niveaux : TTLCache du worker devant un niveau partagé
+
+    Sans niveau partagé (CACHE_BACKEND=local), se comporte comme un TTLCache.
+    Avec un niveau partagé, un miss local est lu dans le niveau partagé
+    (sérialisé avec `encode` / `decode`) : tous les workers profitent d'une
+    même entrée. Le niveau local ne garde alors une entrée que
+    CACHE_LOCAL_TTL secondes au plus, et `invalidate` (ou `set` avec
+    broadcast=True) la retire aussi des niveaux locaux des autres workers.
+
+    Le niveau local est lu sur la boucle d'événements ; les appels au niveau
+    partagé (bloquants, jusqu'à CACHE_REDIS_TIMEOUT ou au délai de verrou de
+    SQLite) sont exécutés dans le pool de threads borné (cloison CACHE).
+
+    Le niveau partagé est une optimisation : en cas d'erreur, il est ignoré
+    pendant CACHE_SHARED_RETRY_AFTER secondes et le cache reste local.
+
+    Génération : chaque invalidation ou écriture après mise à jour
+    (broadcast=True) d'une clé change sa génération. Une lecture de la
+    source relève `generation(key)` avant de commencer et la passe à `set` :
+    si la clé a changé pendant la lecture, la valeur lue (peut-être
+    antérieure à la mise à jour) n'est pas mise en cache. Dans le niveau
+    partagé, ces remplissages n'écrasent jamais une entrée présente, pour ne
+    pas remplacer l'écriture d'un autre worker dont l'invalidation n'est pas
+    encore arrivée.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        ttl: float,
+        encode: Callable[[Any], bytes],
+        decode: Callable[[bytes], Any],
+        backend: Optional[SharedCacheBackend] = None
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.backend = backend
+        self.local = TTLCache(maxsize, min(ttl, settings.CACHE_LOCAL_TTL) if backend is not None else ttl)
+        self._encode = encode
+        self._decode = decode
+        self._shared_retry_at = 0.0
+        # Dernière génération des clés modifiées (bornées à `maxsize`, les plus
+        # anciennes sont oubliées) ; une clé oubliée prend la génération plancher
+        self._clock = 0
+        self._generations: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._generation_floor = 0
+        # Compteurs Prometheus résolus une seule fois (chemin chaud)
+        self._local_hits = CACHE_REQUESTS.labels(name, "local", "hit")
+        self._local_misses = CACHE_REQUESTS.labels(name, "local", "miss")
+        self._shared_hits = CACHE_REQUESTS.labels(name, "shared", "hit")
+        self._shared_misses = CACHE_REQUESTS.labels(name, "shared", "miss")
+        if backend is not None:
+            cache_invalidations.register(self)
+
+    def _shared_key(self, key: Hashable) -> str:
+        return f"{self.name}:{key}"
+
+    def generation(self, key: Hashable) -> int:
+        """Génération de `key`, à relever avant de lire la valeur dans sa source"""
+        return self._generations.get(key, self._generation_floor)
+
+    def _bump(self, key: Hashable) -> None:
+        self._clock += 1
+        self._generations[key] = self._clock
+        self._generations.move_to_end(key)
+        while len(self._generations) > max(self.local.maxsize, 1):
+            # Les générations sont croissantes : la plus ancienne devient le plancher
+            _, self._generation_floor = self._generations.popitem(last=False)
+
+    def _shared_available(self) -> bool:
+        return self.backend is not None and time.monotonic() >= self._shared_retry_at
+
+    def _shared_failed(self, operation: str, error: Exception) -> None:
+        CACHE_BACKEND_ERRORS.labels(self.backend.name, operation).inc()
+        self._shared_retry_at = time.monotonic() + settings.CACHE_SHARED_RETRY_AFTER
+        logger.warning("Shared cache %s unavailable (%s %s): %s", self.backend.name, self.name, operation, error)
+
+    async def _run_shared(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Exécute un appel bloquant au niveau partagé hors de la boucle d'événements"""
+        return await to_thread.run_sync(fn, *args, limiter=get_limiter(CACHE))
+
+    def _get_local(self, key: Hashable) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is _MISSING:
+            self._local_misses.inc()
+        else:
+            self._local_hits.inc()
+        return value
+
+    def _accept_shared(self, key: Hashable, entry: Optional[Tuple[bytes, float]]) -> Any:
+        """Décode une entrée lue dans le niveau partagé et la recopie dans le niveau local"""
+        if entry is None:
+            self._shared_misses.inc()
+            return _MISSING
+        data, remaining = entry
+        try:
+            value = self._decode(data)
+        except Exception as e:
+            # Entrée écrite par une autre version de l'API : traitée comme absente
+            logger.warning("Undecodable shared cache entry %s: %s", self._shared_key(key), e)
+            self._shared_misses.inc()
+            return _MISSING
+        self._shared_hits.inc()
+        self.local.set(key, value, ttl=min(self.local.ttl, remaining))
+        return value
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retourne la valeur associée à `key` (niveau local, puis niveau partagé)"""
+        value = self._get_local(key)
+        if value is not _MISSING:
+            return value
+        if not self._shared_available():
+            return default
+        try:
+            entry = await self._run_shared(self.backend.get, self._shared_key(key))
+        except Exception as e:
+            self._shared_failed("get", e)
+            return default
+        value = self._accept_shared(key, entry)
+        return default if value is _MISSING else value
+
+    async def get_many(self, keys: List[Hashable]) -> Dict[Hashable, Any]:
+        """Retourne les valeurs présentes pour `keys` ; les miss locaux sont lus en un seul appel partagé"""
+        found = {}
+        missing = []
+        for key in keys:
+            value = self._get_local(key)
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        if not missing or not self._shared_available():
+            return found
+        try:
+            entries = await self._run_shared(self.backend.get_many, [self._shared_key(key) for key in missing])
+        except Exception as e:
+            self._shared_failed("get", e)
+            return found
+        for key, entry in zip(missing, entries):
+            value = self._accept_shared(key, entry)
+            if value is not _MISSING:
+                found[key] = value
+        return found
+
+    def _write_shared(self, key: Hashable, data: bytes, ttl: float, broadcast: bool, only_if_absent: bool) -> None:
+        self.backend.set(self._shared_key(key), data, ttl, only_if_absent=only_if_absent)
+        if broadcast:
+            self.backend.publish_invalidation(self.name, str(key))
+
+    async def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        broadcast: bool = False,
+        generation: Optional[int] = None
+    ) -> None:
+        """
+        Ajoute ou remplace une entrée dans les deux niveaux
+
+        Args:
+            ttl: Durée de vie (par défaut celle du cache)
+            broadcast: Retire aussi l'ancienne valeur des niveaux locaux des
+                autres workers (écriture après une mise à jour)
+            generation: Génération relevée avant la lecture de `value` ; si
+                la clé a changé depuis, rien n'est mis en cache (et une
+                écriture avec broadcast, concurrente d'une autre mise à jour
+                dont l'ordre est inconnu, devient une invalidation)
+        """
+        if generation is not None and self.generation(key) != generation:
+            if broadcast:
+                await self.invalidate(key)
+            return
+        if broadcast:
+            self._bump(key)
+        ttl = self.ttl if ttl is None else ttl
+        self.local.set(key, value, ttl=min(ttl, self.local.ttl))
+        if not self._shared_available():
+            return
+        try:
+            only_if_absent = generation is not None and not broadcast
+            await self._run_shared(self._write_shared, key, self._encode(value), ttl, broadcast, only_if_absent)
+        except Exception as e:
+            self._shared_failed("set", e)
+
+    async def set_many(
+        self,
+        values: Dict[Hashable, Any],
+        generations: Dict[Hashable, int],
+        ttl: Optional[float] = None
+    ) -> None:
+        """
+        Met en cache plusieurs valeurs lues dans leur source, en un seul appel au niveau partagé
+
+        Comme `set` avec `generation` : les clés modifiées pendant la lecture
+        sont ignorées, et les entrées déjà présentes dans le niveau partagé
+        ne sont pas écrasées.
+        """
+        values = {key: value for key, value in values.items() if self.generation(key) == generations.get(key)}
+        ttl = self.ttl if ttl is None else ttl
+        for key, value in values.items():
+            self.local.set(key, value, ttl=min(ttl, self.local.ttl))
+        if not values or not self._shared_available():
+            return
+        try:
+            items = [(self._shared_key(key), self._encode(value)) for key, value in values.items()]
+            await self._run_shared(self.backend.set_many, items, ttl, True)
+        except Exception as e:
+            self._shared_failed("set", e)
+
+    def _delete_shared(self, key: Hashable) -> None:
+        self.backend.delete(self._shared_key(key))
+        self.backend.publish_invalidation(self.name, str(key))
+
+    async def invalidate(self, key: Hashable) -> None:
+        """Supprime une entrée des deux niveaux et des niveaux locaux des autres workers"""
+        self._bump(key)
+        self.local.invalidate(key)
+        CACHE_INVALIDATIONS.labels(self.name, "local").inc()
+        if not self._shared_available():
+            return
+        try:
+            await self._run_shared(self._delete_shared, key)
+        except Exception as e:
+            self._shared_failed("invalidate", e)
+
+    def apply_invalidation(self, key: str) -> None:
+        """Applique une invalidation diffusée par un autre worker (niveau local uniquement)"""
+        self._bump(key)
+        self.local.invalidate(key)
+        CACHE_INVALIDATIONS.labels(self.name, "broadcast").inc()
+
+    def clear(self) -> None:
+        """Vide le niveau local"""
+        self.local.clear()
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retourne les compteurs du niveau local et le niveau partagé utilisé"""
+        return {
+            **self.local.stats(),
+            "shared": self.backend.name if self.backend is not None else None,
+        }
+
+
+class CacheInvalidationListener:
+    """
+    Reçoit les invalidations diffusées par les autres workers
+
+    Lit le niveau partagé toutes les CACHE_INVALIDATION_POLL_INTERVAL
+    secondes, en tâche de fond (démarrée par le lifespan de l'application),
+    et retire les clés concernées des niveaux locaux des TieredCache.
+    """
+
+    def __init__(self):
+        self._caches: Dict[str, TieredCache] = {}
+        self._backend: Optional[SharedCacheBackend] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, cache: TieredCache) -> None:
+        """Abonne un cache aux invalidations de son niveau partagé"""
+        self._caches[cache.name] = cache
+        self._backend = cache.backend
+
+    def dispatch(self, invalidations: List[Invalidation]) -> None:
+        """Applique des invalidations reçues aux caches concernés"""
+        for name, key in invalidations:
+            cache = self._caches.get(name)
+            if cache is not None:
+                cache.apply_invalidation(key)
+
+    async def _listen_loop(self) -> None:
+        while True:
+            interval = settings.CACHE_INVALIDATION_POLL_INTERVAL
+            try:
+                self.dispatch(await asyncio.to_thread(self._backend.poll_invalidations))
+            except Exception as e:
+                CACHE_BACKEND_ERRORS.labels(self._backend.name, "poll").inc()
+                logger.warning("Cache invalidation polling failed: %s", e)
+                # Niveau partagé indisponible : les niveaux locaux expirent d'eux-mêmes (CACHE_LOCAL_TTL)
+                interval = settings.CACHE_SHARED_RETRY_AFTER
+            await asyncio.sleep(interval)
+
+    def start(self) -> None:
+        """Démarre la réception des invalidations (sans effet sans niveau partagé)"""
+        if self._backend is not None and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._listen_loop())
+
+    async def stop(self) -> None:
+        """Arrête la réception des invalidations et ferme les connexions au niveau partagé"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._backend is not None:
+            self._backend.close()
+
+    def reset_after_fork(self) -> None:
+        """Oublie la tâche héritée du processus parent"""
+        self._task = None
+
+
+# Écouteur global du worker, commun à tous les TieredCache
+cache_invalidations = CacheInvalidationListener()
@@ -0,0 +1,351 @@
+"""
+Niveaux de cache partagés entre les workers Gunicorn
+
+- "shm" : base SQLite en WAL, mappée en mémoire (mmap) dans /dev/shm ;
+  partagée par tous les workers d'un même hôte, sans service externe.
+- "redis" : serveur Redis (ou compatible, protocole RESP) partagé entre
+  hôtes ; nécessite le paquet optionnel `redis` (extra "redis").
+
+Les deux niveaux stockent des octets avec une expiration, et diffusent les
+invalidations aux autres workers (table `invalidations` interrogée
+périodiquement, ou canal pub/sub Redis). Les connexions sont propres au
+processus : elles sont ouvertes à la première utilisation dans chaque worker.
+"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from api.config import settings
+from api.private_dirs import default_private_dir, ensure_private_dir, ensure_private_file
+
+if TYPE_CHECKING:
+    import redis
+
+# Invalidation diffusée : (nom du cache, clé)
+Invalidation = Tuple[str, str]
+
+# Durée de conservation des invalidations diffusées par la base partagée (secondes)
+INVALIDATION_RETENTION = 60
+
+
+class SharedCacheBackend:
+    """
+    Interface d'un niveau de cache partagé
+
+    Les clés sont de la forme "<cache>:<clé>". Les méthodes sont bloquantes :
+    TieredCache les appelle depuis le pool de threads du worker, jamais
+    depuis la boucle d'événements. Elles doivent donc être sûres entre threads.
+    """
+
+    name = "shared"
+
+    def __init__(self):
+        self._pid: Optional[int] = None
+        self._origin = ""
+
+    def _ensure_process(self) -> None:
+        """Oublie les connexions héritées du processus parent après un fork"""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._origin = f"{self._pid}-{uuid.uuid4().hex[:8]}"
+            self._reset()
+
+    @property
+    def origin(self) -> str:
+        """Identifiant du processus émetteur des invalidations (propre au worker)"""
+        self._ensure_process()
+        return self._origin
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """Retourne la valeur et sa durée de vie restante (secondes), ou None"""
+        raise NotImplementedError
+
+    def get_many(self, keys: List[str]) -> List[Optional[Tuple[bytes, float]]]:
+        """Comme get, pour plusieurs clés (dans l'ordre de `keys`)"""
+        return [self.get(key) for key in keys]
+
+    def set(self, key: str, value: bytes, ttl: float, only_if_absent: bool = False) -> None:
+        """
+        Ajoute ou remplace une entrée qui expire après `ttl` secondes
+
+        Avec only_if_absent, une entrée présente (non expirée) est conservée.
+        """
+        raise NotImplementedError
+
+    def set_many(self, items: List[Tuple[str, bytes]], ttl: float, only_if_absent: bool = False) -> None:
+        """Comme set, pour plusieurs entrées de même durée de vie"""
+        for key, value in items:
+            self.set(key, value, ttl, only_if_absent)
+
+    def delete(self, key: str) -> None:
+        """Supprime une entrée"""
+        raise NotImplementedError
+
+    def publish_invalidation(self, cache: str, key: str) -> None:
+        """Diffuse l'invalidation d'une clé aux niveaux locaux des autres workers"""
+        raise NotImplementedError
+
+    def poll_invalidations(self) -> List[Invalidation]:
+        """Retourne les invalidations reçues des autres workers depuis le dernier appel"""
+        raise NotImplementedError
+
+    def _reset(self) -> None:
+        """Oublie les connexions du processus (appelé après un fork)"""
+
+    def close(self) -> None:
+        """Ferme les connexions du processus"""
+
+
+class SqliteSharedBackend(SharedCacheBackend):
+    """
+    Niveau partagé sur un même hôte : base SQLite en mémoire partagée
+
+    Placée sur un tmpfs (/dev/shm par défaut), la base ne touche jamais le
+    disque ; le mode WAL permet des lectures concurrentes sans verrou et le
+    mmap évite les copies lors des lectures. Une connexion par worker,
+    protégée par un verrou (threads du pool et écouteur d'invalidations).
+    """
+
+    name = "shm"
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._last_invalidation: Optional[int] = None
+        self._last_prune = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        self._ensure_process()
+        if self._connection is None:
+            _prepare_private_file(self.path)
+            connection = sqlite3.connect(
+                self.path, timeout=1, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            connection.execute(f"PRAGMA mmap_size={64 * 1024 * 1024}")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS invalidations ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, cache TEXT NOT NULL, key TEXT NOT NULL, "
+                "origin TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        remaining = row[1] - time.time()
+        return (row[0], remaining) if remaining > 0 else None
+
+    # Remplacement inconditionnel, ou seulement d'une entrée expirée (only_if_absent)
+    _SET_QUERY = "INSERT OR REPLACE INTO entries (key, value, expires_at) VALUES (?, ?, ?)"
+    _ADD_QUERY = (
+        "INSERT INTO entries (key, value, expires_at) VALUES (?1, ?2, ?3) "
+        "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+        "WHERE entries.expires_at <= ?4"
+    )
+
+    def set(self, key: str, value: bytes, ttl: float, only_if_absent: bool = False) -> None:
+        self.set_many([(key, value)], ttl, only_if_absent)
+
+    def set_many(self, items: List[Tuple[str, bytes]], ttl: float, only_if_absent: bool = False) -> None:
+        now = time.time()
+        if only_if_absent:
+            query, rows = self._ADD_QUERY, [(key, value, now + ttl, now) for key, value in items]
+        else:
+            query, rows = self._SET_QUERY, [(key, value, now + ttl) for key, value in items]
+        with self._lock:
+            self._connect().executemany(query, rows)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connect().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def publish_invalidation(self, cache: str, key: str) -> None:
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO invalidations (cache, key, origin, created_at) VALUES (?, ?, ?, ?)",
+                (cache, key, self.origin, time.time()),
+            )
+
+    def poll_invalidations(self) -> List[Invalidation]:
+        with self._lock:
+            connection = self._connect()
+            if self._last_invalidation is None:
+                # Seules les invalidations postérieures au démarrage du worker le concernent
+                self._last_invalidation = connection.execute(
+                    "SELECT COALESCE(MAX(id), 0) FROM invalidations"
+                ).fetchone()[0]
+                return []
+            rows = connection.execute(
+                "SELECT id, cache, key, origin FROM invalidations WHERE id > ? ORDER BY id",
+                (self._last_invalidation,),
+            ).fetchall()
+            self._prune(connection)
+        if rows:
+            self._last_invalidation = rows[-1][0]
+        return [(cache, key) for _, cache, key, origin in rows if origin != self.origin]
+
+    def _prune(self, connection: sqlite3.Connection) -> None:
+        """Supprime les entrées expirées et les invalidations anciennes (au plus une fois par seconde)"""
+        now = time.time()
+        if now - self._last_prune < 1:
+            return
+        self._last_prune = now
+        connection.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        connection.execute("DELETE FROM invalidations WHERE created_at <= ?", (now - INVALIDATION_RETENTION,))
+
+    def _reset(self) -> None:
+        # La connexion héritée du master ne doit pas être utilisée (ni fermée) par le worker
+        self._connection = None
+        self._last_invalidation = None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+
+class RedisBackend(SharedCacheBackend):
+    """
+    Niveau partagé entre hôtes : serveur Redis (protocole RESP)
+
+    Les invalidations passent par un canal pub/sub. Un court délai de socket
+    (CACHE_REDIS_TIMEOUT) borne le temps passé par requête quand le serveur
+    ralentit ; les erreurs font retomber sur le niveau local.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, channel: str):
+        super().__init__()
+        self.url = url
+        self.channel = channel
+        self._lock = threading.Lock()
+        self._client: Optional["redis.Redis"] = None
+        self._pubsub: Optional["redis.client.PubSub"] = None
+
+    def _connect(self) -> "redis.Redis":
+        self._ensure_process()
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    try:
+                        import redis
+                    except ImportError as e:
+                        raise RuntimeError(
+                            "CACHE_BACKEND=redis requires the redis package (uv sync --extra redis)"
+                        ) from e
+                    self._client = redis.Redis.from_url(
+                        self.url,
+                        socket_timeout=settings.CACHE_REDIS_TIMEOUT,
+                        socket_connect_timeout=settings.CACHE_REDIS_TIMEOUT,
+                    )
+        return self._client
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        pipeline = self._connect().pipeline(transaction=False)
+        value, remaining_ms = pipeline.get(key).pttl(key).execute()
+        if value is None:
+            return None
+        # PTTL vaut -1 sans expiration : ne devrait pas arriver, le niveau local applique son propre TTL
+        return value, remaining_ms / 1000 if remaining_ms > 0 else float("inf")
+
+    def get_many(self, keys: List[str]) -> List[Optional[Tuple[bytes, float]]]:
+        pipeline = self._connect().pipeline(transaction=False)
+        for key in keys:
+            pipeline.get(key).pttl(key)
+        replies = pipeline.execute()
+        return [
+            None if value is None else (value, remaining_ms / 1000 if remaining_ms > 0 else float("inf"))
+            for value, remaining_ms in zip(replies[::2], replies[1::2])
+        ]
+
+    def set(self, key: str, value: bytes, ttl: float, only_if_absent: bool = False) -> None:
+        self._connect().set(key, value, px=max(1, int(ttl * 1000)), nx=only_if_absent)
+
+    def set_many(self, items: List[Tuple[str, bytes]], ttl: float, only_if_absent: bool = False) -> None:
+        pipeline = self._connect().pipeline(transaction=False)
+        for key, value in items:
+            pipeline.set(key, value, px=max(1, int(ttl * 1000)), nx=only_if_absent)
+        pipeline.execute()
+
+    def delete(self, key: str) -> None:
+        self._connect().delete(key)
+
+    def publish_invalidation(self, cache: str, key: str) -> None:
+        self._connect().publish(self.channel, f"{self.origin}\n{cache}\n{key}")
+
+    def poll_invalidations(self) -> List[Invalidation]:
+        client = self._connect()
+        if self._pubsub is None:
+            self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(self.channel)
+        invalidations = []
+        while True:
+            message = self._pubsub.get_message(timeout=0)
+            if message is None:
+                return invalidations
+            origin, cache, key = message["data"].decode().split("\n", 2)
+            if origin != self.origin:
+                invalidations.append((cache, key))
+
+    def _reset(self) -> None:
+        self._client = None
+        self._pubsub = None
+
+    def close(self) -> None:
+        if self._pid != os.getpid():
+            return
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+def _prepare_private_file(path: str) -> None:
+    """
+    Prépare le fichier de la base partagée avant son ouverture par SQLite
+
+    Le niveau partagé contient des tokens validés : le répertoire (0700) et
+    le fichier (0600) doivent être privés (api/private_dirs.py) ; les
+    fichiers -wal et -shm de SQLite sont créés dans ce même répertoire.
+    """
+    ensure_private_dir(os.path.dirname(os.path.abspath(path)))
+    ensure_private_file(path)
+
+
+def _default_shared_path() -> str:
+    """Base partagée par les workers du déploiement, dans son répertoire privé"""
+    return os.path.join(default_private_dir("api-cache"), "cache.sqlite3")
+
+
+def create_shared_backend() -> Optional[SharedCacheBackend]:
+    """Construit le niveau partagé choisi par CACHE_BACKEND (None pour un cache local uniquement)"""
+    if settings.CACHE_BACKEND == "shm":
+        return SqliteSharedBackend(settings.CACHE_SHARED_PATH or _default_shared_path())
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend(settings.CACHE_REDIS_URL, settings.CACHE_REDIS_CHANNEL)
+    return None
+
+
+# Niveau partagé du worker, commun à tous les caches (None si CACHE_BACKEND=local)
+shared_backend = create_shared_backend()
@@ -0,0 +1,152 @@
+"""
+Registre des clients Supabase partagés par worker
+
+Le SDK Supabase (et httpx) n'est importé qu'à l'ouverture du registre :
+l'import de l'application reste rapide et le coût est payé une seule fois
+par worker, en tâche de fond au démarrage (voir api/app.py).
+"""
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from api.config import settings
+
+if TYPE_CHECKING:
+    import httpx
+    from supabase import Client, ClientOptions, SupabaseAuthClient
+
+
+class SupabaseClientRegistry:
+    """
+    Registre des clients Supabase d'un worker
+
+    Les clients sont créés une seule fois et partagent un pool de connexions
+    HTTP keep-alive borné. Le registre est ouvert et fermé par le lifespan de
+    l'application FastAPI (voir api/app.py).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._http_client: Optional["httpx.Client"] = None
+        self._anon_client: Optional["Client"] = None
+        self._service_client: Optional["Client"] = None
+
+    def _build_http_client(self) -> "httpx.Client":
+        """Construit le client HTTP partagé avec un pool de connexions borné"""
+        import httpx
+
+        return httpx.Client(
+            limits=httpx.Limits(
+                max_connections=settings.SUPABASE_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SUPABASE_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=settings.SUPABASE_POOL_KEEPALIVE_EXPIRY,
+            ),
+            timeout=settings.SUPABASE_HTTP_TIMEOUT,
+            follow_redirects=True,
+        )
+
+    def _build_options(self, http_client: "httpx.Client") -> "ClientOptions":
+        """Options communes : pas de session persistée, pool HTTP partagé"""
+        from supabase import ClientOptions
+
+        return ClientOptions(
+            auto_refresh_token=False,
+            persist_session=False,
+            httpx_client=http_client,
+        )
+
+    def open(self) -> None:
+        """
+        Crée le pool HTTP et les clients partagés (idempotent)
+
+        Les clients sont construits dans des variables locales et publiés
+        ensemble, le client de service en dernier : une requête servie
+        pendant l'ouverture en tâche de fond (api/app.py) attend la fin de
+        l'ouverture au lieu de trouver un registre à moitié construit.
+        """
+        if self._service_client is not None:
+            return
+        from supabase import create_client
+
+        with self._lock:
+            if self._service_client is not None:
+                return
+            http_client = self._build_http_client()
+            anon_client = create_client(
+                settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY, self._build_options(http_client)
+            )
+            service_client = create_client(
+                settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY, self._build_options(http_client)
+            )
+            self._http_client = http_client
+            self._anon_client = anon_client
+            self._service_client = service_client
+
+    def close(self) -> None:
+        """Ferme le pool HTTP et oublie les clients"""
+        with self._lock:
+            http_client = self._http_client
+            self._service_client = None
+            self._anon_client = None
+            self._http_client = None
+            if http_client is not None:
+                http_client.close()
+
+    def reset_after_fork(self) -> None:
+        """
+        Oublie les clients hérités du processus parent, sans les fermer
+
+        Les sockets du pool appartiennent au parent : les fermer depuis le
+        worker couperait ses connexions. Les clients du worker seront créés
+        à la première utilisation (ou par le lifespan).
+        """
+        self._lock = threading.Lock()
+        self._service_client = None
+        self._anon_client = None
+        self._http_client = None
+
+    @property
+    def is_open(self) -> bool:
+        """Indique si le registre a été ouvert"""
+        return self._service_client is not None
+
+    @property
+    def http(self) -> "httpx.Client":
+        """Client HTTP partagé (pool de connexions du worker)"""
+        self.open()
+        return self._http_client
+
+    @property
+    def anon(self) -> "Client":
+        """Client partagé avec la clé anonyme"""
+        self.open()
+        return self._anon_client
+
+    @property
+    def service(self) -> "Client":
+        """Client partagé avec la clé de service"""
+        self.open()
+        return self._service_client
+
+    def session_auth_client(self) -> "SupabaseAuthClient":
+        """
+        Retourne un client GoTrue éphémère pour les opérations qui ouvrent une session
+
+        sign_in_with_password et sign_up (SIGNED_IN), comme refresh_session
+        (TOKEN_REFRESHED), émettent un événement qui remplace l'en-tête Authorization
+        du client émetteur. Ces appels ne doivent donc jamais passer par les clients
+        partagés ; ce client léger réutilise malgré tout le pool de connexions du worker.
+        """
+        from supabase import SupabaseAuthClient
+
+        service = self.service
+        return SupabaseAuthClient(
+            url=str(service.auth_url),
+            headers=dict(service.options.headers),
+            auto_refresh_token=False,
+            persist_session=False,
+            http_client=self._http_client,
+        )
+
+
+# Registre global du worker
+clients = SupabaseClientRegistry()
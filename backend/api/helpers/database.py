@@ -0,0 +1,157 @@
+"""
+Accès direct à Postgres pour les lectures de user_profiles
+
+Avec PROFILE_READ_BACKEND=postgres, les lectures de profils par clé
+primaire ne passent plus par Kong et PostgREST (deux sauts HTTP et un
+ré-encodage JSON) : elles sont envoyées directement à Postgres par le port
+transactionnel du pooler Supavisor (POOLER_PROXY_PORT_TRANSACTION de .setup),
+avec un pool de connexions asyncpg par worker et des requêtes préparées
+(cache de requêtes d'asyncpg).
+
+asyncpg est une dépendance optionnelle (extra "postgres"), importée à
+l'ouverture du pool. Tant que le pool n'est pas ouvert, ou quand son
+disjoncteur est ouvert, les lectures passent par PostgREST.
+"""
+import asyncio
+import logging
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import anyio
+
+from api.config import settings
+from api.helpers.metrics import observe_upstream
+from api.helpers.resilience import OPEN, UpstreamUnavailable, breakers
+
+if TYPE_CHECKING:
+    import asyncpg
+
+logger = logging.getLogger(__name__)
+
+# Dépendance amont (disjoncteur, métriques)
+POSTGRES = "postgres"
+
+
+def _row_to_dict(record: "asyncpg.Record") -> Dict[str, Any]:
+    """Convertit une ligne asyncpg dans la forme renvoyée par PostgREST (uuid en texte)"""
+    return {
+        key: str(value) if isinstance(value, uuid.UUID) else value
+        for key, value in record.items()
+    }
+
+
+class PostgresReader:
+    """
+    Pool de connexions asyncpg du worker vers le pooler Supavisor
+
+    Le pool est ouvert en tâche de fond par le lifespan de l'application
+    (nouvelle tentative toutes les BREAKER_RESET_TIMEOUT secondes en cas
+    d'échec) et fermé à l'arrêt du worker.
+    """
+
+    def __init__(self):
+        self._pool: Optional["asyncpg.Pool"] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.PROFILE_READ_BACKEND == "postgres"
+
+    @property
+    def available(self) -> bool:
+        """Le pool est ouvert et son disjoncteur n'est pas ouvert"""
+        return self._pool is not None and breakers[POSTGRES].state != OPEN
+
+    async def _create_pool(self) -> "asyncpg.Pool":
+        import asyncpg
+
+        return await asyncpg.create_pool(
+            settings.DATABASE_URL,
+            min_size=settings.DATABASE_POOL_MIN_SIZE,
+            max_size=settings.DATABASE_POOL_MAX_SIZE,
+            # 0 : requêtes non nommées, pour les poolers sans requêtes préparées en mode transaction
+            statement_cache_size=settings.DATABASE_STATEMENT_CACHE_SIZE,
+            command_timeout=settings.DATABASE_TIMEOUT,
+        )
+
+    async def _open_loop(self) -> None:
+        """Ouvre le pool, en réessayant tant que Postgres est injoignable"""
+        while self._pool is None:
+            try:
+                self._pool = await self._create_pool()
+            except Exception as e:
+                logger.warning("Postgres pool not opened, reads use PostgREST: %s", e)
+                await asyncio.sleep(settings.BREAKER_RESET_TIMEOUT)
+
+    def start(self) -> None:
+        """Ouvre le pool en tâche de fond (sans effet si PROFILE_READ_BACKEND n'est pas "postgres")"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._open_loop())
+
+    async def stop(self) -> None:
+        """Ferme le pool"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            try:
+                await asyncio.wait_for(pool.close(), settings.DATABASE_TIMEOUT)
+            except Exception as e:
+                logger.warning("Postgres pool not closed cleanly: %s", e)
+                pool.terminate()
+
+    def reset_after_fork(self) -> None:
+        """Oublie le pool et la tâche hérités du processus parent"""
+        self._pool = None
+        self._task = None
+
+    async def fetch(self, operation: str, query: str, *args: Any) -> List[Dict[str, Any]]:
+        """
+        Exécute une requête de lecture (préparée et mise en cache par asyncpg)
+
+        Args:
+            operation: Nom de l'opération (métriques)
+            query: Requête SQL paramétrée ($1, $2...)
+
+        Returns:
+            Lignes sous forme de dictionnaires
+
+        Raises:
+            UpstreamUnavailable: Pool fermé, disjoncteur ouvert ou délai dépassé
+        """
+        if self._pool is None:
+            raise UpstreamUnavailable(POSTGRES, "pool not open")
+        breaker = breakers[POSTGRES]
+        breaker.before_call()
+
+        start = time.perf_counter()
+        failed = True
+        try:
+            # Attente d'une connexion libre comprise
+            with anyio.fail_after(settings.DATABASE_TIMEOUT):
+                records = await self._pool.fetch(query, *args)
+            failed = False
+        except TimeoutError:
+            breaker.record(failed=True)
+            raise UpstreamUnavailable(POSTGRES, f"{operation} timed out")
+        except Exception:
+            breaker.record(failed=True)
+            raise
+        except BaseException:
+            failed = False
+            breaker.release()
+            raise
+        finally:
+            observe_upstream(POSTGRES, operation, time.perf_counter() - start, failed)
+        breaker.record(failed=False)
+        return [_row_to_dict(record) for record in records]
+
+
+# Pool global du worker
+postgres_reader = PostgresReader()
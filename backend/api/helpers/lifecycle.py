@@ -0,0 +1,51 @@
+"""
+Cycle de vie des workers Gunicorn
+"""
+import importlib
+
+from fastapi import FastAPI
+
+from api.helpers.cache import cache_invalidations
+from api.helpers.clients import clients
+from api.helpers.database import postgres_reader
+from api.helpers.probes import readiness_probe
+from api.helpers.tokens import token_verifier
+from api.helpers.upstream import reset_limiters
+
+
+# Modules importés à la demande par les workers (voir api/helpers/clients.py)
+DEFERRED_MODULES = ("httpx", "supabase", "supabase_auth.errors")
+
+
+def preload_in_master(app: FastAPI) -> None:
+    """
+    Charge dans le master ce que chaque worker chargerait sinon à la demande
+
+    Avec preload_app, les imports différés du SDK Supabase et le schéma
+    OpenAPI sont ainsi construits une seule fois et partagés par les workers.
+    Appelé par le hook when_ready de gunicorn.conf.py.
+    """
+    for module in DEFERRED_MODULES:
+        importlib.import_module(module)
+    if postgres_reader.enabled:
+        importlib.import_module("asyncpg")
+    app.openapi()
+
+
+def reset_after_fork() -> None:
+    """
+    Réinitialise l'état propre au processus dans un worker fraîchement forké
+
+    Avec preload_app, l'application est importée une seule fois dans le
+    master puis partagée (copy-on-write) par les workers. Les ressources
+    liées à un processus ou à une boucle d'événements (pool HTTP, pool
+    Postgres, limiteurs, tâches JWKS et d'invalidation du cache) ne doivent
+    pas être héritées : chaque worker recrée les
+    siennes à la demande. Appelé par le hook post_fork de gunicorn.conf.py.
+    """
+    clients.reset_after_fork()
+    token_verifier.reset_after_fork()
+    readiness_probe.reset_after_fork()
+    cache_invalidations.reset_after_fork()
+    postgres_reader.reset_after_fork()
+    reset_limiters()
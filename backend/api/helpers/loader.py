@@ -0,0 +1,100 @@
+"""
+Regroupement des lectures unitaires concurrentes en requêtes par lot (DataLoader)
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Set, TypeVar
+
+from api.helpers.metrics import LOADER_BATCH_SIZE
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class BatchLoader(Generic[K, V]):
+    """
+    Regroupe les clés demandées pendant une courte fenêtre en un seul appel
+
+    Les clés reçues pendant `window` secondes (ou jusqu'à `max_batch` clés)
+    sont transmises ensemble à `batch_fn`, qui retourne les valeurs trouvées
+    indexées par clé ; chaque appelant reçoit ensuite sa propre valeur (None
+    si la clé est absente). Une fenêtre nulle désactive le regroupement.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[K]], Awaitable[Dict[K, V]]],
+        window: float,
+        max_batch: int
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self._pending: Dict[K, List[asyncio.Future]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.keys = 0
+
+    async def load(self, key: K) -> Optional[V]:
+        """
+        Retourne la valeur associée à `key`, lue avec les autres clés de la fenêtre
+
+        Raises:
+            Exception: L'erreur levée par `batch_fn` pour le lot de la clé
+        """
+        if self.window <= 0:
+            return (await self._call([key])).get(key)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        if len(self._pending) >= self.max_batch:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._dispatch)
+        return await future
+
+    async def _call(self, keys: List[K]) -> Dict[K, V]:
+        """Appelle `batch_fn` et met à jour les compteurs"""
+        self.batches += 1
+        self.keys += len(keys)
+        LOADER_BATCH_SIZE.labels(self.name).observe(len(keys))
+        return await self.batch_fn(keys)
+
+    def _dispatch(self) -> None:
+        """Envoie le lot en attente (fin de fenêtre ou lot complet)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending: Dict[K, List[asyncio.Future]]) -> None:
+        """Exécute le lot puis distribue résultats ou erreur aux appelants"""
+        try:
+            results = await self._call(list(pending))
+        except Exception as e:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for key, futures in pending.items():
+            value = results.get(key)
+            for future in futures:
+                if not future.done():
+                    future.set_result(value)
+
+    def stats(self) -> Dict[str, int]:
+        """Retourne les compteurs du loader"""
+        return {
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "keys": self.keys,
+        }
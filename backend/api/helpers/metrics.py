@@ -0,0 +1,149 @@
+"""
+Métriques Prometheus de l'API
+
+En production (Gunicorn), PROMETHEUS_MULTIPROC_DIR est défini par
+gunicorn.conf.py : chaque worker écrit ses métriques dans ce répertoire et
+/metrics agrège l'ensemble des workers.
+"""
+import os
+import time
+from typing import AsyncIterator, Optional
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Libellé des requêtes qui ne correspondent à aucune route (évite l'explosion de cardinalité)
+UNMATCHED_ROUTE = "unmatched"
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "Total HTTP requests",
+    ["method", "route", "status"]
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being processed",
+    ["method", "route"],
+    multiprocess_mode="livesum"
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route"]
+)
+UPSTREAM_LATENCY = Histogram(
+    "supabase_upstream_duration_seconds",
+    "Latency of Supabase upstream calls",
+    ["dependency", "operation"]
+)
+UPSTREAM_ERRORS = Counter(
+    "supabase_upstream_errors_total",
+    "Failed Supabase upstream calls",
+    ["dependency", "operation"]
+)
+LOADER_BATCH_SIZE = Histogram(
+    "batch_loader_keys",
+    "Keys per batched upstream read",
+    ["loader"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200)
+)
+SINGLEFLIGHT_CALLS = Counter(
+    "singleflight_calls_total",
+    "Coalesced upstream lookups, by outcome (executed or deduplicated)",
+    ["group", "outcome"]
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by tier (local or shared) and result (hit or miss)",
+    ["cache", "tier", "result"]
+)
+CACHE_INVALIDATIONS = Counter(
+    "cache_invalidations_total",
+    "Cache invalidations, issued by this worker or received from another worker",
+    ["cache", "source"]
+)
+CACHE_BACKEND_ERRORS = Counter(
+    "cache_backend_errors_total",
+    "Failed operations on the shared cache tier (served from the local tier instead)",
+    ["backend", "operation"]
+)
+
+
+def observe_upstream(dependency: str, operation: str, duration: float, failed: bool) -> None:
+    """Enregistre la durée (et l'échec éventuel) d'un appel amont"""
+    UPSTREAM_LATENCY.labels(dependency, operation).observe(duration)
+    if failed:
+        UPSTREAM_ERRORS.labels(dependency, operation).inc()
+
+
+def render_metrics() -> bytes:
+    """Retourne les métriques au format texte Prometheus (agrégées sur tous les workers)"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def route_template(scope: Scope) -> str:
+    """Retourne le gabarit de la route résolue (ex: /api/user/profile)"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+async def track_in_progress(request: Request) -> AsyncIterator[None]:
+    """
+    Dépendance globale qui suit les requêtes en cours par gabarit de route
+
+    Le gabarit n'est connu qu'une fois la route résolue : ce suivi passe donc
+    par une dépendance plutôt que par le middleware.
+    """
+    in_progress = REQUESTS_IN_PROGRESS.labels(request.method, route_template(request.scope))
+    in_progress.inc()
+    try:
+        yield
+    finally:
+        in_progress.dec()
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI qui mesure le volume et la latence des requêtes HTTP
+    par gabarit de route
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code: Optional[int] = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Le routeur a enregistré la route résolue dans le scope
+            method = scope["method"]
+            route = route_template(scope)
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - start)
+            REQUESTS.labels(method, route, str(status_code or 500)).inc()
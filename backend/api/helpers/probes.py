@@ -0,0 +1,125 @@
+"""
+Sondes de disponibilité des services Supabase (readiness)
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from api.config import settings
+from api.helpers.clients import clients
+from api.helpers.resilience import OPEN, breakers
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessProbe:
+    """
+    Sonde GoTrue et PostgREST en tâche de fond et garde le dernier résultat
+
+    Les sondes tournent toutes les READINESS_PROBE_INTERVAL secondes, hors du
+    chemin des requêtes : `snapshot` retourne l'état en cache sans aucun
+    appel réseau, quel que soit le nombre de contrôles du load balancer.
+    """
+
+    def __init__(self):
+        self._results: Dict[str, dict] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _probe_urls(self) -> Dict[str, str]:
+        base_url = settings.SUPABASE_URL.rstrip("/")
+        return {
+            "auth": f"{base_url}/auth/v1/health",
+            # Requête minimale qui traverse PostgREST jusqu'à la base
+            "postgrest": f"{base_url}/rest/v1/user_profiles?select=id&limit=1",
+        }
+
+    def _probe(self, url: str) -> dict:
+        """Sonde une URL (appel bloquant) et retourne le résultat horodaté"""
+        start = time.perf_counter()
+        error = None
+        try:
+            response = clients.http.get(
+                url,
+                headers={
+                    "apikey": settings.SUPABASE_SERVICE_KEY,
+                    "Authorization": f"Bearer {settings.SUPABASE_SERVICE_KEY}",
+                },
+                timeout=settings.READINESS_PROBE_TIMEOUT,
+            )
+            if response.status_code >= 500:
+                error = f"HTTP {response.status_code}"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return {
+            "ok": error is None,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+            "checked_at": datetime.now(timezone.utc),
+            "monotonic": time.monotonic(),
+            "error": error,
+        }
+
+    async def probe_all(self) -> None:
+        """Sonde toutes les dépendances en parallèle et met à jour le cache"""
+        urls = self._probe_urls()
+        results = await asyncio.gather(*(asyncio.to_thread(self._probe, url) for url in urls.values()))
+        self._results = dict(zip(urls, results))
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        Dernier état connu de chaque dépendance (sans appel réseau)
+
+        Une dépendance est prête si sa dernière sonde a réussi, date de moins
+        de READINESS_STALE_AFTER secondes et si son disjoncteur n'est pas ouvert.
+        """
+        now = time.monotonic()
+        snapshot = {}
+        for name in ("auth", "postgrest"):
+            result = self._results.get(name)
+            circuit = breakers[name].state
+            if result is None:
+                snapshot[name] = {"ready": False, "circuit": circuit, "error": "not probed yet"}
+                continue
+            stale = now - result["monotonic"] > settings.READINESS_STALE_AFTER
+            snapshot[name] = {
+                "ready": result["ok"] and not stale and circuit != OPEN,
+                "circuit": circuit,
+                "latency_ms": result["latency_ms"],
+                "checked_at": result["checked_at"],
+                "error": "probe result is stale" if stale and result["ok"] else result["error"],
+            }
+        return snapshot
+
+    async def _probe_loop(self) -> None:
+        """Sonde les dépendances périodiquement sans bloquer la boucle d'événements"""
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.warning("Readiness probe failed: %s", e)
+            await asyncio.sleep(settings.READINESS_PROBE_INTERVAL)
+
+    def start(self) -> None:
+        """Démarre les sondes en tâche de fond"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    async def stop(self) -> None:
+        """Arrête les sondes"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def reset_after_fork(self) -> None:
+        """Oublie la tâche et les résultats hérités du processus parent"""
+        self._task = None
+        self._results = {}
+
+
+# Sonde globale du worker
+readiness_probe = ReadinessProbe()
@@ -0,0 +1,243 @@
+"""
+Helpers pour les profils utilisateur
+"""
+from typing import Dict, List, NamedTuple, Optional, Union
+
+from api.config import settings
+from api.helpers.cache import TieredCache
+from api.helpers.cache_backends import shared_backend
+from api.helpers.clients import clients
+from api.helpers.loader import BatchLoader
+from api.helpers.repositories import user_profiles
+from api.helpers.responses import make_etag
+from api.helpers.singleflight import SingleFlight
+from api.helpers.upstream import run_auth
+from api.models import AuthenticatedUser, PublicProfile, UserProfile
+
+
+
+class CachedProfile(NamedTuple):
+    """Profil (complet ou public) mis en cache avec son corps JSON et son ETag, calculés une seule fois"""
+    profile: Union[UserProfile, PublicProfile]
+    body: bytes
+    etag: str
+
+
+def _decode_cached_profile(body: bytes) -> CachedProfile:
+    """Reconstruit un CachedProfile à partir du corps JSON stocké dans le niveau partagé"""
+    return CachedProfile(profile=UserProfile.model_validate_json(body), body=body, etag=make_etag(body))
+
+
+def _decode_cached_public_profile(body: bytes) -> CachedProfile:
+    """Reconstruit un CachedProfile public à partir du corps JSON stocké dans le niveau partagé"""
+    return CachedProfile(profile=PublicProfile.model_validate_json(body), body=body, etag=make_etag(body))
+
+
+# Cache des profils (CachedProfile) par id utilisateur ; le niveau partagé stocke le corps JSON
+# Ne contient que des profils construits comme GET /user/profile (ligne complétée par
+# les métadonnées du token) ; invalidé par update_profile pour que l'utilisateur voie
+# toujours ses propres écritures
+profile_cache = TieredCache(
+    "profiles",
+    maxsize=settings.PROFILE_CACHE_SIZE,
+    ttl=settings.PROFILE_CACHE_TTL,
+    encode=lambda entry: entry.body,
+    decode=_decode_cached_profile,
+    backend=shared_backend
+)
+
+# Cache des projections publiques (PublicProfile) servies par GET /user/profiles
+public_profile_cache = TieredCache(
+    "public_profiles",
+    maxsize=settings.PROFILE_CACHE_SIZE,
+    ttl=settings.PROFILE_CACHE_TTL,
+    encode=lambda entry: entry.body,
+    decode=_decode_cached_public_profile,
+    backend=shared_backend
+)
+
+# Lectures de user_profiles en vol, par id utilisateur (rafales après expiration du cache)
+profile_lookups = SingleFlight("user_profiles.select")
+
+
+async def _load_profile_rows(user_ids: List[str]) -> Dict[str, dict]:
+    """Lit un lot de lignes user_profiles en une seule requête"""
+    rows = await user_profiles.select_by_ids("user_profiles.select_batch", user_ids, UserProfile)
+    return {row["id"]: row for row in rows}
+
+
+# Lectures unitaires de user_profiles regroupées entre requêtes concurrentes
+profile_loader = BatchLoader(
+    "user_profiles",
+    _load_profile_rows,
+    window=settings.PROFILE_LOADER_WINDOW,
+    max_batch=settings.PROFILE_LOADER_MAX_BATCH
+)
+
+
+async def load_profile_row(user_id: str) -> Optional[dict]:
+    """
+    Retourne la ligne user_profiles d'un utilisateur, ou None
+
+    Les lectures concurrentes du même id partagent un seul appel, et celles
+    d'ids différents sont regroupées en une requête `in` par profile_loader.
+    """
+    return await profile_lookups.do(user_id, profile_loader.load, user_id)
+
+
+def build_profile_data(current_user: AuthenticatedUser, row: Optional[dict]) -> dict:
+    """
+    Combine les métadonnées de l'utilisateur authentifié et sa ligne user_profiles
+
+    Args:
+        current_user: Utilisateur authentifié
+        row: Ligne de la table user_profiles (prioritaire), ou None
+
+    Returns:
+        Données brutes du profil (created_at peut valoir None)
+    """
+    user_metadata = current_user.user_metadata
+    profile_data = {
+        "id": current_user.id,
+        "email": current_user.email,
+        "first_name": user_metadata.get("first_name", ""),
+        "last_name": user_metadata.get("last_name", ""),
+        "full_name": user_metadata.get("full_name", ""),
+        "phone": user_metadata.get("phone", ""),
+        "role": "user",
+        "created_at": current_user.created_at
+    }
+
+    # Si on a des données de profil depuis user_profiles, les fusionner
+    if row:
+        profile_data.update({key: value for key, value in row.items() if value is not None})
+    return profile_data
+
+
+def build_user_profile(current_user: AuthenticatedUser, row: Optional[dict]) -> UserProfile:
+    """Construit le UserProfile renvoyé par l'API"""
+    return UserProfile(**build_profile_data(current_user, row))
+
+
+def serialize_profile(profile: Union[UserProfile, PublicProfile]) -> CachedProfile:
+    """Sérialise le profil et calcule son ETag"""
+    body = profile.model_dump_json().encode()
+    return CachedProfile(profile=profile, body=body, etag=make_etag(body))
+
+
+async def cache_profile(profile: UserProfile, generation: int, broadcast: bool = False) -> CachedProfile:
+    """
+    Sérialise le profil, calcule son ETag et le met en cache
+
+    Args:
+        profile: Profil à mettre en cache
+        generation: profile_cache.generation(id) relevée avant la lecture (ou
+            la mise à jour) du profil ; s'il a été modifié depuis, le profil
+            n'est pas mis en cache
+        broadcast: Le profil vient d'être modifié : retirer l'ancienne
+            version des caches locaux des autres workers
+
+    Returns:
+        Le profil sérialisé (renvoyé au client, qu'il ait été mis en cache ou non)
+    """
+    entry = serialize_profile(profile)
+    await profile_cache.set(profile.id, entry, broadcast=broadcast, generation=generation)
+    return entry
+
+
+async def get_own_profile(current_user: AuthenticatedUser) -> CachedProfile:
+    """
+    Profil de l'utilisateur authentifié (GET /user/profile)
+
+    Lu dans profile_cache, sinon construit à partir de la ligne user_profiles
+    complétée par les métadonnées du token, puis mis en cache.
+    """
+    cached_profile = await profile_cache.get(current_user.id)
+    if cached_profile is not None:
+        return cached_profile
+
+    user_id = current_user.id
+
+    # Relevée avant la lecture : une mise à jour concurrente empêche la mise en cache de la ligne lue
+    generation = profile_cache.generation(user_id)
+
+    # Combiner les métadonnées du token et la ligne user_profiles
+    profile_data = build_profile_data(current_user, await load_profile_row(user_id))
+
+    # Token vérifié localement et aucun profil : la date de création vient de GoTrue
+    if profile_data["created_at"] is None:
+        supabase_service = clients.service
+        user_response = await run_auth(
+            "auth.admin.get_user_by_id", supabase_service.auth.admin.get_user_by_id, user_id
+        )
+        profile_data["created_at"] = user_response.user.created_at
+
+    return await cache_profile(UserProfile(**profile_data), generation)
+
+
+def profile_from_row(row: dict) -> UserProfile:
+    """Construit un UserProfile à partir de la seule ligne user_profiles"""
+    profile_data = {
+        "email": "",
+        "first_name": "",
+        "last_name": "",
+        "full_name": "",
+        "role": "user"
+    }
+    profile_data.update({key: value for key, value in row.items() if value is not None})
+    return UserProfile(**profile_data)
+
+
+async def get_profiles_by_ids(user_ids: List[str]) -> Dict[str, CachedProfile]:
+    """
+    Récupère plusieurs profils complets en une seule requête (administrateurs)
+
+    Les profils déjà dans profile_cache ne sont pas redemandés ; les autres
+    sont lus en une requête (user_profiles.select_by_ids) et ne sont pas mis
+    en cache : construits à partir de la seule ligne, ils différeraient de
+    ceux de GET /user/profile.
+
+    Args:
+        user_ids: Ids des utilisateurs (sans doublons)
+
+    Returns:
+        Profils trouvés (avec corps JSON et ETag), indexés par id
+    """
+    profiles = await profile_cache.get_many(user_ids)
+    missing_ids = [user_id for user_id in user_ids if user_id not in profiles]
+
+    if missing_ids:
+        rows = await user_profiles.select_by_ids("user_profiles.select_many", missing_ids, UserProfile)
+        profiles.update((row["id"], serialize_profile(profile_from_row(row))) for row in rows)
+
+    return profiles
+
+
+async def get_public_profiles_by_ids(user_ids: List[str]) -> Dict[str, CachedProfile]:
+    """
+    Récupère les projections publiques de plusieurs profils en une seule requête
+
+    Les profils déjà dans public_profile_cache ne sont pas redemandés ; les
+    autres sont lus en une requête, limitée aux colonnes de PublicProfile,
+    puis mis en cache.
+
+    Args:
+        user_ids: Ids des utilisateurs (sans doublons)
+
+    Returns:
+        Profils publics trouvés (avec corps JSON et ETag), indexés par id
+    """
+    profiles = await public_profile_cache.get_many(user_ids)
+    missing_ids = [user_id for user_id in user_ids if user_id not in profiles]
+
+    if missing_ids:
+        generations = {user_id: public_profile_cache.generation(user_id) for user_id in missing_ids}
+        rows = await user_profiles.select_by_ids("user_profiles.select_public", missing_ids, PublicProfile)
+        entries = {
+            row["id"]: serialize_profile(PublicProfile(**{key: value for key, value in row.items() if value is not None}))
+            for row in rows
+        }
+        await public_profile_cache.set_many(entries, generations)
+        profiles.update(entries)
+
+    return profiles
@@ -0,0 +1,134 @@
+"""
+Accès aux tables de l'API
+
+Chaque lecture projette exactement les colonnes du modèle pydantic qu'elle
+sert à construire (champs du modèle présents dans le schéma déclaré de la
+table, api/schemas) : une colonne ajoutée à la table n'alourdit ni les
+réponses de PostgREST ni leur décodage tant qu'aucun modèle ne l'utilise.
+`python -m api.schemas check` signale les requêtes `select("*")`.
+"""
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from api.helpers.clients import clients
+from api.helpers.database import postgres_reader
+from api.helpers.resilience import UpstreamUnavailable
+from api.helpers.upstream import run_postgrest
+from api.models import UserProfile
+from api.schemas import BaseSchema, UserProfileSchema
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def model_columns(model: Type[BaseModel], schema: Type[BaseSchema]) -> Tuple[str, ...]:
+    """
+    Colonnes de la table lues pour construire `model`
+
+    Les champs du modèle absents de la table (complétés à partir d'une autre
+    source, ex : les métadonnées du token) ne sont pas demandés.
+    """
+    table_columns = {column.name for column in schema.columns}
+    columns = tuple(name for name in model.model_fields if name in table_columns)
+    if not columns:
+        raise ValueError(f"{model.__name__} has no column in {schema.qualified_name()}")
+    return columns
+
+
+@lru_cache(maxsize=None)
+def rows_by_ids_query(schema: Type[BaseSchema], columns: Tuple[str, ...]) -> str:
+    """Lecture directe par ids : texte constant par modèle, préparé une fois par connexion"""
+    return f"SELECT {', '.join(columns)} FROM {schema.qualified_name()} WHERE id = ANY($1::uuid[])"
+
+
+class UserProfileRepository:
+    """
+    Requêtes sur user_profiles
+
+    Les lectures par id passent directement par Postgres quand le pool
+    asyncpg est disponible (PROFILE_READ_BACKEND=postgres), sinon (ou en cas
+    d'échec de la lecture directe) par PostgREST avec un unique filtre `in`.
+    """
+
+    schema = UserProfileSchema
+
+    def columns(self, model: Type[BaseModel]) -> Tuple[str, ...]:
+        return model_columns(model, self.schema)
+
+    async def select_by_ids(
+        self,
+        operation: str,
+        user_ids: List[str],
+        model: Type[BaseModel] = UserProfile
+    ) -> List[Dict[str, Any]]:
+        """
+        Lit les lignes d'un ensemble d'ids, limitées aux colonnes de `model`
+
+        Args:
+            operation: Nom d'opération (métriques, QueryPattern du schéma)
+            user_ids: Ids des utilisateurs
+            model: Modèle construit à partir des lignes
+        """
+        columns = self.columns(model)
+        if postgres_reader.available:
+            try:
+                return await postgres_reader.fetch(operation, rows_by_ids_query(self.schema, columns), user_ids)
+            except UpstreamUnavailable:
+                pass
+            except Exception as e:
+                logger.warning("Direct Postgres read failed, falling back to PostgREST: %s", e)
+
+        supabase_service = clients.service
+        response = await run_postgrest(
+            operation,
+            supabase_service.table("user_profiles").select(",".join(columns)).in_("id", user_ids).execute
+        )
+        return response.data or []
+
+    async def select_by_id(
+        self,
+        operation: str,
+        user_id: str,
+        model: Type[BaseModel] = UserProfile
+    ) -> Optional[Dict[str, Any]]:
+        """Lit la ligne d'un utilisateur limitée aux colonnes de `model`, ou None"""
+        rows = await self.select_by_ids(operation, [user_id], model)
+        return rows[0] if rows else None
+
+    async def update(
+        self,
+        user_id: str,
+        update_data: Dict[str, Any],
+        model: Type[BaseModel] = UserProfile
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Met à jour un profil (RPC update_user_profile, full_name calculé en base)
+
+        Returns:
+            La ligne mise à jour limitée aux colonnes de `model`, ou None si
+            l'utilisateur n'a pas de profil
+        """
+        supabase_service = clients.service
+        response = await run_postgrest(
+            "rpc.update_user_profile",
+            supabase_service.rpc("update_user_profile", {
+                "p_id": user_id,
+                **{f"p_{field}": value for field, value in update_data.items()}
+            }).select(",".join(self.columns(model))).execute
+        )
+        return response.data[0] if response.data else None
+
+    async def upsert(self, rows: List[Dict[str, Any]]) -> None:
+        """Crée ou met à jour des profils en une requête, sans relire les lignes écrites"""
+        supabase_service = clients.service
+        await run_postgrest(
+            "user_profiles.upsert",
+            supabase_service.table("user_profiles").upsert(rows, returning="minimal").execute
+        )
+
+
+# Dépôt global de user_profiles
+user_profiles = UserProfileRepository()
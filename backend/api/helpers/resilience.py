@@ -0,0 +1,170 @@
+"""
+Protection contre les défaillances des services Supabase (disjoncteur)
+"""
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from api.config import settings
+
+# États du disjoncteur
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class UpstreamUnavailable(Exception):
+    """
+    Service amont indisponible : disjoncteur ouvert ou délai dépassé
+
+    Convertie en réponse 503 avec un en-tête Retry-After (voir api/app.py).
+    """
+
+    def __init__(self, dependency: str, reason: str, retry_after: int = 1):
+        self.dependency = dependency
+        self.reason = reason
+        self.retry_after = max(1, retry_after)
+        super().__init__(f"{dependency} unavailable ({reason})")
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """
+    Indique si l'erreur traduit une défaillance du service amont
+
+    Seules les erreurs réseau, les délais dépassés et les réponses 5xx
+    comptent pour le disjoncteur ; une erreur métier (mot de passe invalide,
+    contrainte violée...) prouve au contraire que le service répond.
+    """
+    # Imports différés : le SDK est déjà chargé dès qu'un appel amont a eu lieu
+    import httpx
+    from supabase_auth.errors import AuthRetryableError
+
+    if isinstance(exc, (TimeoutError, httpx.TransportError, AuthRetryableError)):
+        return True
+    status = getattr(exc, "status", None)
+    if isinstance(status, int) and status >= 500:
+        return True
+    # postgrest.APIError : statut HTTP brut ou erreur de connexion PostgREST (PGRST0xx)
+    code = str(getattr(exc, "code", "") or "")
+    return (len(code) == 3 and code.startswith("5")) or code.startswith("PGRST0")
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur basé sur le taux d'échec d'un service amont
+
+    Le disjoncteur s'ouvre lorsque, sur les `window` dernières secondes, au
+    moins `min_calls` appels ont été faits et que la proportion d'échecs
+    atteint `failure_rate`. Ouvert, il rejette immédiatement les appels
+    pendant `reset_timeout` secondes, puis laisse passer un appel d'essai
+    (semi-ouvert) : un succès le referme, un échec le rouvre.
+
+    Utilisé depuis la boucle d'événements du worker uniquement.
+    """
+
+    def __init__(self, name: str, failure_rate: float, min_calls: int, window: float, reset_timeout: float):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self.rejected = 0
+
+    def _prune(self, now: float) -> None:
+        """Oublie les résultats sortis de la fenêtre glissante"""
+        while self._outcomes and self._outcomes[0][0] <= now - self.window:
+            _, failed = self._outcomes.popleft()
+            self._failures -= failed
+
+    def retry_after(self) -> int:
+        """Secondes avant le prochain appel d'essai"""
+        if self._opened_at is None:
+            return 1
+        remaining = self._opened_at + self.reset_timeout - time.monotonic()
+        return max(1, math.ceil(remaining))
+
+    def before_call(self) -> None:
+        """
+        Autorise ou rejette un appel
+
+        Raises:
+            UpstreamUnavailable: Disjoncteur ouvert (ou appel d'essai déjà en cours)
+        """
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                self.rejected += 1
+                raise UpstreamUnavailable(self.name, "circuit open", self.retry_after())
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected += 1
+                raise UpstreamUnavailable(self.name, "circuit half-open", 1)
+            self._trial_in_flight = True
+
+    def record(self, failed: bool) -> None:
+        """Enregistre le résultat d'un appel autorisé par before_call"""
+        now = time.monotonic()
+        if self.state == OPEN:
+            # Appel lancé avant l'ouverture : ne prolonge pas la coupure
+            return
+        if self.state == HALF_OPEN:
+            self._trial_in_flight = False
+            if failed:
+                self._open(now)
+            else:
+                self.state = CLOSED
+                self._opened_at = None
+            return
+
+        self._outcomes.append((now, failed))
+        self._failures += failed
+        self._prune(now)
+        calls = len(self._outcomes)
+        if failed and calls >= self.min_calls and self._failures / calls >= self.failure_rate:
+            self._open(now)
+
+    def release(self) -> None:
+        """Libère l'appel d'essai sans verdict (appel annulé)"""
+        self._trial_in_flight = False
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        self._failures = 0
+
+    def snapshot(self) -> Dict[str, object]:
+        """État exposé par le contrôle de santé"""
+        self._prune(time.monotonic())
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "calls": calls,
+            "failure_rate": self._failures / calls if calls else 0.0,
+            "rejected": self.rejected,
+            "retry_after": self.retry_after() if self.state == OPEN else None,
+        }
+
+
+def _build_breaker(name: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        failure_rate=settings.BREAKER_FAILURE_RATE,
+        min_calls=settings.BREAKER_MIN_CALLS,
+        window=settings.BREAKER_WINDOW,
+        reset_timeout=settings.BREAKER_RESET_TIMEOUT,
+    )
+
+
+# Disjoncteurs du worker, par dépendance amont
+breakers: Dict[str, CircuitBreaker] = {
+    "auth": _build_breaker("auth"),
+    "postgrest": _build_breaker("postgrest"),
+    "postgres": _build_breaker("postgres"),
+}
@@ -0,0 +1,49 @@
+"""
+Réponses JSON rapides
+"""
+import hashlib
+import inspect
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+
+class FastJSONResponse(JSONResponse):
+    """Réponse JSON sérialisée avec orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def has_native_json_serialization() -> bool:
+    """
+    Indique si FastAPI sérialise déjà les response_model directement en JSON (pydantic-core)
+
+    Les versions récentes de FastAPI n'utilisent ce chemin que lorsque la classe
+    de réponse par défaut n'a pas été remplacée : dans ce cas, FastJSONResponse
+    serait plus lente.
+    """
+    return "dump_json" in inspect.signature(serialize_response).parameters
+
+
+def make_etag(body: bytes) -> str:
+    """Calcule un ETag fort à partir du contenu sérialisé"""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Indique si l'en-tête If-None-Match correspond à l'ETag courant
+
+    Comparaison faible (RFC 9110 §13.1.2) : le préfixe W/ est ignoré.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
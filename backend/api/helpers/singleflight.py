@@ -0,0 +1,68 @@
+"""
+Regroupement des appels amont identiques concurrents (single-flight)
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from api.helpers.metrics import SINGLEFLIGHT_CALLS
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Partage un seul appel en vol entre les appelants concurrents d'une même clé
+
+    Le premier appelant lance l'appel dans une tâche ; les suivants attendent
+    son résultat (ou son exception) tant qu'il n'est pas terminé. L'annulation
+    d'un appelant n'annule pas l'appel partagé. Les compteurs `calls` et
+    `deduplicated` suivent les appels réellement lancés et ceux évités.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.deduplicated = 0
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """
+        Exécute `fn(*args, **kwargs)`, ou rejoint l'appel déjà en vol pour `key`
+
+        Args:
+            key: Clé identifiant l'appel (ex: id utilisateur)
+            fn: Fonction asynchrone à exécuter
+
+        Returns:
+            Le résultat de l'appel partagé
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.deduplicated += 1
+            SINGLEFLIGHT_CALLS.labels(self.name, "deduplicated").inc()
+            return await asyncio.shield(task)
+
+        self.calls += 1
+        SINGLEFLIGHT_CALLS.labels(self.name, "executed").inc()
+        task = asyncio.get_running_loop().create_task(fn(*args, **kwargs))
+        self._in_flight[key] = task
+        task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Retire l'appel terminé (son exception est lue même si plus personne n'attend)"""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def stats(self) -> Dict[str, int]:
+        """Retourne les compteurs du groupe"""
+        return {
+            "in_flight": len(self._in_flight),
+            "calls": self.calls,
+            "deduplicated": self.deduplicated,
+        }
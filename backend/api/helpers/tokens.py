@@ -0,0 +1,132 @@
+"""
+Vérification locale des tokens JWT Supabase
+"""
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional
+
+import jwt
+
+from api.config import settings
+from api.helpers.clients import clients
+
+logger = logging.getLogger(__name__)
+
+# Algorithmes acceptés pour chaque type de clé
+HMAC_ALGORITHMS = ["HS256"]
+ASYMMETRIC_ALGORITHMS = ["RS256", "ES256"]
+
+
+class TokenVerifier:
+    """
+    Vérifie les access tokens Supabase sans appel réseau
+
+    Les tokens HS256 sont validés avec le secret JWT du projet, les tokens
+    asymétriques avec le JWKS de GoTrue mis en cache et rafraîchi en tâche de fond.
+    `verify` retourne None lorsque la clé de signature est inconnue : l'appelant
+    doit alors se rabattre sur la vérification distante.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jwks: Dict[str, jwt.PyJWK] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    @property
+    def jwks_url(self) -> str:
+        return f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json"
+
+    def refresh_jwks(self) -> None:
+        """Recharge le JWKS depuis GoTrue (appel bloquant)"""
+        response = clients.http.get(self.jwks_url, headers={"apikey": settings.SUPABASE_ANON_KEY})
+        response.raise_for_status()
+        jwks = response.json()
+        keys = {}
+        # Projet HS256 uniquement : GoTrue publie un JWKS vide
+        if jwks.get("keys"):
+            for key in jwt.PyJWKSet.from_dict(jwks).keys:
+                if key.key_id:
+                    keys[key.key_id] = key
+        with self._lock:
+            self._jwks = keys
+
+    def _get_signing_key(self, header: dict):
+        """Retourne (clé, algorithmes) pour l'en-tête du token, ou None si la clé est inconnue"""
+        algorithm = header.get("alg")
+        if algorithm in HMAC_ALGORITHMS:
+            if not settings.SUPABASE_JWT_SECRET:
+                return None
+            return settings.SUPABASE_JWT_SECRET, HMAC_ALGORITHMS
+        if algorithm in ASYMMETRIC_ALGORITHMS:
+            with self._lock:
+                key = self._jwks.get(header.get("kid"))
+            if key is None:
+                return None
+            return key.key, [algorithm]
+        raise jwt.InvalidAlgorithmError(f"Unsupported algorithm: {algorithm}")
+
+    def verify(self, token: str) -> Optional[dict]:
+        """
+        Vérifie signature, expiration, audience et rôle du token
+
+        Args:
+            token: Access token JWT
+
+        Returns:
+            Claims du token, ou None si la clé de signature est inconnue
+
+        Raises:
+            jwt.InvalidTokenError: Token invalide, expiré ou rôle non autorisé
+        """
+        signing_key = self._get_signing_key(jwt.get_unverified_header(token))
+        if signing_key is None:
+            return None
+        key, algorithms = signing_key
+
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=algorithms,
+            audience=settings.AUTH_JWT_AUDIENCE,
+            leeway=settings.AUTH_JWT_LEEWAY,
+            options={"require": ["exp", "sub"]},
+        )
+        if claims.get("role") not in settings.AUTH_ALLOWED_ROLES:
+            raise jwt.InvalidTokenError("Role not allowed")
+        return claims
+
+    async def _refresh_loop(self) -> None:
+        """Rafraîchit le JWKS périodiquement sans bloquer la boucle d'événements"""
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh_jwks)
+            except Exception as e:
+                logger.warning("JWKS refresh failed: %s", e)
+            await asyncio.sleep(settings.AUTH_JWKS_REFRESH_INTERVAL)
+
+    def start(self) -> None:
+        """Démarre le rafraîchissement du JWKS en tâche de fond"""
+        if settings.AUTH_VERIFY_MODE != "local" or settings.AUTH_JWKS_REFRESH_INTERVAL <= 0:
+            return
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    def reset_after_fork(self) -> None:
+        """Oublie la tâche de rafraîchissement héritée (elle appartient à la boucle du parent)"""
+        self._lock = threading.Lock()
+        self._refresh_task = None
+
+    async def stop(self) -> None:
+        """Arrête la tâche de rafraîchissement"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+
+
+# Vérificateur global du worker
+token_verifier = TokenVerifier()
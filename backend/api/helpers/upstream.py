@@ -0,0 +1,143 @@
+"""
+Couche d'accès asynchrone aux services Supabase
+
+Le SDK Supabase utilisé par l'API est synchrone : chaque appel est exécuté
+dans un pool de threads borné pour ne jamais bloquer la boucle d'événements
+du worker uvicorn.
+
+Chaque dépendance (GoTrue, PostgREST) a son propre cloisonnement : nombre
+d'appels simultanés, délai maximal et disjoncteur. Un service lent ou en
+panne ne peut donc pas accaparer les threads ni les requêtes de l'autre.
+Un appel abandonné après son délai garde sa place dans la cloison jusqu'au
+retour de son thread : le nombre d'appels réellement en cours vers une
+dépendance ne dépasse jamais sa limite.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, TypeVar
+
+import anyio
+from anyio import to_thread
+
+from api.config import settings
+from api.helpers.metrics import observe_upstream
+from api.helpers.resilience import UpstreamUnavailable, breakers, is_upstream_failure
+
+T = TypeVar("T")
+
+# Dépendances amont
+AUTH = "auth"
+POSTGREST = "postgrest"
+# Niveau de cache partagé (api/helpers/cache.py) : appels bloquants, sans disjoncteur
+CACHE = "cache"
+
+_limiters: Dict[str, anyio.CapacityLimiter] = {}
+
+
+def get_limiter(dependency: str) -> anyio.CapacityLimiter:
+    """Retourne le limiteur (cloison) partagé par les appels du worker vers `dependency`"""
+    limiter = _limiters.get(dependency)
+    if limiter is None:
+        total = {
+            AUTH: settings.AUTH_MAX_CONCURRENCY,
+            POSTGREST: settings.POSTGREST_MAX_CONCURRENCY,
+        }.get(dependency, settings.SUPABASE_MAX_CONCURRENCY)
+        limiter = _limiters[dependency] = anyio.CapacityLimiter(total)
+    return limiter
+
+
+def reset_limiters() -> None:
+    """Oublie les limiteurs hérités du processus parent (liés à sa boucle d'événements)"""
+    _limiters.clear()
+
+
+def get_timeout(dependency: str) -> float:
+    """Délai maximal d'un appel vers `dependency`, attente d'un thread libre comprise"""
+    return {
+        AUTH: settings.AUTH_TIMEOUT,
+        POSTGREST: settings.POSTGREST_TIMEOUT,
+    }.get(dependency, settings.SUPABASE_HTTP_TIMEOUT)
+
+
+def _consume_abandoned_call(call: asyncio.Task) -> None:
+    """Lit l'exception d'un appel que plus personne n'attend (évite l'avertissement d'asyncio)"""
+    if not call.cancelled():
+        call.exception()
+
+
+async def run_upstream(
+    dependency: str,
+    operation: str,
+    fn: Callable[..., T],
+    *args: Any,
+    **kwargs: Any
+) -> T:
+    """
+    Exécute un appel bloquant du SDK Supabase dans le pool de threads borné
+
+    Args:
+        dependency: Service amont appelé (AUTH ou POSTGREST)
+        operation: Nom de l'opération (ex: "auth.get_user", "user_profiles.select")
+        fn: Fonction synchrone à exécuter
+
+    Returns:
+        Le résultat de `fn`
+
+    Raises:
+        UpstreamUnavailable: Disjoncteur ouvert ou délai de la dépendance dépassé
+    """
+    abandoned = threading.Event()
+
+    def timed_call() -> T:
+        # Abandonné avant d'obtenir une place : l'appel n'est pas lancé
+        if abandoned.is_set():
+            raise TimeoutError(f"{operation} abandoned before start")
+        # Mesure l'appel lui-même, hors attente d'un thread libre
+        start = time.perf_counter()
+        failed = False
+        try:
+            return fn(*args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            observe_upstream(dependency, operation, time.perf_counter() - start, failed)
+
+    breaker = breakers[dependency]
+    breaker.before_call()
+
+    # L'appel tourne dans une tâche protégée de l'annulation (shield) : au-delà
+    # du délai, la requête est libérée mais la tâche garde la place du thread
+    # dans la cloison jusqu'à son retour (borné par SUPABASE_HTTP_TIMEOUT)
+    call = asyncio.get_running_loop().create_task(
+        to_thread.run_sync(timed_call, limiter=get_limiter(dependency))
+    )
+    call.add_done_callback(_consume_abandoned_call)
+    try:
+        with anyio.fail_after(get_timeout(dependency)):
+            result = await asyncio.shield(call)
+    except TimeoutError:
+        abandoned.set()
+        breaker.record(failed=True)
+        raise UpstreamUnavailable(dependency, f"{operation} timed out")
+    except Exception as e:
+        breaker.record(failed=is_upstream_failure(e))
+        raise
+    except BaseException:
+        # Requête annulée par le client : aucun verdict sur la dépendance
+        abandoned.set()
+        breaker.release()
+        raise
+    breaker.record(failed=False)
+    return result
+
+
+async def run_auth(operation: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Exécute un appel GoTrue (auth) hors de la boucle d'événements"""
+    return await run_upstream(AUTH, operation, fn, *args, **kwargs)
+
+
+async def run_postgrest(operation: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Exécute un appel PostgREST hors de la boucle d'événements"""
+    return await run_upstream(POSTGREST, operation, fn, *args, **kwargs)
@@ -0,0 +1,59 @@
+"""
+Helpers de résolution des utilisateurs
+"""
+from typing import Optional
+
+from api.config import settings
+from api.helpers.auth import get_supabase_service_client
+from api.helpers.cache import TieredCache
+from api.helpers.cache_backends import shared_backend
+from api.helpers.singleflight import SingleFlight
+from api.helpers.upstream import run_postgrest
+
+# Cache email -> id utilisateur (seuls les utilisateurs trouvés sont mis en cache)
+email_lookup_cache = TieredCache(
+    "email_lookups",
+    maxsize=settings.EMAIL_LOOKUP_CACHE_SIZE,
+    ttl=settings.EMAIL_LOOKUP_CACHE_TTL,
+    encode=str.encode,
+    decode=bytes.decode,
+    backend=shared_backend
+)
+
+# Recherches par email en vol (évite les recherches dupliquées à l'expiration du cache)
+email_lookups = SingleFlight("rpc.get_user_id_by_email")
+
+
+def normalize_email(email: str) -> str:
+    """Normalise un email comme GoTrue (minuscules, sans espaces)"""
+    return email.strip().lower()
+
+
+async def find_user_id_by_email(email: str) -> Optional[str]:
+    """
+    Retourne l'id de l'utilisateur associé à un email
+
+    Utilise la fonction RPC `get_user_id_by_email` (recherche indexée sur
+    auth.users, voir seed-oja.sql) derrière un cache TTL borné.
+
+    Args:
+        email: Email de l'utilisateur
+
+    Returns:
+        Id de l'utilisateur, ou None s'il n'existe pas
+    """
+    email = normalize_email(email)
+    user_id = await email_lookup_cache.get(email)
+    if user_id is not None:
+        return user_id
+
+    supabase_service = get_supabase_service_client()
+    response = await email_lookups.do(
+        email,
+        run_postgrest, "rpc.get_user_id_by_email",
+        supabase_service.rpc("get_user_id_by_email", {"p_email": email}).execute
+    )
+    user_id = response.data or None
+    if user_id is not None:
+        await email_lookup_cache.set(email, user_id)
+    return user_id
@@ -1,16 +1,27 @@
 # API models package
-from .auth import SignupData, LoginData, OAuthCredentials
-from .user import ProfileUpdateData, UserProfile, UserResponse
-from .base import HealthCheck, APIResponse, ErrorResponse
+from .auth import SignupData, LoginData, RefreshData, OAuthCredentials, AuthenticatedUser
+from .user import ProfileUpdateData, UserProfile, PublicProfile, UserRole, UserResponse, AuthUser
+from .base import HealthCheck, DependencyHealth, ReadinessCheck, DependencyReadiness, APIResponse, ErrorResponse
+from .admin import ImportUserRow, ImportUserResult
 
 __all__ = [
     "SignupData",
     "LoginData", 
+    "RefreshData",
     "OAuthCredentials",
+    "AuthenticatedUser",
     "ProfileUpdateData",
     "UserProfile",
+    "PublicProfile",
+    "UserRole",
     "UserResponse",
+    "AuthUser",
     "HealthCheck",
+    "DependencyHealth",
+    "ReadinessCheck",
+    "DependencyReadiness",
     "APIResponse",
-    "ErrorResponse"
+    "ErrorResponse",
+    "ImportUserRow",
+    "ImportUserResult"
 ]
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""
+Modèles d'administration pour l'API
+"""
+from pydantic import BaseModel
+from typing import Optional
+
+
+class ImportUserRow(BaseModel):
+    """Modèle pour une ligne d'import d'utilisateurs (CSV ou NDJSON)"""
+    email: str
+    password: Optional[str] = None
+    first_name: str = ""
+    last_name: str = ""
+    phone: Optional[str] = None
+
+
+class ImportUserResult(BaseModel):
+    """Résultat de l'import d'une ligne"""
+    line: int
+    status: str  # "created", "profile_error" ou "error"
+    email: Optional[str] = None
+    id: Optional[str] = None
+    error: Optional[str] = None
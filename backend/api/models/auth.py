@@ -3,6 +3,7 @@ Modèles d'authentification pour l'API
 """
 from pydantic import BaseModel
 from typing import Optional
+from datetime import datetime
 
 
 class SignupData(BaseModel):
@@ -20,8 +21,46 @@ class LoginData(BaseModel):
     password: str
 
 
+class RefreshData(BaseModel):
+    """Modèle pour le renouvellement d'une session"""
+    refresh_token: str
+
+
 class OAuthCredentials(BaseModel):
     """Modèle pour l'authentification OAuth"""
     provider: str  # "google" ou "github"
     token: str
-    user_info: dict
\ No newline at end of file
+    user_info: dict
+
+
+class AuthenticatedUser(BaseModel):
+    """Utilisateur authentifié résolu une seule fois par requête à partir du token"""
+    id: str
+    email: str = ""
+    role: str = "authenticated"
+    user_metadata: dict = {}
+    app_metadata: dict = {}
+    created_at: Optional[datetime] = None
+    
+    @classmethod
+    def from_claims(cls, claims: dict) -> "AuthenticatedUser":
+        """Construit l'utilisateur à partir des claims d'un JWT vérifié localement"""
+        return cls(
+            id=claims["sub"],
+            email=claims.get("email") or "",
+            role=claims.get("role") or "authenticated",
+            user_metadata=claims.get("user_metadata") or {},
+            app_metadata=claims.get("app_metadata") or {}
+        )
+    
+    @classmethod
+    def from_user(cls, user) -> "AuthenticatedUser":
+        """Construit l'utilisateur à partir d'un objet User de GoTrue"""
+        return cls(
+            id=user.id,
+            email=user.email or "",
+            role=user.role or "authenticated",
+            user_metadata=user.user_metadata or {},
+            app_metadata=user.app_metadata or {},
+            created_at=user.created_at
+        )
@@ -2,13 +2,39 @@
 Modèles de base pour l'API
 """
 from pydantic import BaseModel
-from typing import Any, Optional
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class DependencyHealth(BaseModel):
+    """État du disjoncteur d'une dépendance amont (GoTrue, PostgREST)"""
+    state: str
+    calls: int
+    failure_rate: float
+    rejected: int
+    retry_after: Optional[int] = None
+
+
+class DependencyReadiness(BaseModel):
+    """Dernier résultat de la sonde d'une dépendance amont"""
+    ready: bool
+    circuit: str
+    latency_ms: Optional[float] = None
+    checked_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class ReadinessCheck(BaseModel):
+    """Modèle pour le contrôle de disponibilité (readiness) de l'API"""
+    status: str
+    dependencies: Dict[str, DependencyReadiness]
 
 
 class HealthCheck(BaseModel):
     """Modèle pour le contrôle de santé de l'API"""
     status: str
     message: str
+    dependencies: Optional[Dict[str, DependencyHealth]] = None
 
 
 class APIResponse(BaseModel):
@@ -1,7 +1,7 @@
 """
 Modèles utilisateur pour l'API
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 
@@ -26,8 +26,48 @@ class UserProfile(BaseModel):
     created_at: datetime
 
 
+class PublicProfile(BaseModel):
+    """
+    Projection publique d'un profil, renvoyée par GET /user/profiles pour
+    les profils des autres utilisateurs (sans email, téléphone ni rôle)
+    """
+    id: str
+    first_name: str = ""
+    last_name: str = ""
+    full_name: str = ""
+
+
+class UserRole(BaseModel):
+    """Rôle applicatif d'un utilisateur (user_profiles.role), lu par require_admin"""
+    role: str
+
+
+class AuthUser(BaseModel):
+    """
+    Modèle compact de l'utilisateur GoTrue renvoyé au frontend
+    
+    Ne contient que les champs utilisés par le frontend ; se valide
+    directement depuis les attributs d'un objet User de GoTrue.
+    """
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: str
+    email: Optional[str] = None
+    created_at: datetime
+    user_metadata: dict = {}
+
+
 class UserResponse(BaseModel):
-    """Modèle de réponse pour les données utilisateur"""
+    """
+    Modèle de réponse pour les données utilisateur
+    
+    Le refresh token permet d'obtenir un nouvel access token
+    (POST /api/auth/refresh) avant `expires_at` (timestamp Unix), sans
+    nouvelle vérification du mot de passe.
+    """
     access_token: str
-    user: dict
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+    expires_at: Optional[int] = None
+    user: Optional[AuthUser] = None
     profile: Optional[UserProfile] = None
\ No newline at end of file
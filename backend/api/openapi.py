@@ -0,0 +1,107 @@
+"""
+Schéma OpenAPI pré-généré
+
+Générer le schéma au build :
+    uv run python -m api.openapi openapi.json
+
+puis le charger au démarrage avec OPENAPI_SCHEMA_PATH=openapi.json : le
+premier appel à /openapi.json (ou /docs) ne reconstruit plus le schéma.
+
+Le fichier porte l'empreinte des routes et des modèles de l'application
+(`x-api-fingerprint`) : un schéma généré avant un changement de route ou de
+modèle est ignoré au démarrage au lieu d'être servi.
+"""
+import hashlib
+import inspect
+import json
+import logging
+import sys
+from importlib.metadata import version as package_version
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_KEY = "x-api-fingerprint"
+
+
+def schema_fingerprint(app: FastAPI) -> str:
+    """
+    Empreinte de ce qui détermine le schéma OpenAPI, sans le générer
+
+    Couvre la table des routes (chemin, méthodes, nom), le code source des
+    modules qui déclarent les routes et des modules de modèles chargés
+    (champs, descriptions, response_model), les métadonnées de
+    l'application et les versions de FastAPI et pydantic.
+    """
+    digest = hashlib.sha256()
+    for value in (app.title, app.version, app.description, app.openapi_url or "",
+                  package_version("fastapi"), package_version("pydantic")):
+        digest.update(f"{value}\0".encode())
+
+    modules = {name: module for name, module in sys.modules.items() if name.startswith("api.models") and module}
+    for route in app.routes:
+        if isinstance(route, APIRoute):
+            digest.update(f"{route.path}\0{sorted(route.methods)}\0{route.name}\0".encode())
+            module = inspect.getmodule(route.endpoint)
+            if module is not None:
+                modules[module.__name__] = module
+
+    for name in sorted(modules):
+        source_file = getattr(modules[name], "__file__", None)
+        if source_file:
+            with open(source_file, "rb") as handle:
+                digest.update(name.encode() + b"\0" + handle.read())
+    return digest.hexdigest()
+
+
+def build_schema(app: FastAPI) -> dict:
+    """Génère le schéma OpenAPI de l'application, avec son empreinte"""
+    return {**app.openapi(), FINGERPRINT_KEY: schema_fingerprint(app)}
+
+
+def load_prebuilt_schema(app: FastAPI, path: str) -> bool:
+    """
+    Charge un schéma OpenAPI pré-généré dans l'application
+
+    Le schéma est ignoré (et régénéré à la demande par FastAPI) s'il est
+    absent, illisible ou si son empreinte ne correspond plus aux routes et
+    aux modèles de l'application.
+
+    Returns:
+        True si le schéma a été chargé
+    """
+    try:
+        with open(path, "rb") as handle:
+            schema = json.load(handle)
+    except (OSError, ValueError) as e:
+        logger.warning("Prebuilt OpenAPI schema not loaded (%s): %s", path, e)
+        return False
+
+    if schema.get(FINGERPRINT_KEY) != schema_fingerprint(app):
+        logger.warning(
+            "Prebuilt OpenAPI schema ignored (%s): routes or models changed since it was generated", path
+        )
+        return False
+
+    # Remplace la génération à la demande (point d'extension documenté de FastAPI)
+    app.openapi_schema = schema
+    app.openapi = lambda: schema
+    return True
+
+
+def main() -> None:
+    """Écrit le schéma OpenAPI de l'application dans le fichier donné (ou sur la sortie standard)"""
+    from api.app import app
+
+    output = json.dumps(build_schema(app), separators=(",", ":"))
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "w") as handle:
+            handle.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
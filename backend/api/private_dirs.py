@@ -0,0 +1,64 @@
+"""
+Répertoires privés du déploiement (cache partagé shm, métriques multi-process)
+
+Ces répertoires contiennent des données auxquelles les workers font
+confiance (tokens validés, métriques agrégées) : un fichier créé ou
+modifiable par un autre utilisateur de l'hôte permettrait d'y placer de
+fausses entrées. Ils sont propres à l'utilisateur et au déploiement
+(répertoire de l'application), créés en 0700, et refusés s'ils
+appartiennent à un autre utilisateur ou sont modifiables par d'autres.
+
+Module sans dépendance vers le reste de l'API : gunicorn.conf.py l'importe
+dans le master avant le chargement de l'application.
+"""
+import hashlib
+import os
+import stat
+import tempfile
+
+# Répertoire de l'application (backend/) : identifie le déploiement
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def check_owned(path: str, info: os.stat_result) -> None:
+    """Refuse un fichier ou répertoire d'un autre utilisateur, ou modifiable par d'autres"""
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is owned by uid {info.st_uid}")
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"{path} is writable by other users")
+
+
+def ensure_private_dir(directory: str) -> str:
+    """Crée le répertoire en 0700 au besoin et vérifie qu'il est privé (sans suivre de lien)"""
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode):
+        raise PermissionError(f"{directory} is not a directory")
+    check_owned(directory, info)
+    return directory
+
+
+def ensure_private_file(path: str) -> None:
+    """Crée le fichier en 0600 (O_EXCL, sans suivre de lien) ou vérifie celui qui existe"""
+    try:
+        os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600))
+    except FileExistsError:
+        info = os.lstat(path)
+        if not stat.S_ISREG(info.st_mode):
+            raise PermissionError(f"{path} is not a regular file")
+        check_owned(path, info)
+
+
+def default_private_dir(name: str) -> str:
+    """
+    Chemin du répertoire privé `name` de l'utilisateur et du déploiement
+
+    En mémoire (/dev/shm) quand c'est possible ; deux déploiements sur le
+    même hôte ont chacun le leur.
+    """
+    root = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    deployment = hashlib.sha256(_APP_ROOT.encode()).hexdigest()[:12]
+    return os.path.join(root, f"{name}-{os.getuid()}-{deployment}")
@@ -1,8 +1,15 @@
 # API schemas package
-from .base import BaseSchema
-from .user import UserProfileSchema
+from .base import BaseSchema, Column, Index, QueryPattern
+from .user import UserProfileSchema, AuthUsersSchema
+from .registry import SchemaRegistry, registry
 
 __all__ = [
     "BaseSchema",
-    "UserProfileSchema"
+    "Column",
+    "Index",
+    "QueryPattern",
+    "UserProfileSchema",
+    "AuthUsersSchema",
+    "SchemaRegistry",
+    "registry"
 ]
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Outils du registre des schémas
+
+    uv run python -m api.schemas ddl                     # DDL complet des tables déclarées
+    uv run python -m api.schemas diff --database-url URL # Migration de la base vers l'état déclaré
+    uv run python -m api.schemas check                   # Index manquants ou inutiles, requêtes non indexées ou select("*")
+
+`diff` nécessite l'extra "postgres" (asyncpg) ; DATABASE_URL est utilisée
+par défaut. `check` se termine avec le code 1 si un problème est trouvé.
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+from api.config import settings
+from api.schemas.checks import check_queries, check_registry, scan_package
+from api.schemas.registry import registry
+
+API_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MIGRATION_HEADER = """-- Migration générée par `python -m api.schemas diff`
+-- Les index sont créés avec CONCURRENTLY : exécuter hors transaction (psql sans --single-transaction)
+"""
+
+
+async def _diff(database_url: str) -> str:
+    import asyncpg
+
+    connection = await asyncpg.connect(database_url, statement_cache_size=0)
+    try:
+        live = await registry.introspect(connection)
+    finally:
+        await connection.close()
+    statements = registry.diff(live)
+    if not statements:
+        return "-- Base à jour : aucune migration\n"
+    return MIGRATION_HEADER + "\n" + "\n\n".join(statements) + "\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("ddl", help="DDL complet des tables déclarées")
+    diff = commands.add_parser("diff", help="Migration d'une base existante vers l'état déclaré")
+    diff.add_argument("--database-url", default=settings.DATABASE_URL)
+    commands.add_parser("check", help="Vérifie les index et les projections des requêtes")
+    args = parser.parse_args()
+
+    if args.command == "ddl":
+        sys.stdout.write(registry.ddl())
+    elif args.command == "diff":
+        if not args.database_url:
+            parser.error("--database-url (ou DATABASE_URL) est requise")
+        sys.stdout.write(asyncio.run(_diff(args.database_url)))
+    else:
+        issues = check_registry(registry) + check_queries(registry, scan_package(API_ROOT))
+        for issue in issues:
+            print(issue)
+        if issues:
+            sys.exit(1)
+        print("Schema check passed")
+
+
+if __name__ == "__main__":
+    main()
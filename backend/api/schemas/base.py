@@ -1,27 +1,210 @@
 """
 Schémas de base pour l'application
+
+Une table est décrite de façon déclarative (colonnes, index, requêtes qui
+les utilisent) par une sous-classe de BaseSchema ; le DDL, les migrations
+(api/schemas/registry.py) et la vérification des index
+(api/schemas/checks.py) en sont dérivés.
 """
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Alias de types ramenés au nom canonique renvoyé par Postgres (format_type)
+TYPE_ALIASES = {
+    "timestamptz": "timestamp with time zone",
+    "timestamp": "timestamp without time zone",
+    "int": "integer",
+    "int4": "integer",
+    "int8": "bigint",
+    "bool": "boolean",
+    "varchar": "character varying",
+}
+
+
+def canonical_type(sql_type: str) -> str:
+    """Nom canonique d'un type SQL (ex : timestamptz -> timestamp with time zone)"""
+    sql_type = sql_type.strip().lower()
+    return TYPE_ALIASES.get(sql_type, sql_type)
+
+
+class Column(NamedTuple):
+    """Colonne d'une table"""
+    name: str
+    type: str
+    nullable: bool = True
+    default: Optional[str] = None
+    primary_key: bool = False
+    unique: bool = False
+    # Clé étrangère, ex : "auth.users (id) ON DELETE CASCADE"
+    references: Optional[str] = None
+
+    def definition(self) -> str:
+        """Définition SQL de la colonne (CREATE TABLE / ADD COLUMN)"""
+        parts = [self.name, self.type]
+        if self.primary_key:
+            parts.append("PRIMARY KEY")
+        elif not self.nullable:
+            parts.append("NOT NULL")
+        if self.unique:
+            parts.append("UNIQUE")
+        if self.default is not None:
+            parts.append(f"DEFAULT {self.default}")
+        if self.references:
+            parts.append(f"REFERENCES {self.references}")
+        return " ".join(parts)
+
+
+class Index(NamedTuple):
+    """
+    Index d'une table
+
+    `include` produit un index couvrant (INCLUDE), `where` un index partiel.
+    `serves` nomme les QueryPattern qui en ont besoin. Un index non géré
+    (`managed=False`) appartient à un autre service (ex : GoTrue) : il est
+    vérifié mais jamais créé par les migrations.
+    """
+    name: str
+    columns: Tuple[str, ...]
+    unique: bool = False
+    include: Tuple[str, ...] = ()
+    where: Optional[str] = None
+    method: str = "btree"
+    serves: Tuple[str, ...] = ()
+    managed: bool = True
+
+
+class QueryPattern(NamedTuple):
+    """
+    Forme d'une requête exécutée par l'API sur une table
+
+    `name` reprend le nom d'opération utilisé dans le code (run_postgrest,
+    métriques), ex : "user_profiles.select_role" ou "rpc.export_users".
+    """
+    name: str
+    filters: Tuple[str, ...] = ()
+    order_by: Tuple[str, ...] = ()
+    # Condition constante de la requête, à retrouver dans un index partiel
+    where: Optional[str] = None
+    # Colonnes lues (un index couvrant évite la lecture de la table)
+    columns: Tuple[str, ...] = ()
 
 
 class BaseSchema:
     """
     Classe de base pour tous les schémas de base de données
+
+    Les sous-classes déclarent leurs colonnes, leurs index et les requêtes
+    de l'API qui s'appuient sur ces index. Une table non gérée
+    (`managed = False`, ex : auth.users de GoTrue) n'est jamais créée :
+    seuls ses index déclarés gérés le sont.
     """
-    
+
+    schema_name: str = "public"
+    table_name: str = ""
+    managed: bool = True
+    columns: List[Column] = []
+    indexes: List[Index] = []
+    queries: List[QueryPattern] = []
+    # Types énumérés utilisés par la table : nom -> valeurs
+    enums: Dict[str, Tuple[str, ...]] = {}
+    # Trigger de mise à jour automatique de updated_at
+    update_trigger: bool = False
+
     @staticmethod
-    def get_common_fields() -> dict:
+    def get_common_fields() -> List[Column]:
         """Retourne les champs communs à toutes les tables"""
-        return {
-            "created_at": "timestamp with time zone DEFAULT timezone('utc'::text, now())",
-            "updated_at": "timestamp with time zone DEFAULT timezone('utc'::text, now())"
-        }
-    
+        return [
+            Column("created_at", "timestamp with time zone", nullable=False, default="now()"),
+            Column("updated_at", "timestamp with time zone", nullable=False, default="now()"),
+        ]
+
     @staticmethod
     def get_update_trigger_sql(table_name: str) -> str:
-        """Retourne le SQL pour créer un trigger de mise à jour automatique"""
-        return f"""
-        CREATE TRIGGER update_{table_name}_updated_at 
-            BEFORE UPDATE ON {table_name}
-            FOR EACH ROW 
-            EXECUTE FUNCTION update_updated_at_column();
-        """
\ No newline at end of file
+        """Retourne le SQL (idempotent) du trigger de mise à jour automatique de updated_at"""
+        trigger_name = f"update_{table_name.rsplit('.', 1)[-1]}_updated_at"
+        return f"""CREATE OR REPLACE FUNCTION public.update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = timezone('utc'::text, now());
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS {trigger_name} ON {table_name};
+CREATE TRIGGER {trigger_name}
+    BEFORE UPDATE ON {table_name}
+    FOR EACH ROW
+    EXECUTE FUNCTION public.update_updated_at_column();"""
+
+    @classmethod
+    def qualified_name(cls) -> str:
+        return f"{cls.schema_name}.{cls.table_name}"
+
+    @classmethod
+    def column(cls, name: str) -> Optional[Column]:
+        return next((column for column in cls.columns if column.name == name), None)
+
+    @classmethod
+    def all_indexes(cls) -> List[Index]:
+        """Index déclarés, y compris ceux créés par les contraintes PRIMARY KEY et UNIQUE"""
+        implicit = [
+            Index(
+                f"{cls.table_name}_pkey" if column.primary_key else f"{cls.table_name}_{column.name}_key",
+                (column.name,),
+                unique=True,
+                managed=cls.managed,
+            )
+            for column in cls.columns
+            if column.primary_key or column.unique
+        ]
+        return implicit + list(cls.indexes)
+
+    @classmethod
+    def create_enums_sql(cls) -> List[str]:
+        """SQL (idempotent) des types énumérés de la table"""
+        statements = []
+        for name, values in cls.enums.items():
+            labels = ", ".join(f"'{value}'" for value in values)
+            statements.append(
+                "DO $$\nBEGIN\n"
+                f"    IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = '{name}') THEN\n"
+                f"        CREATE TYPE {name} AS ENUM ({labels});\n"
+                "    END IF;\nEND\n$$;"
+            )
+        return statements
+
+    @classmethod
+    def create_table_sql(cls) -> str:
+        """Retourne le SQL de création de la table"""
+        definitions = ",\n".join(f"    {column.definition()}" for column in cls.columns)
+        return f"CREATE TABLE IF NOT EXISTS {cls.qualified_name()} (\n{definitions}\n);"
+
+    @classmethod
+    def create_index_sql(cls, index: Index, concurrently: bool = False) -> str:
+        """Retourne le SQL de création d'un index"""
+        parts = ["CREATE"]
+        if index.unique:
+            parts.append("UNIQUE")
+        parts.append("INDEX")
+        if concurrently:
+            parts.append("CONCURRENTLY")
+        parts.append(f"IF NOT EXISTS {index.name} ON {cls.qualified_name()}")
+        if index.method != "btree":
+            parts.append(f"USING {index.method}")
+        parts.append(f"({', '.join(index.columns)})")
+        if index.include:
+            parts.append(f"INCLUDE ({', '.join(index.include)})")
+        if index.where:
+            parts.append(f"WHERE {index.where}")
+        return " ".join(parts) + ";"
+
+    @classmethod
+    def ddl(cls) -> List[str]:
+        """Instructions SQL complètes (idempotentes) de la table, de ses index et de son trigger"""
+        statements = []
+        if cls.managed:
+            statements.extend(cls.create_enums_sql())
+            statements.append(cls.create_table_sql())
+        statements.extend(cls.create_index_sql(index) for index in cls.indexes if index.managed)
+        if cls.managed and cls.update_trigger:
+            statements.append(cls.get_update_trigger_sql(cls.qualified_name()))
+        return statements
@@ -0,0 +1,193 @@
+"""
+Vérification des index au regard des requêtes de l'API
+
+- Chaque QueryPattern déclaré doit être servi par un index de sa table
+  (colonnes de tête, prédicat de l'index partiel).
+- Chaque index géré doit servir au moins une requête déclarée.
+- Les requêtes PostgREST du code (`.table("t").eq("col", ...)...`) sont
+  relevées par analyse syntaxique : une requête dont aucun filtre ne porte
+  sur la colonne de tête d'un index (parcours complet de la table) est
+  signalée, ainsi que les appels RPC sans QueryPattern déclaré.
+- Une requête qui lit toutes les colonnes (`select("*")`, ou `select()`
+  sans argument) est signalée : chaque requête projette les colonnes du
+  modèle qu'elle construit (api/helpers/repositories.py).
+"""
+import ast
+import os
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Type
+
+from api.schemas.base import BaseSchema, Index, QueryPattern
+from api.schemas.registry import SchemaRegistry, normalize_predicate
+
+# Méthodes du query builder PostgREST qui filtrent ou trient sur une colonne
+FILTER_METHODS = {
+    "eq", "neq", "gt", "gte", "lt", "lte", "in_", "like", "ilike",
+    "is_", "contains", "contained_by", "filter", "order",
+}
+
+
+class QueryUse(NamedTuple):
+    """Requête relevée dans le code"""
+    path: str
+    line: int
+    table: Optional[str]
+    rpc: Optional[str]
+    columns: Tuple[str, ...]
+    # select("*") ou select() : toutes les colonnes sont lues
+    selects_all: bool = False
+
+
+def _chain(node: ast.AST) -> List[ast.Call]:
+    """Appels de méthode d'une chaîne `a.b(...).c(...)`, du premier au dernier"""
+    calls = []
+    while True:
+        if isinstance(node, ast.Call):
+            calls.append(node)
+            node = node.func
+        elif isinstance(node, ast.Attribute):
+            node = node.value
+        else:
+            return calls[::-1]
+
+
+def _string_argument(call: ast.Call) -> Optional[str]:
+    if call.args and isinstance(call.args[0], ast.Constant) and isinstance(call.args[0].value, str):
+        return call.args[0].value
+    return None
+
+
+def _selects_all(call: ast.Call) -> bool:
+    """L'appel `.select(...)` lit toutes les colonnes (projection absente ou `*`)"""
+    if not call.args:
+        return True
+    return any(
+        isinstance(argument, ast.Constant) and isinstance(argument.value, str)
+        and "*" in (column.strip() for column in argument.value.split(","))
+        for argument in call.args
+    )
+
+
+def scan_source(source: str, path: str = "<string>") -> List[QueryUse]:
+    """Relève les requêtes `.table(...)` et `.rpc(...)` d'un module Python"""
+    uses = []
+    seen = set()
+    for node in ast.walk(ast.parse(source, path)):
+        if not isinstance(node, (ast.Call, ast.Attribute)) or id(node) in seen:
+            continue
+        calls = _chain(node)
+        # Ne traite que la chaîne la plus longue (ses sous-chaînes sont visitées ensuite)
+        for call in calls:
+            seen.add(id(call))
+            seen.add(id(call.func))
+        for position, call in enumerate(calls):
+            method = call.func.attr if isinstance(call.func, ast.Attribute) else None
+            if method not in ("table", "rpc"):
+                continue
+            name = _string_argument(call)
+            if name is None:
+                continue
+            columns = tuple(
+                column
+                for later in calls[position + 1:]
+                if isinstance(later.func, ast.Attribute) and later.func.attr in FILTER_METHODS
+                for column in [_string_argument(later)]
+                if column is not None
+            )
+            selects_all = any(
+                isinstance(later.func, ast.Attribute) and later.func.attr == "select" and _selects_all(later)
+                for later in calls[position + 1:]
+            )
+            uses.append(QueryUse(
+                path=path,
+                line=call.lineno,
+                table=name if method == "table" else None,
+                rpc=name if method == "rpc" else None,
+                columns=columns,
+                selects_all=selects_all,
+            ))
+            break
+    return uses
+
+
+def scan_package(root: str) -> List[QueryUse]:
+    """Relève les requêtes de tous les modules d'un répertoire"""
+    uses = []
+    for directory, _, files in os.walk(root):
+        for filename in sorted(files):
+            if filename.endswith(".py"):
+                path = os.path.join(directory, filename)
+                with open(path, encoding="utf-8") as handle:
+                    uses.extend(scan_source(handle.read(), path))
+    return uses
+
+
+def index_serves(index: Index, pattern: QueryPattern) -> bool:
+    """
+    Indique si un index peut servir une requête
+
+    Les filtres doivent correspondre aux colonnes de tête de l'index (dans
+    n'importe quel ordre), le tri aux colonnes suivantes, et le prédicat
+    d'un index partiel doit être celui de la requête.
+    """
+    if not pattern.filters and not pattern.order_by:
+        return False
+    if index.where is not None and normalize_predicate(index.where) != normalize_predicate(pattern.where):
+        return False
+    count = len(pattern.filters)
+    if set(index.columns[:count]) != set(pattern.filters):
+        return False
+    return tuple(index.columns[count:count + len(pattern.order_by)]) == pattern.order_by
+
+
+def _is_indexed(schema: Type[BaseSchema], column: str) -> bool:
+    """La colonne est la colonne de tête d'un index complet (non partiel) de la table"""
+    return any(index.columns[0] == column and index.where is None for index in schema.all_indexes())
+
+
+def check_registry(registry: SchemaRegistry) -> List[str]:
+    """Vérifie que les requêtes déclarées sont servies et que les index gérés sont utiles"""
+    issues = []
+    for name, schema in registry.schemas.items():
+        indexes = schema.all_indexes()
+        patterns = {pattern.name: pattern for pattern in schema.queries}
+        for pattern in schema.queries:
+            if not any(index_serves(index, pattern) for index in indexes):
+                issues.append(f"{name}: query {pattern.name} is not served by any index")
+        for index in schema.indexes:
+            for served in index.serves:
+                pattern = patterns.get(served)
+                if pattern is None:
+                    issues.append(f"{name}: index {index.name} serves undeclared query {served}")
+                elif not index_serves(index, pattern):
+                    issues.append(f"{name}: index {index.name} cannot serve query {served}")
+            if index.managed and not index.serves:
+                issues.append(f"{name}: index {index.name} serves no declared query")
+    return issues
+
+
+def check_queries(registry: SchemaRegistry, uses: Iterable[QueryUse]) -> List[str]:
+    """Signale les requêtes du code qui parcourraient toute la table, liraient toutes ses colonnes ou ne sont pas déclarées"""
+    issues = []
+    declared_rpcs = {
+        pattern.name[len("rpc."):]
+        for schema in registry.schemas.values()
+        for pattern in schema.queries
+        if pattern.name.startswith("rpc.")
+    }
+    for use in uses:
+        location = f"{use.path}:{use.line}"
+        if use.selects_all:
+            issues.append(f"{location}: {use.table or use.rpc} selects every column, project the model's columns")
+        if use.rpc is not None:
+            if use.rpc not in declared_rpcs:
+                issues.append(f"{location}: rpc {use.rpc} has no declared QueryPattern")
+            continue
+        schema = registry.get(use.table)
+        if schema is None:
+            issues.append(f"{location}: table {use.table} is not declared in the schema registry")
+            continue
+        if use.columns and not any(_is_indexed(schema, column) for column in use.columns):
+            issues.append(
+                f"{location}: {use.table} filtered on unindexed column(s) {', '.join(use.columns)}"
+            )
+    return issues
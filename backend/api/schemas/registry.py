@@ -0,0 +1,246 @@
+"""
+Registre des schémas déclaratifs et génération des migrations
+
+Le registre produit le DDL complet des tables déclarées et, à partir de
+l'état d'une base existante (introspection via asyncpg, extra "postgres"),
+les instructions de migration qui l'amènent à l'état déclaré.
+"""
+import re
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple, Type
+
+from api.schemas.base import BaseSchema, Index, canonical_type
+from api.schemas.user import AuthUsersSchema, UserProfileSchema
+
+if TYPE_CHECKING:
+    import asyncpg
+
+
+class LiveColumn(NamedTuple):
+    type: str
+    nullable: bool
+
+
+class LiveIndex(NamedTuple):
+    name: str
+    columns: Tuple[str, ...]
+    include: Tuple[str, ...]
+    unique: bool
+    where: Optional[str]
+    method: str
+
+
+class LiveTable(NamedTuple):
+    columns: Dict[str, LiveColumn]
+    indexes: Dict[str, LiveIndex]
+    triggers: Tuple[str, ...]
+
+
+class LiveSchema(NamedTuple):
+    """État d'une base existante pour les tables du registre"""
+    tables: Dict[str, LiveTable]
+    enums: Dict[str, Tuple[str, ...]]
+
+
+_COLUMNS_QUERY = """
+SELECT n.nspname || '.' || c.relname AS table_name, a.attname AS name,
+       format_type(a.atttypid, a.atttypmod) AS type, NOT a.attnotnull AS nullable
+FROM pg_attribute a
+JOIN pg_class c ON c.oid = a.attrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname || '.' || c.relname = ANY($1::text[]) AND a.attnum > 0 AND NOT a.attisdropped
+"""
+
+_INDEXES_QUERY = """
+SELECT n.nspname || '.' || t.relname AS table_name, i.relname AS name, ix.indisunique AS unique,
+       ix.indnkeyatts AS key_count, am.amname AS method,
+       ARRAY(
+           SELECT pg_get_indexdef(ix.indexrelid, k, true)
+           FROM generate_series(1, ix.indnatts) AS k ORDER BY k
+       ) AS columns,
+       pg_get_expr(ix.indpred, ix.indrelid, true) AS predicate
+FROM pg_index ix
+JOIN pg_class i ON i.oid = ix.indexrelid
+JOIN pg_class t ON t.oid = ix.indrelid
+JOIN pg_namespace n ON n.oid = t.relnamespace
+JOIN pg_am am ON am.oid = i.relam
+WHERE n.nspname || '.' || t.relname = ANY($1::text[])
+"""
+
+_TRIGGERS_QUERY = """
+SELECT n.nspname || '.' || c.relname AS table_name, tg.tgname AS name
+FROM pg_trigger tg
+JOIN pg_class c ON c.oid = tg.tgrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname || '.' || c.relname = ANY($1::text[]) AND NOT tg.tgisinternal
+"""
+
+_ENUMS_QUERY = """
+SELECT t.typname AS name, array_agg(e.enumlabel ORDER BY e.enumsortorder) AS labels
+FROM pg_type t JOIN pg_enum e ON e.enumtypid = t.oid
+WHERE t.typname = ANY($1::text[])
+GROUP BY t.typname
+"""
+
+
+def normalize_predicate(predicate: Optional[str]) -> Optional[str]:
+    """Normalise un prédicat d'index partiel (parenthèses, casts et casse ignorés)"""
+    if predicate is None:
+        return None
+    predicate = re.sub(r"::[\w ]+", "", predicate.lower())
+    predicate = re.sub(r"[()\s]+", " ", predicate)
+    return predicate.strip()
+
+
+def index_matches(declared: Index, live: LiveIndex) -> bool:
+    """Indique si un index existant correspond à sa déclaration"""
+    return (
+        tuple(declared.columns) == live.columns
+        and tuple(declared.include) == live.include
+        and declared.unique == live.unique
+        and declared.method == live.method
+        and normalize_predicate(declared.where) == normalize_predicate(live.where)
+    )
+
+
+class SchemaRegistry:
+    """Ensemble des tables déclarées (BaseSchema)"""
+
+    def __init__(self):
+        self.schemas: Dict[str, Type[BaseSchema]] = {}
+
+    def register(self, schema: Type[BaseSchema]) -> Type[BaseSchema]:
+        self.schemas[schema.qualified_name()] = schema
+        return schema
+
+    def get(self, table_name: str) -> Optional[Type[BaseSchema]]:
+        """Retourne le schéma d'une table (nom qualifié ou table de public)"""
+        return self.schemas.get(table_name) or self.schemas.get(f"public.{table_name}")
+
+    def ddl(self) -> str:
+        """DDL complet et idempotent des tables du registre"""
+        statements = [statement for schema in self.schemas.values() for statement in schema.ddl()]
+        return "\n\n".join(statements) + "\n"
+
+    async def introspect(self, connection: "asyncpg.Connection") -> LiveSchema:
+        """Lit l'état des tables du registre dans une base existante"""
+        names = list(self.schemas)
+        enum_names = [name for schema in self.schemas.values() for name in schema.enums]
+
+        tables: Dict[str, LiveTable] = {}
+        for row in await connection.fetch(_COLUMNS_QUERY, names):
+            table = tables.setdefault(row["table_name"], LiveTable({}, {}, ()))
+            table.columns[row["name"]] = LiveColumn(canonical_type(row["type"]), row["nullable"])
+        for row in await connection.fetch(_INDEXES_QUERY, names):
+            columns = tuple(row["columns"])
+            tables[row["table_name"]].indexes[row["name"]] = LiveIndex(
+                name=row["name"],
+                columns=columns[:row["key_count"]],
+                include=columns[row["key_count"]:],
+                unique=row["unique"],
+                where=row["predicate"],
+                method=row["method"],
+            )
+        for row in await connection.fetch(_TRIGGERS_QUERY, names):
+            table = tables[row["table_name"]]
+            tables[row["table_name"]] = table._replace(triggers=table.triggers + (row["name"],))
+
+        enums = {row["name"]: tuple(row["labels"]) for row in await connection.fetch(_ENUMS_QUERY, enum_names)}
+        return LiveSchema(tables=tables, enums=enums)
+
+    def diff(self, live: LiveSchema) -> List[str]:
+        """
+        Instructions de migration de la base `live` vers l'état déclaré
+
+        Les index sont créés avec CONCURRENTLY (sans bloquer les écritures),
+        donc hors transaction. Les changements destructifs ou coûteux
+        (changement de type, index non déclaré) sont signalés en commentaire
+        et laissés à la revue.
+        """
+        statements: List[str] = []
+        for name, schema in self.schemas.items():
+            table = live.tables.get(name)
+
+            if schema.managed:
+                for enum_name, values in schema.enums.items():
+                    live_values = live.enums.get(enum_name)
+                    if live_values is None:
+                        statements.extend(
+                            statement for statement in schema.create_enums_sql() if f"TYPE {enum_name} " in statement
+                        )
+                        continue
+                    statements.extend(
+                        f"ALTER TYPE {enum_name} ADD VALUE IF NOT EXISTS '{value}';"
+                        for value in values if value not in live_values
+                    )
+
+            if table is None:
+                if schema.managed:
+                    statements.extend(schema.ddl()[len(schema.enums):])
+                else:
+                    statements.append(f"-- {name} is missing (managed by another service)")
+                continue
+
+            for column in schema.columns:
+                live_column = table.columns.get(column.name)
+                if live_column is None:
+                    if schema.managed:
+                        statements.append(f"ALTER TABLE {name} ADD COLUMN IF NOT EXISTS {column.definition()};")
+                    else:
+                        statements.append(f"-- {name}.{column.name} is missing (managed by another service)")
+                    continue
+                if canonical_type(column.type) != live_column.type:
+                    statements.append(
+                        f"-- review: {name}.{column.name} is {live_column.type}, declared {column.type}\n"
+                        f"-- ALTER TABLE {name} ALTER COLUMN {column.name} TYPE {column.type};"
+                    )
+                if not column.primary_key and column.nullable != live_column.nullable and schema.managed:
+                    action = "DROP NOT NULL" if column.nullable else "SET NOT NULL"
+                    statements.append(f"ALTER TABLE {name} ALTER COLUMN {column.name} {action};")
+
+            statements.extend(self._diff_indexes(schema, table))
+
+            if schema.managed and schema.update_trigger:
+                trigger_name = f"update_{schema.table_name}_updated_at"
+                if trigger_name not in table.triggers:
+                    statements.append(schema.get_update_trigger_sql(name))
+        return statements
+
+    def _diff_indexes(self, schema: Type[BaseSchema], table: LiveTable) -> List[str]:
+        statements = []
+        matched = set()
+        for index in schema.all_indexes():
+            live_index = table.indexes.get(index.name)
+            if live_index is None:
+                # Index de contrainte nommé autrement : même structure suffit
+                live_index = next(
+                    (candidate for candidate in table.indexes.values() if index_matches(index, candidate)), None
+                )
+            if live_index is not None:
+                matched.add(live_index.name)
+                if index_matches(index, live_index):
+                    continue
+                if index.managed and index in schema.indexes:
+                    statements.append(f"DROP INDEX CONCURRENTLY IF EXISTS {schema.schema_name}.{index.name};")
+                    statements.append(schema.create_index_sql(index, concurrently=True))
+                else:
+                    statements.append(f"-- review: index {index.name} does not match its declaration")
+                continue
+            if index.managed and index in schema.indexes:
+                statements.append(schema.create_index_sql(index, concurrently=True))
+            else:
+                statements.append(f"-- missing index {index.name} on {schema.qualified_name()} (not created by migrations)")
+
+        if schema.managed:
+            for live_index in table.indexes.values():
+                if live_index.name not in matched:
+                    statements.append(
+                        f"-- undeclared index {live_index.name}: declare it or "
+                        f"DROP INDEX CONCURRENTLY {schema.schema_name}.{live_index.name};"
+                    )
+        return statements
+
+
+# Registre global des tables de l'API
+registry = SchemaRegistry()
+registry.register(UserProfileSchema)
+registry.register(AuthUsersSchema)
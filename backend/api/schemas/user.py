@@ -1,60 +1,100 @@
 """
 Schémas de base de données pour les utilisateurs
 """
-from typing import Optional
-from datetime import datetime
+from api.schemas.base import BaseSchema, Column, Index, QueryPattern
 
 
-class UserProfileSchema:
+class UserProfileSchema(BaseSchema):
     """
     Schéma pour la table user_profiles dans Supabase
-    
-    Cette classe définit la structure attendue des données
-    dans la table user_profiles de Supabase.
+
+    Cette classe définit la structure attendue des données dans la table
+    user_profiles (voir .setup/supabase-setup/seed-oja.sql), les index et
+    les requêtes de l'API qui s'appuient sur eux.
     """
-    
+
     table_name = "user_profiles"
-    
-    fields = {
-        "id": "uuid PRIMARY KEY",  # Référence à auth.users.id
-        "first_name": "text",
-        "last_name": "text", 
-        "full_name": "text",
-        "phone": "text",
-        "role": "text DEFAULT 'user'",
-        "created_at": "timestamp with time zone DEFAULT timezone('utc'::text, now())",
-        "updated_at": "timestamp with time zone DEFAULT timezone('utc'::text, now())"
+    update_trigger = True
+
+    enums = {
+        "user_role": ("user", "mod", "admin", "superadmin"),
     }
-    
-    @staticmethod
-    def create_table_sql() -> str:
-        """Retourne le SQL pour créer la table user_profiles"""
-        return f"""
-        CREATE TABLE IF NOT EXISTS {UserProfileSchema.table_name} (
-            id uuid REFERENCES auth.users(id) ON DELETE CASCADE PRIMARY KEY,
-            first_name text,
-            last_name text,
-            full_name text,
-            phone text,
-            role text DEFAULT 'user',
-            created_at timestamp with time zone DEFAULT timezone('utc'::text, now()),
-            updated_at timestamp with time zone DEFAULT timezone('utc'::text, now())
-        );
-        
-        -- Index sur l'email pour les recherches rapides
-        CREATE INDEX IF NOT EXISTS idx_user_profiles_role ON {UserProfileSchema.table_name}(role);
-        
-        -- Trigger pour mettre à jour updated_at automatiquement
-        CREATE OR REPLACE FUNCTION update_updated_at_column()
-        RETURNS TRIGGER AS $$
-        BEGIN
-            NEW.updated_at = timezone('utc'::text, now());
-            RETURN NEW;
-        END;
-        $$ language 'plpgsql';
-        
-        CREATE TRIGGER update_user_profiles_updated_at 
-            BEFORE UPDATE ON {UserProfileSchema.table_name}
-            FOR EACH ROW 
-            EXECUTE FUNCTION update_updated_at_column();
-        """
\ No newline at end of file
+
+    columns = [
+        Column("id", "uuid", primary_key=True, references="auth.users (id) ON DELETE CASCADE"),
+        Column("username", "text", unique=True),
+        Column("first_name", "text"),
+        Column("last_name", "text"),
+        Column("full_name", "text"),
+        Column("email", "text", unique=True),
+        Column("phone", "text"),
+        Column("role", "user_role", nullable=False, default="'user'"),
+        *BaseSchema.get_common_fields(),
+    ]
+
+    # Requêtes de l'API sur user_profiles (noms d'opération de run_postgrest / PostgresReader)
+    queries = [
+        # GET /user/profile et GET /user/profiles (lectures regroupées par id)
+        QueryPattern("user_profiles.select_batch", filters=("id",)),
+        QueryPattern("user_profiles.select_many", filters=("id",)),
+        QueryPattern("user_profiles.select_public", filters=("id",)),
+        # require_admin, à chaque requête d'administration
+        QueryPattern("user_profiles.select_role", filters=("id",), columns=("role",)),
+        # PUT /user/profile
+        QueryPattern("rpc.update_user_profile", filters=("id",)),
+        # Import : upsert sur la clé primaire
+        QueryPattern("user_profiles.upsert", filters=("id",)),
+    ]
+
+    indexes = [
+        # Index couvrant : le rôle est lu par un index-only scan, sans accès à la table
+        Index(
+            "user_profiles_id_role_idx",
+            ("id",),
+            include=("role",),
+            serves=("user_profiles.select_role",),
+        ),
+    ]
+
+
+class AuthUsersSchema(BaseSchema):
+    """
+    Table auth.users, gérée par GoTrue
+
+    Seuls les index dont dépendent les fonctions RPC de l'API sont déclarés.
+    """
+
+    schema_name = "auth"
+    table_name = "users"
+    managed = False
+
+    columns = [
+        Column("id", "uuid", primary_key=True),
+        Column("email", "character varying(255)"),
+        Column("is_sso_user", "boolean", nullable=False, default="false"),
+        Column("created_at", "timestamp with time zone"),
+    ]
+
+    queries = [
+        # Connexion OAuth : résolution email -> id (get_user_id_by_email)
+        QueryPattern("rpc.get_user_id_by_email", filters=("email",), where="is_sso_user = false", columns=("id",)),
+        # Export keyset sur (created_at, id) (export_users)
+        QueryPattern("rpc.export_users", order_by=("created_at", "id")),
+    ]
+
+    indexes = [
+        # Index unique partiel créé par GoTrue
+        Index(
+            "users_email_partial_key",
+            ("email",),
+            unique=True,
+            where="is_sso_user = false",
+            serves=("rpc.get_user_id_by_email",),
+            managed=False,
+        ),
+        Index(
+            "users_created_at_id_idx",
+            ("created_at", "id"),
+            serves=("rpc.export_users",),
+        ),
+    ]
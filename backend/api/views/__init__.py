@@ -2,9 +2,11 @@
 from .auth import router as auth_router
 from .user import router as user_router
 from .base import router as base_router
+from .admin import router as admin_router
 
 __all__ = [
     "auth_router",
     "user_router", 
-    "base_router"
+    "base_router",
+    "admin_router"
 ]
\ No newline at end of file
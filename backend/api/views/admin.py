@@ -0,0 +1,259 @@
+"""
+Routes d'administration
+"""
+import asyncio
+import csv
+import io
+import json
+import tempfile
+from itertools import islice
+from typing import AsyncIterator, Iterator, List, Tuple
+
+import anyio
+from anyio import to_thread
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from starlette.background import BackgroundTask
+
+from api.models import ImportUserRow, ImportUserResult
+from api.helpers import (
+    require_admin,
+    get_supabase_service_client,
+    run_auth,
+    run_postgrest,
+    generate_random_password,
+    construct_full_name,
+    user_profiles,
+    normalize_email
+)
+from api.config import settings
+
+# Créer le routeur pour l'administration
+router = APIRouter(
+    prefix=f"{settings.API_PREFIX}/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)]
+)
+
+
+async def _export_users_ndjson(page_size: int) -> AsyncIterator[bytes]:
+    """
+    Génère les utilisateurs en NDJSON, une page keyset à la fois
+
+    La page suivante n'est demandée qu'une fois la précédente envoyée au
+    client : la mémoire utilisée reste bornée à une page, et un client lent
+    ralentit l'export au lieu de le faire s'accumuler en mémoire.
+    """
+    supabase_service = get_supabase_service_client()
+    after_created_at = None
+    after_id = None
+    
+    while True:
+        response = await run_postgrest(
+            "rpc.export_users",
+            supabase_service.rpc("export_users", {
+                "p_after_created_at": after_created_at,
+                "p_after_id": after_id,
+                "p_limit": page_size
+            }).execute
+        )
+        rows = response.data or []
+        if not rows:
+            return
+        
+        yield "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows).encode()
+        
+        if len(rows) < page_size:
+            return
+        after_created_at = rows[-1]["created_at"]
+        after_id = rows[-1]["id"]
+
+
+@router.get(
+    "/users/export",
+    summary="Export users",
+    description="Stream every user with its user_profiles row as NDJSON (keyset pagination on created_at, id)",
+    response_class=StreamingResponse
+)
+async def export_users():
+    """Exporter tous les utilisateurs en flux NDJSON"""
+    return StreamingResponse(
+        _export_users_ndjson(settings.EXPORT_PAGE_SIZE),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="users.ndjson"'}
+    )
+
+
+def _read_import_rows(upload, is_csv: bool) -> Iterator[Tuple[int, object]]:
+    """
+    Lit le fichier importé ligne par ligne
+
+    Yields:
+        (numéro de ligne, ImportUserRow) ou (numéro de ligne, message d'erreur)
+    """
+    text = io.TextIOWrapper(upload, encoding="utf-8", newline="")
+    if is_csv:
+        reader = csv.DictReader(text)
+        records = ((reader.line_num, record) for record in reader)
+    else:
+        records = ((line_number, line) for line_number, line in enumerate(text, start=1) if line.strip())
+    
+    for line_number, record in records:
+        try:
+            if not is_csv:
+                record = json.loads(record)
+            yield line_number, ImportUserRow(**record)
+        except (ValueError, TypeError, ValidationError) as e:
+            yield line_number, f"Invalid row: {e}"
+
+
+# Lignes lues et validées par passage dans le pool de threads
+IMPORT_READ_BATCH = 256
+
+
+async def _iter_import_rows(upload, is_csv: bool) -> AsyncIterator[Tuple[int, object]]:
+    """Lit et valide les lignes importées par paquets, hors de la boucle d'événements"""
+    rows = _read_import_rows(upload, is_csv)
+    while True:
+        chunk = await to_thread.run_sync(lambda: list(islice(rows, IMPORT_READ_BATCH)))
+        if not chunk:
+            return
+        for item in chunk:
+            yield item
+
+
+async def _create_import_user(line_number: int, row: ImportUserRow) -> Tuple[ImportUserResult, dict]:
+    """Crée un utilisateur via l'API admin et retourne son résultat et sa ligne de profil"""
+    email = normalize_email(row.email)
+    full_name = construct_full_name(row.first_name, row.last_name)
+    user_metadata = {
+        "first_name": row.first_name,
+        "last_name": row.last_name,
+        "full_name": full_name,
+        "phone": row.phone
+    }
+    try:
+        supabase_service = get_supabase_service_client()
+        user_response = await run_auth("auth.admin.create_user", supabase_service.auth.admin.create_user, {
+            "email": email,
+            "password": row.password or generate_random_password(),
+            "email_confirm": True,
+            "user_metadata": user_metadata
+        })
+    except Exception as e:
+        return ImportUserResult(line=line_number, status="error", email=email, error=str(e)), None
+    
+    user_id = user_response.user.id
+    profile_row = {"id": user_id, "email": email, **user_metadata}
+    return ImportUserResult(line=line_number, status="created", email=email, id=user_id), profile_row
+
+
+async def _flush_import_batch(batch: List[Tuple[ImportUserResult, dict]]) -> bytes:
+    """Upsert les profils d'un lot en une requête et retourne les résultats NDJSON du lot"""
+    try:
+        await user_profiles.upsert([profile_row for _, profile_row in batch])
+    except Exception as e:
+        for result, _ in batch:
+            result.status = "profile_error"
+            result.error = str(e)
+    return "".join(result.model_dump_json(exclude_none=True) + "\n" for result, _ in batch).encode()
+
+
+async def _import_users_ndjson(upload, is_csv: bool) -> AsyncIterator[bytes]:
+    """
+    Importe les utilisateurs avec au plus IMPORT_CONCURRENCY créations simultanées
+
+    Les résultats sont émis au fil de l'eau ; les profils des utilisateurs
+    créés sont upsertés par lots de IMPORT_BATCH_SIZE avant l'émission de
+    leurs résultats.
+    """
+    pending = set()
+    batch = []
+    
+    async def collect(tasks) -> AsyncIterator[bytes]:
+        for task in tasks:
+            result, profile_row = task.result()
+            if profile_row is None:
+                yield (result.model_dump_json(exclude_none=True) + "\n").encode()
+                continue
+            batch.append((result, profile_row))
+            if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                yield await _flush_import_batch(batch)
+                batch.clear()
+    
+    try:
+        async for line_number, row in _iter_import_rows(upload, is_csv):
+            if isinstance(row, str):
+                result = ImportUserResult(line=line_number, status="error", error=row)
+                yield (result.model_dump_json(exclude_none=True) + "\n").encode()
+                continue
+            
+            if len(pending) >= settings.IMPORT_CONCURRENCY:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                async for chunk in collect(done):
+                    yield chunk
+            pending.add(asyncio.create_task(_create_import_user(line_number, row)))
+        
+        if pending:
+            done, pending = await asyncio.wait(pending)
+            async for chunk in collect(done):
+                yield chunk
+        if batch:
+            yield await _flush_import_batch(batch)
+    finally:
+        # Client déconnecté : aucune nouvelle création n'est lancée, mais celles déjà
+        # envoyées à GoTrue ne peuvent pas être annulées ; elles sont attendues
+        if pending:
+            with anyio.CancelScope(shield=True):
+                await asyncio.wait(pending)
+
+
+def _import_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+        detail=f"Import too large (max {settings.IMPORT_MAX_SIZE} bytes)"
+    )
+
+
+@router.post(
+    "/users/import",
+    summary="Import users",
+    description=(
+        "Create users in bulk from a CSV (Content-Type: text/csv) or NDJSON upload "
+        "(columns: email, password, first_name, last_name, phone). "
+        "Streams one NDJSON result per row"
+    ),
+    response_class=StreamingResponse
+)
+async def import_users(request: Request):
+    """Importer des utilisateurs en masse"""
+    is_csv = request.headers.get("content-type", "").startswith("text/csv")
+    
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.IMPORT_MAX_SIZE:
+        raise _import_too_large()
+    
+    # Le corps est lu en flux vers un fichier temporaire (en mémoire puis sur disque)
+    # avant de commencer la réponse : la réponse en flux et la lecture du corps
+    # ne peuvent pas se partager le canal ASGI `receive`. Les écritures (sur disque
+    # au-delà de IMPORT_SPOOL_MAX_SIZE) sont faites dans le pool de threads
+    upload = tempfile.SpooledTemporaryFile(max_size=settings.IMPORT_SPOOL_MAX_SIZE, mode="w+b")
+    try:
+        spool = anyio.wrap_file(upload)
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.IMPORT_MAX_SIZE:
+                raise _import_too_large()
+            await spool.write(chunk)
+        await spool.seek(0)
+    except BaseException:
+        upload.close()
+        raise
+    
+    return StreamingResponse(
+        _import_users_ndjson(upload, is_csv),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(upload.close)
+    )
@@ -1,17 +1,45 @@
 """
 Routes d'authentification
 """
+from typing import TYPE_CHECKING
+
 from fastapi import APIRouter, HTTPException, status
-from supabase_auth import SignUpWithPasswordCredentials
 
-from api.models import SignupData, LoginData, OAuthCredentials, UserResponse, APIResponse, UserProfile
-from api.helpers import get_supabase_service_client, generate_random_password, extract_oauth_user_info
+from api.models import SignupData, LoginData, RefreshData, OAuthCredentials, UserResponse, APIResponse, UserProfile, AuthUser
+from api.helpers import (
+    get_supabase_service_client,
+    get_supabase_session_client,
+    generate_random_password,
+    extract_oauth_user_info,
+    run_auth,
+    refresh_session,
+    find_user_id_by_email,
+    normalize_email,
+    email_lookup_cache,
+    UpstreamUnavailable
+)
 from api.config import settings
 
+if TYPE_CHECKING:
+    from supabase_auth import SignUpWithPasswordCredentials
+    from supabase_auth.types import AuthResponse
+
 # Créer le routeur pour l'authentification
 router = APIRouter(prefix=f"{settings.API_PREFIX}/auth", tags=["Auth"])
 
 
+def _session_response(response: "AuthResponse") -> UserResponse:
+    """Construit la réponse de connexion : access token, refresh token et expiration de la session"""
+    session = response.session
+    return UserResponse(
+        access_token=session.access_token,
+        refresh_token=session.refresh_token,
+        expires_in=session.expires_in,
+        expires_at=session.expires_at,
+        user=AuthUser.model_validate(response.user) if response.user else None
+    )
+
+
 @router.post(
     "/signup",
     response_model=APIResponse,
@@ -21,7 +49,7 @@ router = APIRouter(prefix=f"{settings.API_PREFIX}/auth", tags=["Auth"])
 async def signup(signup_data: SignupData):
     """Inscription d'un nouvel utilisateur"""
     try:
-        supabase_service = get_supabase_service_client()
+        auth_client = get_supabase_session_client()
         
         # Préparer le nom complet
         full_name = f"{signup_data.first_name} {signup_data.last_name}"
@@ -40,12 +68,14 @@ async def signup(signup_data: SignupData):
             }
         }
         
-        user_response = supabase_service.auth.sign_up(user_credentials)
+        user_response = await run_auth("auth.sign_up", auth_client.sign_up, user_credentials)
         
         return APIResponse(
             message="User created successfully", 
-            data={"user": user_response.user}
+            data={"user": AuthUser.model_validate(user_response.user) if user_response.user else None}
         )
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -74,23 +104,27 @@ async def oauth_login(oauth_data: OAuthCredentials):
                 detail="Email not found in OAuth user info"
             )
         
-        # Vérifier si l'utilisateur existe déjà
+        # Vérifier si l'utilisateur existe déjà (recherche indexée par email)
         existing_user = None
         try:
-            users_response = supabase_service.auth.admin.list_users()
-            if users_response:
-                existing_user = next(
-                    (user for user in users_response if user.email == email),
-                    None
+            existing_user_id = await find_user_id_by_email(email)
+            if existing_user_id:
+                user_response = await run_auth(
+                    "auth.admin.get_user_by_id", supabase_service.auth.admin.get_user_by_id, existing_user_id
                 )
+                existing_user = user_response.user
+        except UpstreamUnavailable:
+            raise
         except Exception:
-            pass  # Continue avec la création si la recherche échoue
+            # Entrée de cache périmée (utilisateur supprimé) ou recherche en échec
+            await email_lookup_cache.invalidate(normalize_email(email))
+            existing_user = None  # Continue avec la création si la recherche échoue
         
         if existing_user:
             # Utilisateur existant, créer une session
             return UserResponse(
                 access_token=f"oauth_temp_token_{existing_user.id}",
-                user=existing_user.__dict__,
+                user=AuthUser.model_validate(existing_user),
                 profile=UserProfile(
                     id=existing_user.id,
                     email=existing_user.email or "",
@@ -120,7 +154,9 @@ async def oauth_login(oauth_data: OAuthCredentials):
                 }
             }
             
-            user_response = supabase_service.auth.sign_up(user_credentials)
+            user_response = await run_auth(
+                "auth.sign_up", get_supabase_session_client().sign_up, user_credentials
+            )
             
             if not user_response.user:
                 raise HTTPException(
@@ -130,7 +166,7 @@ async def oauth_login(oauth_data: OAuthCredentials):
             
             return UserResponse(
                 access_token=f"oauth_temp_token_{user_response.user.id}",
-                user=user_response.user.__dict__,
+                user=AuthUser.model_validate(user_response.user),
                 profile=UserProfile(
                     id=user_response.user.id,
                     email=email,
@@ -143,6 +179,8 @@ async def oauth_login(oauth_data: OAuthCredentials):
                 )
             )
                 
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -159,8 +197,8 @@ async def oauth_login(oauth_data: OAuthCredentials):
 async def login(login_data: LoginData):
     """Connexion d'un utilisateur"""
     try:
-        supabase_service = get_supabase_service_client()
-        response = supabase_service.auth.sign_in_with_password({
+        auth_client = get_supabase_session_client()
+        response = await run_auth("auth.sign_in_with_password", auth_client.sign_in_with_password, {
             "email": login_data.email,
             "password": login_data.password,
         })
@@ -171,12 +209,35 @@ async def login(login_data: LoginData):
                 detail="Login failed"
             )
             
-        return UserResponse(
-            access_token=response.session.access_token,
-            user=response.user.__dict__ if response.user else {}
-        )
+        return _session_response(response)
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
-        )
\ No newline at end of file
+        )
+
+
+@router.post(
+    "/refresh",
+    response_model=UserResponse,
+    summary="Refresh session",
+    description="Exchange a refresh token for a new access token and refresh token, without re-entering the password"
+)
+async def refresh(refresh_data: RefreshData):
+    """Renouvellement de la session d'un utilisateur à partir de son refresh token"""
+    try:
+        response = await refresh_session(refresh_data.refresh_token)
+    except UpstreamUnavailable:
+        raise
+    except Exception:
+        response = None
+    
+    # Token inconnu, déjà utilisé ou révoqué : le client doit se reconnecter
+    if not response or not response.session or not response.session.access_token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+    return _session_response(response)
\ No newline at end of file
@@ -1,8 +1,12 @@
 """
 Routes de base de l'API
 """
-from fastapi import APIRouter
-from api.models import HealthCheck
+from fastapi import APIRouter, HTTPException, Response, status
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+from api.models import HealthCheck, DependencyHealth, ReadinessCheck
+from api.helpers import render_metrics, breakers, readiness_probe
+from api.config import settings
 
 # Créer le routeur pour les routes de base
 router = APIRouter(tags=["Base"])
@@ -21,8 +25,61 @@ def read_root():
     description="Check the health status of the API"
 )
 def health_check():
-    """Contrôle de santé de l'API"""
+    """Contrôle de santé de l'API (avec l'état des disjoncteurs du worker)"""
+    dependencies = {
+        name: DependencyHealth(**breaker.snapshot()) for name, breaker in breakers.items()
+    }
+    open_dependencies = [name for name, dependency in dependencies.items() if dependency.state != "closed"]
+    if open_dependencies:
+        return HealthCheck(
+            status="degraded",
+            message=f"Circuit open for: {', '.join(open_dependencies)}",
+            dependencies=dependencies
+        )
     return HealthCheck(
         status="healthy",
-        message="API is running normally"
-    )
\ No newline at end of file
+        message="API is running normally",
+        dependencies=dependencies
+    )
+
+
+@router.get(
+    "/live",
+    summary="Liveness probe",
+    description="Constant-time check that the worker process is serving requests (no upstream calls)"
+)
+def liveness():
+    """Contrôle de vivacité : le worker répond"""
+    return {"status": "alive"}
+
+
+@router.get(
+    "/ready",
+    response_model=ReadinessCheck,
+    summary="Readiness probe",
+    description="Last cached state of the GoTrue and PostgREST background probes; 503 when a dependency is not ready",
+    responses={503: {"model": ReadinessCheck}}
+)
+def readiness():
+    """Contrôle de disponibilité à partir des sondes en cache (aucun appel amont)"""
+    check = ReadinessCheck(status="ready", dependencies=readiness_probe.snapshot())
+    if all(dependency.ready for dependency in check.dependencies.values()):
+        return check
+    check.status = "not_ready"
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=check.model_dump(mode="json")
+    )
+
+
+@router.get(
+    "/metrics",
+    summary="Prometheus metrics",
+    description="Request and Supabase upstream metrics in Prometheus text format, aggregated across workers",
+    response_class=Response
+)
+def metrics():
+    """Métriques Prometheus de l'API"""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
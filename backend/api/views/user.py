@@ -1,16 +1,47 @@
 """
 Routes utilisateur
 """
-from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.security import HTTPAuthorizationCredentials
+import asyncio
+import uuid
+from typing import List, Union
 
-from api.models import ProfileUpdateData, UserProfile, APIResponse
-from api.helpers import verify_token, get_supabase_service_client, security
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, Response
+
+from api.models import ProfileUpdateData, UserProfile, PublicProfile, APIResponse, AuthenticatedUser
+from api.helpers import (
+    verify_token,
+    has_admin_role,
+    get_supabase_service_client,
+    run_auth,
+    user_profiles,
+    profile_cache,
+    public_profile_cache,
+    cache_profile,
+    build_user_profile,
+    get_own_profile,
+    get_profiles_by_ids,
+    get_public_profiles_by_ids,
+    construct_full_name,
+    make_etag,
+    etag_matches,
+    UpstreamUnavailable
+)
 from api.config import settings
 
 # Créer le routeur pour les utilisateurs
 router = APIRouter(prefix=f"{settings.API_PREFIX}/user", tags=["User"])
 
+# Les profils sont privés et doivent être revalidés (If-None-Match) à chaque usage
+PROFILE_CACHE_CONTROL = "private, no-cache"
+
+
+def _conditional_json_response(request: Request, body: bytes, etag: str) -> Response:
+    """Répond 304 si le client possède déjà cette version, sinon renvoie le corps pré-sérialisé"""
+    headers = {"ETag": etag, "Cache-Control": PROFILE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 
 @router.get(
     "/me",
@@ -26,112 +57,162 @@ async def get_current_user():
 
 @router.get(
     "/profile",
-    dependencies=[Depends(verify_token)],
     response_model=UserProfile,
     summary="Get user profile",
     description="Retrieve the profile information of the currently authenticated user"
 )
-async def get_profile(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Récupérer le profil de l'utilisateur actuel"""
+async def get_profile(request: Request, current_user: AuthenticatedUser = Depends(verify_token)):
+    """Récupérer le profil de l'utilisateur actuel (ETag / If-None-Match)"""
     try:
-        supabase_service = get_supabase_service_client()
-        
-        # Récupérer l'utilisateur actuel
-        user_response = supabase_service.auth.get_user(credentials.credentials)
-        if not user_response or not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
-            )
-        user_id = user_response.user.id
-        
-        # Récupérer le profil depuis la table user_profiles
-        profile_response = supabase_service.table("user_profiles").select("*").eq("id", user_id).execute()
-        
-        # Récupérer les métadonnées utilisateur depuis auth
-        user_metadata = user_response.user.user_metadata if user_response.user.user_metadata else {}
-        
-        # Combiner les données de profil
-        profile_data = {
-            "id": user_id,
-            "email": user_response.user.email or "",
-            "first_name": user_metadata.get("first_name", ""),
-            "last_name": user_metadata.get("last_name", ""),
-            "full_name": user_metadata.get("full_name", ""),
-            "phone": user_metadata.get("phone", ""),
-            "role": "user",
-            "created_at": user_response.user.created_at
-        }
-        
-        # Si on a des données de profil depuis user_profiles, les fusionner
-        if profile_response.data:
-            profile_data.update(profile_response.data[0])
-            
-        return UserProfile(**profile_data)
+        cached_profile = await get_own_profile(current_user)
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    
+    return _conditional_json_response(request, cached_profile.body, cached_profile.etag)
 
 
 @router.put(
     "/profile",
-    dependencies=[Depends(verify_token)],
     response_model=APIResponse,
     summary="Update user profile",
     description="Update the profile information of the currently authenticated user"
 )
 async def update_profile(
     profile_data: ProfileUpdateData, 
-    credentials: HTTPAuthorizationCredentials = Depends(security)
+    current_user: AuthenticatedUser = Depends(verify_token)
 ):
     """Mettre à jour le profil de l'utilisateur"""
     try:
         supabase_service = get_supabase_service_client()
+        user_id = current_user.id
+        
+        # Préparer les données de mise à jour
+        update_data = profile_data.model_dump(exclude_none=True)
+        if not update_data:
+            return APIResponse(message="Profile updated successfully")
+        
+        user_metadata = dict(update_data)
+        # Prénom ou nom modifié sans full_name : le full_name des métadonnées auth
+        # est celui calculé en base (les métadonnées du token peuvent dater d'avant
+        # une mise à jour précédente)
+        derive_full_name = "full_name" not in update_data and (
+            "first_name" in update_data or "last_name" in update_data
+        )
         
-        # Récupérer l'utilisateur actuel
-        user_response = supabase_service.auth.get_user(credentials.credentials)
-        if not user_response or not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
+        await profile_cache.invalidate(user_id)
+        generation = profile_cache.generation(user_id)
+        
+        def update_auth_metadata():
+            return run_auth(
+                "auth.admin.update_user_by_id",
+                supabase_service.auth.admin.update_user_by_id,
+                user_id,
+                {"user_metadata": user_metadata}
             )
-        user_id = user_response.user.id
         
-        # Préparer les données de mise à jour
-        update_data = {}
-        if profile_data.first_name is not None:
-            update_data["first_name"] = profile_data.first_name
-        if profile_data.last_name is not None:
-            update_data["last_name"] = profile_data.last_name
-        if profile_data.full_name is not None:
-            update_data["full_name"] = profile_data.full_name
-        if profile_data.phone is not None:
-            update_data["phone"] = profile_data.phone
-            
-        # Si full_name n'est pas fourni mais first_name ou last_name l'est, le construire
-        if "full_name" not in update_data and ("first_name" in update_data or "last_name" in update_data):
-            # Récupérer les données actuelles pour compléter les champs manquants
-            current_user_data = supabase_service.table("user_profiles").select("*").eq("id", user_id).execute()
-            if current_user_data.data:
-                current_data = current_user_data.data[0]
-                first_name = update_data.get("first_name", current_data.get("first_name", ""))
-                last_name = update_data.get("last_name", current_data.get("last_name", ""))
-                update_data["full_name"] = f"{first_name} {last_name}".strip()
+        # Une seule requête pour user_profiles (full_name calculé en base, colonnes de
+        # UserProfile renvoyées) ; les métadonnées auth sont mises à jour en parallèle,
+        # ou après la ligne quand elles reprennent son full_name
+        if derive_full_name:
+            profile_row = await user_profiles.update(user_id, update_data, UserProfile)
+            if profile_row:
+                user_metadata["full_name"] = profile_row["full_name"]
+            else:
+                # Sans profil : seules les métadonnées du token sont connues
+                user_metadata["full_name"] = construct_full_name(
+                    update_data.get("first_name", current_user.user_metadata.get("first_name")),
+                    update_data.get("last_name", current_user.user_metadata.get("last_name"))
+                )
+            await update_auth_metadata()
+        else:
+            profile_row, _ = await asyncio.gather(
+                user_profiles.update(user_id, update_data, UserProfile),
+                update_auth_metadata()
+            )
         
-        # Mettre à jour les métadonnées utilisateur dans auth
-        if update_data:
-            supabase_service.auth.update_user({
-                "data": update_data
-            })
-            
-            # Mettre à jour le profil utilisateur dans user_profiles
-            supabase_service.table("user_profiles").update(update_data).eq("id", user_id).execute()
+        # Write-through : le cache reçoit directement la ligne mise à jour
+        profile = None
+        if profile_row:
+            # Une autre mise à jour concurrente du profil remplace l'écriture par une invalidation
+            entry = await cache_profile(build_user_profile(current_user, profile_row), generation, broadcast=True)
+            profile = entry.profile
+        else:
+            await profile_cache.invalidate(user_id)
+        # Invalidée après l'écriture : une lecture en vol de l'ancienne ligne n'est pas mise en cache
+        await public_profile_cache.invalidate(user_id)
         
-        return APIResponse(message="Profile updated successfully")
+        return APIResponse(message="Profile updated successfully", data=profile)
+    except UpstreamUnavailable:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get(
+    "/profiles",
+    response_model=List[Union[UserProfile, PublicProfile]],
+    summary="Get user profiles in bulk",
+    description=(
+        "Retrieve several user profiles in a single request (comma-separated ids). "
+        "Other users' profiles are limited to their public fields unless the caller is an admin"
+    )
+)
+async def get_profiles(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated user ids"),
+    current_user: AuthenticatedUser = Depends(verify_token)
+):
+    """
+    Récupérer plusieurs profils utilisateur en une seule requête (ETag / If-None-Match)
+    
+    Le profil de l'utilisateur authentifié est complet (comme GET /profile) ;
+    ceux des autres utilisateurs sont limités à leur projection publique,
+    sauf pour les administrateurs.
+    """
+    # Dédoublonner en conservant l'ordre demandé
+    user_ids = list(dict.fromkeys(user_id.strip() for user_id in ids.split(",") if user_id.strip()))
+    
+    if len(user_ids) > settings.PROFILE_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many ids (max {settings.PROFILE_BATCH_MAX_SIZE})"
+        )
+    try:
+        user_ids = [str(uuid.UUID(user_id)) for user_id in user_ids]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid user id"
+        )
+    
+    try:
+        profiles = {}
+        if current_user.id in user_ids:
+            profiles[current_user.id] = await get_own_profile(current_user)
+        other_ids = [user_id for user_id in user_ids if user_id != current_user.id]
+        if other_ids:
+            if await has_admin_role(current_user.id):
+                profiles.update(await get_profiles_by_ids(other_ids))
+            else:
+                profiles.update(await get_public_profiles_by_ids(other_ids))
+    except UpstreamUnavailable:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
-        )
\ No newline at end of file
+        )
+    
+    # Corps et ETag assemblés à partir des profils déjà sérialisés
+    entries = [profiles[user_id] for user_id in user_ids if user_id in profiles]
+    body = b"[" + b",".join(entry.body for entry in entries) + b"]"
+    etag = make_etag("".join(entry.etag for entry in entries).encode())
+    return _conditional_json_response(request, body, etag)
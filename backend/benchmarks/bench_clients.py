@@ -0,0 +1,50 @@
+"""
+Micro-benchmark : client Supabase créé à chaque requête vs registre partagé
+
+Usage:
+    python -m benchmarks.bench_clients [--iterations 500]
+"""
+import argparse
+import json
+
+from benchmarks.common import configure_env, summarize, time_calls
+from benchmarks.stub import SupabaseStub
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    with SupabaseStub() as stub:
+        configure_env(stub.url)
+
+        from supabase import create_client
+        from api.config import settings
+        from api.helpers.clients import SupabaseClientRegistry
+
+        def per_request():
+            client = create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+            client.auth.get_user("bench-token")
+
+        registry = SupabaseClientRegistry()
+        registry.open()
+
+        def pooled():
+            registry.service.auth.get_user("bench-token")
+
+        try:
+            results = {
+                "create_client_per_request": summarize(time_calls(per_request, args.iterations)),
+                "pooled_registry": summarize(time_calls(pooled, args.iterations)),
+            }
+        finally:
+            registry.close()
+
+    saved = results["create_client_per_request"]["p50_ms"] - results["pooled_registry"]["p50_ms"]
+    results["p50_saved_ms"] = saved
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
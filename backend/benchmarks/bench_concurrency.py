@@ -0,0 +1,107 @@
+"""
+Benchmark de concurrence : débit de GET /api/user/profile selon le nombre de requêtes en vol
+
+Le stand-in Supabase répond avec une latence fixe. Avec les appels du SDK
+exécutés dans la boucle d'événements, le débit reste plafonné à ~1/latence ;
+avec la couche api/helpers/upstream.py il croît avec le nombre de requêtes
+en vol jusqu'à SUPABASE_MAX_CONCURRENCY. `--threads 1` reproduit le
+comportement sérialisé.
+
+Chaque requête porte le token d'un utilisateur différent, et le cache des
+profils et le regroupement des lectures (BatchLoader) sont désactivés : chaque
+requête fait exactement une lecture amont, sans cache ni mise en commun.
+
+Usage:
+    python -m benchmarks.bench_concurrency [--latency 0.05] [--levels 1,5,10,25,50]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+
+from benchmarks.common import configure_env
+from benchmarks.stub import SupabaseStub
+
+JWT_SECRET = "bench-jwt-secret-with-at-least-32-bytes"
+
+
+def make_token(user_id: str) -> str:
+    import jwt
+
+    return jwt.encode(
+        {
+            "sub": user_id,
+            "aud": "authenticated",
+            "role": "authenticated",
+            "exp": int(time.time()) + 3600,
+        },
+        JWT_SECRET,
+        algorithm="HS256",
+    )
+
+
+async def run_level(app, in_flight: int, requests_per_worker: int) -> dict:
+    """Lance `in_flight` clients concurrents qui enchaînent chacun leurs requêtes, une par utilisateur"""
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    # Tokens générés hors de la mesure, un utilisateur distinct par requête
+    tokens = [
+        [make_token(str(uuid.uuid4())) for _ in range(requests_per_worker)]
+        for _ in range(in_flight)
+    ]
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker(worker_tokens):
+            for token in worker_tokens:
+                response = await client.get(
+                    f"{os.environ.get('API_PREFIX', '/api')}/user/profile",
+                    headers={"Authorization": f"Bearer {token}"}
+                )
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(worker_tokens) for worker_tokens in tokens))
+        elapsed = time.perf_counter() - start
+
+    total = in_flight * requests_per_worker
+    return {"in_flight": in_flight, "requests": total, "seconds": elapsed, "rps": total / elapsed}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.05, help="Latence amont simulée (s)")
+    parser.add_argument("--levels", default="1,5,10,25,50")
+    parser.add_argument("--requests", type=int, default=5, help="Requêtes par client concurrent")
+    parser.add_argument("--threads", type=int, default=None, help="SUPABASE_MAX_CONCURRENCY")
+    args = parser.parse_args()
+
+    with SupabaseStub(latency=args.latency) as stub:
+        configure_env(stub.url)
+        os.environ["SUPABASE_JWT_SECRET"] = JWT_SECRET
+        os.environ["AUTH_JWKS_REFRESH_INTERVAL"] = "0"
+        os.environ["CACHE_BACKEND"] = "local"
+        os.environ["PROFILE_CACHE_SIZE"] = "0"
+        os.environ["PROFILE_LOADER_WINDOW"] = "0"
+        if args.threads:
+            os.environ["SUPABASE_MAX_CONCURRENCY"] = str(args.threads)
+
+        from api.app import app
+        from api.helpers import clients
+
+        clients.open()
+        try:
+            results = [
+                asyncio.run(run_level(app, int(level), args.requests))
+                for level in args.levels.split(",")
+            ]
+        finally:
+            clients.close()
+
+    print(json.dumps({"upstream_latency_s": args.latency, "levels": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Test de charge de l'API contre le stand-in Supabase local
+
+Chaque scénario (signup, login, /user/me, GET et PUT /user/profile) est joué
+à chaque niveau de concurrence : `in_flight` clients enchaînent leurs requêtes
+contre l'application FastAPI exécutée en mémoire, le stand-in injectant la
+latence et le taux d'erreur demandés. Le rapport JSON donne, par niveau et par
+route, le débit (RPS), les percentiles de latence et la répartition des statuts.
+
+Avec `--baseline`, le rapport est comparé à un rapport précédent : le script
+échoue si le débit baisse ou si le p95 augmente au-delà de `--tolerance`.
+
+Usage:
+    python -m benchmarks.bench_load [--latency 0.02] [--jitter 0.01] [--error-rate 0.01]
+        [--levels 1,10,50] [--requests 20] [--output report.json] [--baseline previous.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from typing import Callable, Dict, List
+
+from benchmarks.common import configure_env, summarize
+from benchmarks.stub import SupabaseStub
+
+JWT_SECRET = "bench-jwt-secret-with-at-least-32-bytes"
+SCENARIOS = ("signup", "login", "me", "profile_get", "profile_put")
+
+
+def _make_requests(api_prefix: str, tokens: List[str]) -> Dict[str, Callable[[int], dict]]:
+    """Construit, pour chaque scénario, les arguments httpx de la i-ème requête"""
+
+    def auth(index: int) -> dict:
+        return {"Authorization": f"Bearer {tokens[index % len(tokens)]}"}
+
+    return {
+        "signup": lambda index: {
+            "method": "POST",
+            "url": f"{api_prefix}/auth/signup",
+            "json": {
+                "email": f"load-{uuid.uuid4().hex}@example.com",
+                "password": "bench-password",
+                "first_name": "Load",
+                "last_name": "Test",
+            },
+        },
+        "login": lambda index: {
+            "method": "POST",
+            "url": f"{api_prefix}/auth/login",
+            "json": {"email": f"user{index % len(tokens)}@example.com", "password": "bench-password"},
+        },
+        "me": lambda index: {"method": "GET", "url": f"{api_prefix}/user/me", "headers": auth(index)},
+        "profile_get": lambda index: {"method": "GET", "url": f"{api_prefix}/user/profile", "headers": auth(index)},
+        "profile_put": lambda index: {
+            "method": "PUT",
+            "url": f"{api_prefix}/user/profile",
+            "headers": auth(index),
+            "json": {"first_name": f"Load{index}", "phone": "+33600000000"},
+        },
+    }
+
+
+async def run_scenario(app, build_request: Callable[[int], dict], in_flight: int, requests_per_worker: int) -> dict:
+    """Lance `in_flight` clients concurrents qui enchaînent chacun leurs requêtes"""
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    samples: List[float] = []
+    statuses: Counter = Counter()
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker(worker_index: int):
+            for request_index in range(requests_per_worker):
+                request = build_request(worker_index * requests_per_worker + request_index)
+                start = time.perf_counter()
+                response = await client.request(**request)
+                samples.append(time.perf_counter() - start)
+                statuses[response.status_code] += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(index) for index in range(in_flight)))
+        elapsed = time.perf_counter() - start
+
+    total = len(samples)
+    errors = sum(count for code, count in statuses.items() if code >= 400)
+    return {
+        **summarize(samples),
+        "seconds": elapsed,
+        "rps": total / elapsed,
+        "error_rate": errors / total,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Liste les régressions (débit ou p95) du rapport par rapport à la référence"""
+    regressions = []
+    previous_levels = {level["in_flight"]: level for level in baseline.get("levels", [])}
+    for level in report["levels"]:
+        previous = previous_levels.get(level["in_flight"])
+        if previous is None:
+            continue
+        for route, current in level["routes"].items():
+            reference = previous["routes"].get(route)
+            if reference is None:
+                continue
+            if current["rps"] < reference["rps"] * (1 - tolerance):
+                regressions.append(
+                    f"{route} @ {level['in_flight']}: rps {reference['rps']:.1f} -> {current['rps']:.1f}"
+                )
+            if current["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{route} @ {level['in_flight']}: p95 {reference['p95_ms']:.1f}ms -> {current['p95_ms']:.1f}ms"
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", type=float, default=0.02, help="Latence amont simulée (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Gigue aléatoire ajoutée à la latence (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proportion d'appels amont en échec (503)")
+    parser.add_argument("--levels", default="1,10,50", help="Niveaux de concurrence")
+    parser.add_argument("--requests", type=int, default=20, help="Requêtes par client concurrent")
+    parser.add_argument("--users", type=int, default=100, help="Nombre d'utilisateurs distincts simulés")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="Scénarios à jouer")
+    parser.add_argument("--seed", type=int, default=0, help="Graine de la gigue et des erreurs injectées")
+    parser.add_argument("--output", help="Fichier où écrire le rapport JSON (défaut: sortie standard)")
+    parser.add_argument("--baseline", help="Rapport JSON de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Écart toléré par rapport à la référence")
+    args = parser.parse_args()
+
+    scenarios = [name for name in args.scenarios.split(",") if name]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    with SupabaseStub(
+        latency=args.latency,
+        latency_jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed
+    ) as stub:
+        configure_env(stub.url)
+        os.environ["SUPABASE_JWT_SECRET"] = JWT_SECRET
+        os.environ["AUTH_JWKS_REFRESH_INTERVAL"] = "0"
+
+        import jwt
+        from api.app import app
+        from api.config import settings
+        from api.helpers import clients
+
+        tokens = [
+            jwt.encode(
+                {
+                    "sub": str(uuid.UUID(int=index + 1)),
+                    "email": f"user{index}@example.com",
+                    "aud": "authenticated",
+                    "role": "authenticated",
+                    "exp": int(time.time()) + 3600,
+                },
+                JWT_SECRET,
+                algorithm="HS256",
+            )
+            for index in range(args.users)
+        ]
+        requests = _make_requests(settings.API_PREFIX, tokens)
+
+        clients.open()
+        try:
+            levels = []
+            for level in args.levels.split(","):
+                in_flight = int(level)
+                routes = {
+                    name: asyncio.run(run_scenario(app, requests[name], in_flight, args.requests))
+                    for name in scenarios
+                }
+                levels.append({"in_flight": in_flight, "routes": routes})
+        finally:
+            clients.close()
+        upstream = {"requests": stub.requests, "injected_errors": stub.errors}
+
+    report = {
+        "config": {
+            "upstream_latency_s": args.latency,
+            "upstream_jitter_s": args.jitter,
+            "upstream_error_rate": args.error_rate,
+            "requests_per_client": args.requests,
+            "users": args.users,
+            "seed": args.seed,
+        },
+        "upstream": upstream,
+        "levels": levels,
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            regressions = compare(report, json.load(handle), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
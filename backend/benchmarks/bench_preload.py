@@ -0,0 +1,165 @@
+"""
+Benchmark de démarrage Gunicorn : preload_app désactivé vs activé
+
+Pour chaque mode, lance Gunicorn (gunicorn.conf.py) contre le stand-in
+Supabase et mesure :
+- le temps jusqu'à ce que tous les workers soient prêts ;
+- le temps de démarrage de chaque worker (log "Worker booted in ...") ;
+- le temps de remplacement d'un worker tué (recyclage max_requests) ;
+- la mémoire de chaque worker après quelques requêtes : RSS et PSS (part
+  des pages partagées attribuée au worker, la mesure pertinente avec le
+  copy-on-write). Linux uniquement (/proc).
+
+Usage:
+    python -m benchmarks.bench_preload [--workers 4] [--requests 200]
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import configure_env
+from benchmarks.stub import SupabaseStub
+
+BOOTED = re.compile(r"Worker booted in (\d+) ms \(pid: (\d+)")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid: int) -> List[int]:
+    """Pids des processus enfants directs de `pid`"""
+    children = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as handle:
+                fields = handle.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry))
+    return children
+
+
+def _memory(pid: int) -> Dict[str, float]:
+    """RSS et PSS d'un processus, en MiB"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as handle:
+        for line in handle:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower() + "_mib"] = int(rest.split()[0]) / 1024
+    return values
+
+
+class GunicornRun:
+    """Processus Gunicorn dont les logs sont lus en continu"""
+
+    def __init__(self, preload: bool, workers: int, port: int):
+        env = dict(
+            os.environ,
+            GUNICORN_PRELOAD_APP=str(preload).lower(),
+            PROMETHEUS_MULTIPROC_DIR=tempfile.mkdtemp(prefix="bench_preload_metrics_"),
+        )
+        self.boots: List[tuple] = []
+        self._changed = threading.Condition()
+        self.started_at = time.monotonic()
+        self.process = subprocess.Popen(
+            [
+                sys.executable, "-m", "gunicorn", "api.app:app",
+                "--config", "gunicorn.conf.py",
+                "--workers", str(workers),
+                "--bind", f"127.0.0.1:{port}",
+                "--access-logfile", "/dev/null",
+            ],
+            env=env,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        threading.Thread(target=self._read_logs, daemon=True).start()
+
+    def _read_logs(self) -> None:
+        for line in self.process.stderr:
+            match = BOOTED.search(line)
+            if match:
+                with self._changed:
+                    self.boots.append((time.monotonic(), int(match.group(1)), int(match.group(2))))
+                    self._changed.notify_all()
+
+    def wait_for_boots(self, count: int, timeout: float = 120) -> None:
+        with self._changed:
+            if not self._changed.wait_for(lambda: len(self.boots) >= count, timeout):
+                raise RuntimeError(f"only {len(self.boots)}/{count} workers booted")
+
+    def stop(self) -> None:
+        self.process.send_signal(signal.SIGTERM)
+        self.process.wait(timeout=60)
+
+
+def run_mode(preload: bool, workers: int, requests: int) -> dict:
+    """Démarre Gunicorn dans un mode et mesure démarrage, recyclage et mémoire"""
+    port = _free_port()
+    run = GunicornRun(preload, workers, port)
+    try:
+        run.wait_for_boots(workers)
+        all_ready_s = run.boots[workers - 1][0] - run.started_at
+
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}") as client:
+            for _ in range(requests):
+                client.get("/health").raise_for_status()
+
+        worker_pids = _children(run.process.pid)
+        memory = [_memory(pid) for pid in worker_pids]
+
+        # Recyclage d'un worker (max_requests) : temps jusqu'au remplacement prêt
+        killed_at = time.monotonic()
+        os.kill(worker_pids[0], signal.SIGTERM)
+        run.wait_for_boots(workers + 1)
+        respawn_ms = (run.boots[workers][0] - killed_at) * 1000
+    finally:
+        run.stop()
+
+    boot_ms = [boot for _, boot, _ in run.boots[:workers]]
+    return {
+        "preload_app": preload,
+        "workers": workers,
+        "all_workers_ready_s": all_ready_s,
+        "worker_boot_ms": {"mean": statistics.fmean(boot_ms), "max": max(boot_ms)},
+        "respawn_ms": respawn_ms,
+        "worker_rss_mib": statistics.fmean(m["rss_mib"] for m in memory),
+        "worker_pss_mib": statistics.fmean(m["pss_mib"] for m in memory),
+        "total_pss_mib": sum(m["pss_mib"] for m in memory),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200, help="Requêtes envoyées avant la mesure mémoire")
+    args = parser.parse_args()
+
+    with SupabaseStub() as stub:
+        configure_env(stub.url)
+        results = [run_mode(preload, args.workers, args.requests) for preload in (False, True)]
+
+    print(json.dumps({"modes": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
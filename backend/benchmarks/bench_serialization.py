@@ -0,0 +1,111 @@
+"""
+Micro-benchmark : sérialisation de la réponse de login
+
+Compare l'ancien payload (`user=response.user.__dict__`, champ `dict`) et le
+modèle compact AuthUser, avec le chemin FastAPI classique
+(jsonable_encoder + json.dumps), orjson (FastJSONResponse) et la
+sérialisation directe pydantic-core (FastAPI récent).
+
+Usage:
+    python -m benchmarks.bench_serialization [--iterations 5000]
+"""
+import argparse
+import json
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from benchmarks.common import configure_env, summarize, time_calls
+
+
+def _gotrue_user():
+    """Utilisateur GoTrue réaliste (identités, facteurs, métadonnées)"""
+    from supabase_auth.types import User
+
+    now = datetime.now(timezone.utc).isoformat()
+    user_id = str(uuid.uuid4())
+    return User.model_validate({
+        "id": user_id,
+        "aud": "authenticated",
+        "role": "authenticated",
+        "email": "bench@example.com",
+        "email_confirmed_at": now,
+        "confirmed_at": now,
+        "last_sign_in_at": now,
+        "created_at": now,
+        "updated_at": now,
+        "app_metadata": {"provider": "email", "providers": ["email", "google"]},
+        "user_metadata": {"first_name": "Bench", "last_name": "User", "full_name": "Bench User", "phone": None},
+        "identities": [
+            {
+                "id": str(uuid.uuid4()),
+                "identity_id": str(uuid.uuid4()),
+                "user_id": user_id,
+                "identity_data": {"email": "bench@example.com", "sub": user_id, "email_verified": True},
+                "provider": provider,
+                "created_at": now,
+                "last_sign_in_at": now,
+                "updated_at": now,
+            }
+            for provider in ("email", "google")
+        ],
+        "factors": [
+            {
+                "id": str(uuid.uuid4()),
+                "friendly_name": "totp",
+                "factor_type": "totp",
+                "status": "verified",
+                "created_at": now,
+                "updated_at": now,
+            }
+        ],
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    configure_env("http://127.0.0.1:1")
+
+    import orjson
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import BaseModel
+    from api.models import AuthUser, UserProfile, UserResponse
+
+    class LegacyUserResponse(BaseModel):
+        access_token: str
+        user: dict
+        profile: Optional[UserProfile] = None
+
+    user = _gotrue_user()
+    token = "x" * 600
+
+    def legacy_json():
+        json.dumps(jsonable_encoder(LegacyUserResponse(access_token=token, user=user.__dict__)))
+
+    def legacy_pydantic():
+        LegacyUserResponse(access_token=token, user=user.__dict__).model_dump_json()
+
+    def compact_orjson():
+        orjson.dumps(jsonable_encoder(UserResponse(access_token=token, user=AuthUser.model_validate(user))))
+
+    def compact_pydantic():
+        UserResponse(access_token=token, user=AuthUser.model_validate(user)).model_dump_json()
+
+    legacy_size = len(LegacyUserResponse(access_token=token, user=user.__dict__).model_dump_json())
+    compact_size = len(UserResponse(access_token=token, user=AuthUser.model_validate(user)).model_dump_json())
+
+    results = {
+        "legacy_dict_jsonable_json": summarize(time_calls(legacy_json, args.iterations)),
+        "legacy_dict_pydantic": summarize(time_calls(legacy_pydantic, args.iterations)),
+        "compact_jsonable_orjson": summarize(time_calls(compact_orjson, args.iterations)),
+        "compact_pydantic": summarize(time_calls(compact_pydantic, args.iterations)),
+        "payload_bytes": {"legacy": legacy_size, "compact": compact_size},
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark de démarrage : coût d'import de l'application et du schéma OpenAPI
+
+- Rapport `python -X importtime` de `import api.app` (médiane sur plusieurs
+  processus neufs) : durée totale, modules les plus coûteux, et vérification
+  que les modules du SDK Supabase ne sont pas importés à froid.
+- Premier GET /openapi.json, schéma généré par FastAPI vs schéma pré-généré
+  (OPENAPI_SCHEMA_PATH).
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--top 15]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List
+
+from benchmarks.common import configure_env
+
+# Modules chargés à la demande (api/helpers/lifecycle.py), absents après l'import de l'application
+DEFERRED_MODULES = ("supabase", "supabase_auth", "postgrest", "realtime", "storage3", "httpx")
+
+_FIRST_OPENAPI = """
+import json, sys, time
+start = time.perf_counter()
+from api.app import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(app)
+client.get("/health").raise_for_status()  # construit la pile ASGI hors mesure
+ready = time.perf_counter()
+client.get("/openapi.json").raise_for_status()
+done = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_openapi_ms": (done - ready) * 1000,
+    "deferred_loaded": sorted(m for m in %r if m in sys.modules and m != "httpx"),
+}))
+"""
+
+
+def _run_python(code: str, *options: str, env: Dict[str, str] = None) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *options, "-c", code],
+        env=env or os.environ,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_profile(runs: int, top: int) -> dict:
+    """Profil `-X importtime` de l'import de l'application (processus neufs)"""
+    profiles: List[Dict[str, tuple]] = []
+    loaded: List[str] = []
+    for _ in range(runs):
+        result = _run_python(
+            f"import sys, api.app; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))",
+            "-X", "importtime",
+        )
+        loaded = [module for module in result.stdout.strip().split(",") if module]
+        profile = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            profile[name.strip()] = (int(self_us), int(cumulative_us))
+        profiles.append(profile)
+
+    totals = [profile["api.app"][1] for profile in profiles]
+    median_run = profiles[totals.index(sorted(totals)[len(totals) // 2])]
+    slowest = sorted(median_run.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return {
+        "runs": runs,
+        "import_api_app_ms": statistics.median(totals) / 1000,
+        "import_api_app_ms_min": min(totals) / 1000,
+        "deferred_modules_loaded": loaded,
+        "top_self_ms": {name: self_us / 1000 for name, (self_us, _) in slowest},
+    }
+
+
+def first_openapi(runs: int) -> dict:
+    """Premier GET /openapi.json, schéma généré à la demande vs pré-généré"""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as handle:
+        schema_path = handle.name
+    _run_python(f"import sys; sys.argv = ['', {schema_path!r}]; from api.openapi import main; main()")
+
+    results = {}
+    try:
+        for mode, extra_env in (("generated", {}), ("prebuilt", {"OPENAPI_SCHEMA_PATH": schema_path})):
+            samples = [
+                json.loads(_run_python(_FIRST_OPENAPI % (DEFERRED_MODULES,), env={**os.environ, **extra_env}).stdout)
+                for _ in range(runs)
+            ]
+            results[mode] = {
+                "import_ms": statistics.median(sample["import_ms"] for sample in samples),
+                "first_openapi_ms": statistics.median(sample["first_openapi_ms"] for sample in samples),
+            }
+    finally:
+        os.unlink(schema_path)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Processus neufs par mesure")
+    parser.add_argument("--top", type=int, default=15, help="Nombre de modules les plus coûteux rapportés")
+    args = parser.parse_args()
+
+    # Aucun appel réseau : seule la configuration doit être valide
+    configure_env("http://127.0.0.1:9")
+    report = {
+        "imports": import_profile(args.runs, args.top),
+        "openapi": first_openapi(args.runs),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Micro-benchmark : vérification distante (auth.get_user) vs vérification JWT locale
+
+Usage:
+    python -m benchmarks.bench_verify [--iterations 2000] [--latency 0.002]
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import configure_env, summarize, time_calls
+from benchmarks.stub import SupabaseStub
+
+JWT_SECRET = "bench-jwt-secret-with-at-least-32-bytes"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.002, help="Latence GoTrue simulée (s)")
+    args = parser.parse_args()
+
+    with SupabaseStub(latency=args.latency) as stub:
+        configure_env(stub.url)
+
+        import jwt
+        from api.config import settings
+        from api.helpers import clients, token_verifier
+
+        settings.SUPABASE_JWT_SECRET = JWT_SECRET
+        token = jwt.encode(
+            {
+                "sub": "00000000-0000-0000-0000-000000000001",
+                "aud": "authenticated",
+                "role": "authenticated",
+                "exp": int(time.time()) + 3600,
+            },
+            JWT_SECRET,
+            algorithm="HS256",
+        )
+
+        try:
+            remote = summarize(time_calls(lambda: clients.service.auth.get_user(token), args.iterations // 10))
+            local = summarize(time_calls(lambda: token_verifier.verify(token), args.iterations))
+        finally:
+            clients.close()
+
+    print(json.dumps({"remote_get_user": remote, "local_jwt": local}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+Utilitaires communs aux benchmarks
+"""
+import os
+import statistics
+import time
+from typing import Callable, Dict, List
+
+
+def configure_env(supabase_url: str) -> None:
+    """
+    Pointe la configuration de l'API vers le stand-in local
+
+    Doit être appelé avant le premier import de `api`.
+    """
+    os.environ["SUPABASE_URL"] = supabase_url
+    os.environ.setdefault("SUPABASE_ANON_KEY", "bench-anon-key")
+    os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench-service-key")
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Résume une liste de durées (secondes) en millisecondes"""
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+    }
+
+
+def time_calls(fn: Callable[[], object], iterations: int, warmup: int = 10) -> List[float]:
+    """Mesure la durée de `iterations` appels successifs de `fn`"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
@@ -0,0 +1,191 @@
+"""
+Stand-in local d'un serveur Redis (protocole RESP) pour le niveau de cache partagé
+
+Implémente uniquement les commandes utilisées par api/helpers/cache_backends.py
+(GET, SET PX/EX/NX, DEL, PTTL, PUBLISH, SUBSCRIBE) et celles envoyées par redis-py
+à la connexion. Les données sont gardées en mémoire, sans persistance.
+
+Usage:
+    python -m benchmarks.redis_stub [--port 6379]
+"""
+import argparse
+import socketserver
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+
+def _encode(value) -> bytes:
+    """Encode une réponse RESP2"""
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, Exception):
+        return b"-ERR %s\r\n" % str(value).encode()
+    if isinstance(value, (list, tuple)):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(item) for item in value)
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class _RedisHandler(socketserver.StreamRequestHandler):
+    """Une connexion client : lit les commandes RESP et y répond"""
+
+    # Comme Redis (TCP_NODELAY) : sinon les réponses d'un pipeline attendent l'ACK retardé du client
+    disable_nagle_algorithm = True
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()  # commande inline (redis-cli, telnet)
+        arguments = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            arguments.append(self.rfile.read(length + 2)[:-2])
+        return arguments
+
+    def send(self, value) -> None:
+        with self.write_lock:
+            self.wfile.write(_encode(value))
+            self.wfile.flush()
+
+    def handle(self) -> None:
+        self.write_lock = threading.Lock()
+        stub: RedisStub = self.server.stub
+        try:
+            while True:
+                command = self._read_command()
+                if command is None:
+                    return
+                self.send(stub.execute(self, command))
+        except (ConnectionError, ValueError):
+            return
+        finally:
+            stub.unsubscribe_all(self)
+
+
+class _RedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 1024
+
+
+class RedisStub:
+    """
+    Serveur Redis local qui remplace Redis pendant les benchmarks et les tests
+
+    Args:
+        port: Port d'écoute (0 pour un port libre)
+    """
+
+    def __init__(self, port: int = 0):
+        self._data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._channels: Dict[bytes, Set[_RedisHandler]] = {}
+        self._lock = threading.Lock()
+        self.commands = 0
+        self._server = _RedisServer(("127.0.0.1", port), _RedisHandler)
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"redis://{host}:{port}/0"
+
+    def _lookup(self, key: bytes) -> Optional[Tuple[bytes, Optional[float]]]:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def execute(self, connection: _RedisHandler, command: List[bytes]):
+        """Exécute une commande et retourne la réponse à encoder"""
+        name, arguments = command[0].upper(), command[1:]
+        with self._lock:
+            self.commands += 1
+            if name == b"GET":
+                entry = self._lookup(arguments[0])
+                return None if entry is None else entry[0]
+            if name == b"SET":
+                expires_at = None
+                options = [option.upper() for option in arguments[2:]]
+                if b"PX" in options:
+                    expires_at = time.monotonic() + int(arguments[2 + options.index(b"PX") + 1]) / 1000
+                elif b"EX" in options:
+                    expires_at = time.monotonic() + int(arguments[2 + options.index(b"EX") + 1])
+                if b"NX" in options and self._lookup(arguments[0]) is not None:
+                    return None
+                self._data[arguments[0]] = (arguments[1], expires_at)
+                return "OK"
+            if name == b"DEL":
+                return sum(self._data.pop(key, None) is not None for key in arguments)
+            if name == b"PTTL":
+                entry = self._lookup(arguments[0])
+                if entry is None:
+                    return -2
+                return -1 if entry[1] is None else int((entry[1] - time.monotonic()) * 1000)
+            if name == b"PUBLISH":
+                subscribers = list(self._channels.get(arguments[0], ()))
+            elif name == b"SUBSCRIBE":
+                for count, channel in enumerate(arguments, 1):
+                    self._channels.setdefault(channel, set()).add(connection)
+                    if count < len(arguments):
+                        connection.send([b"subscribe", channel, count])
+                return [b"subscribe", arguments[-1], len(arguments)]
+            elif name == b"UNSUBSCRIBE":
+                self.unsubscribe_all(connection, locked=True)
+                return [b"unsubscribe", None, 0]
+            elif name in (b"PING",):
+                return "PONG"
+            elif name in (b"SELECT", b"CLIENT", b"FLUSHALL"):
+                if name == b"FLUSHALL":
+                    self._data.clear()
+                return "OK"
+            else:
+                return ValueError(f"unknown command '{name.decode()}'")
+
+        # PUBLISH : envoi hors du verrou global
+        for subscriber in subscribers:
+            try:
+                subscriber.send([b"message", arguments[0], arguments[1]])
+            except OSError:
+                pass
+        return len(subscribers)
+
+    def unsubscribe_all(self, connection: _RedisHandler, locked: bool = False) -> None:
+        """Retire une connexion de tous les canaux"""
+        if not locked:
+            with self._lock:
+                return self.unsubscribe_all(connection, locked=True)
+        for subscribers in self._channels.values():
+            subscribers.discard(connection)
+
+    def __enter__(self) -> "RedisStub":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    with RedisStub(args.port) as stub:
+        print(f"Redis stand-in listening on {stub.url}", flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
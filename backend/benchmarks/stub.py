@@ -0,0 +1,228 @@
+"""
+Stand-in HTTP local des endpoints Supabase (GoTrue / PostgREST) utilisés par l'API
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def fake_user(user_id: Optional[str] = None, email: str = "bench@example.com") -> dict:
+    """Construit un utilisateur GoTrue minimal mais valide"""
+    return {
+        "id": user_id or str(uuid.uuid4()),
+        "aud": "authenticated",
+        "role": "authenticated",
+        "email": email,
+        "app_metadata": {"provider": "email"},
+        "user_metadata": {"first_name": "Bench", "last_name": "User", "full_name": "Bench User"},
+        "created_at": _now(),
+    }
+
+
+def fake_profile(user_id: str, role: str = "user") -> dict:
+    """Construit une ligne user_profiles"""
+    return {
+        "id": user_id,
+        "email": f"{user_id[:8]}@example.com",
+        "first_name": "Bench",
+        "last_name": "User",
+        "full_name": "Bench User",
+        "phone": None,
+        "role": role,
+        "created_at": _now(),
+        "updated_at": _now(),
+    }
+
+
+def fake_session(email: str = "bench@example.com") -> dict:
+    """Construit une session GoTrue (grant_type=password)"""
+    return {
+        "access_token": f"stub-access-token-{uuid.uuid4().hex}",
+        "refresh_token": uuid.uuid4().hex,
+        "token_type": "bearer",
+        "expires_in": 3600,
+        "expires_at": int(time.time()) + 3600,
+        "user": fake_user(email=email),
+    }
+
+
+def _export_page(total: int, after_id: Optional[str], limit: int) -> List[dict]:
+    """Page keyset de l'RPC export_users sur `total` utilisateurs synthétiques"""
+    start = uuid.UUID(after_id).int + 1 if after_id else 0
+    rows = []
+    for index in range(start, min(start + limit, total)):
+        user_id = str(uuid.UUID(int=index))
+        rows.append({
+            "id": user_id,
+            "email": f"user{index}@example.com",
+            "created_at": datetime.fromtimestamp(1_700_000_000 + index, timezone.utc).isoformat(),
+            "user_metadata": {},
+            "profile": fake_profile(user_id),
+        })
+    return rows
+
+
+def _filtered_ids(query: str) -> List[str]:
+    """Extrait les ids d'un filtre PostgREST `id=eq.x` ou `id=in.(x,y)`"""
+    value = parse_qs(query).get("id", [""])[0]
+    if value.startswith("eq."):
+        return [value[3:]]
+    if value.startswith("in.("):
+        return [item.strip('"') for item in value[4:-1].split(",") if item]
+    return []
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Gestionnaire HTTP/1.1 keep-alive qui répond comme GoTrue / PostgREST"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"null") if length else None
+
+        stub: "SupabaseStub" = self.server.stub
+        stub.requests += 1
+        stub.request_log.append((self.command, self.path, body))
+        if stub.latency or stub.latency_jitter:
+            time.sleep(stub.latency + stub.random.uniform(0, stub.latency_jitter))
+        if stub.error_rate and stub.random.random() < stub.error_rate:
+            stub.errors += 1
+            self._send_json(503, {"message": "injected failure", "code": 503})
+            return
+
+        path, _, query = self.path.partition("?")
+        if path.startswith("/auth/v1/signup"):
+            self._send_json(200, fake_user(email=(body or {}).get("email", "bench@example.com")))
+        elif path == "/auth/v1/.well-known/jwks.json":
+            self._send_json(200, {"keys": []})
+        elif path == "/auth/v1/health":
+            self._send_json(200, {"name": "GoTrue", "version": "stub", "description": "Supabase stand-in"})
+        elif path.startswith("/auth/v1/token"):
+            self._send_json(200, fake_session(email=(body or {}).get("email", "bench@example.com")))
+        elif path.startswith("/auth/v1/user"):
+            self._send_json(200, fake_user())
+        elif path == "/auth/v1/admin/users" and self.command == "POST":
+            self._send_json(200, fake_user(email=body["email"]))
+        elif path.startswith("/auth/v1/admin/users/"):
+            self._send_json(200, fake_user(path.rsplit("/", 1)[-1]))
+        elif path.startswith("/rest/v1/rpc/get_user_id_by_email"):
+            self._send_json(200, None)
+        elif path.startswith("/rest/v1/rpc/update_user_profile"):
+            self._send_json(200, [stub.update_profile({key[2:]: value for key, value in body.items()})])
+        elif path.startswith("/rest/v1/rpc/export_users"):
+            self._send_json(200, _export_page(stub.export_total, body.get("p_after_id"), body["p_limit"]))
+        elif path.startswith("/rest/v1/user_profiles") and self.command == "GET":
+            self._send_json(200, [stub.profile_row(user_id) for user_id in _filtered_ids(query)])
+        elif path.startswith("/rest/v1/"):
+            self._send_json(200, [])
+        else:
+            self._send_json(404, {"message": "not found"})
+
+    do_GET = _handle
+    do_POST = _handle
+    do_PUT = _handle
+    do_PATCH = _handle
+
+
+class _StubServer(ThreadingHTTPServer):
+    """Serveur multi-thread avec une file d'attente d'acceptation large
+
+    La file par défaut (5) fait perdre des SYN sous forte concurrence, ce qui
+    ajoute des retransmissions TCP d'une seconde aux mesures.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class SupabaseStub:
+    """
+    Serveur local qui remplace Supabase pendant les benchmarks
+
+    Args:
+        latency: Latence injectée par requête (secondes)
+        profile_role: Rôle applicatif renvoyé pour chaque ligne user_profiles
+        export_total: Nombre d'utilisateurs renvoyés par l'RPC export_users
+        latency_jitter: Latence aléatoire ajoutée, tirée uniformément dans [0, jitter] (secondes)
+        error_rate: Proportion des requêtes qui échouent avec une 503
+        seed: Graine du tirage de la gigue et des erreurs (résultats reproductibles)
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        profile_role: str = "user",
+        export_total: int = 0,
+        latency_jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.profile_role = profile_role
+        self.export_total = export_total
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        # Requêtes reçues (méthode, chemin avec la query string, corps JSON), dans l'ordre d'arrivée
+        self.request_log: List[Tuple[str, str, object]] = []
+        # Lignes user_profiles modifiées par l'RPC update_user_profile, par id
+        self.profiles: Dict[str, dict] = {}
+        self.errors = 0
+        self._server = _StubServer(("127.0.0.1", 0), _StubHandler)
+        self._server.stub = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def profile_row(self, user_id: str) -> dict:
+        """Ligne user_profiles de `user_id` (synthétique tant qu'elle n'a pas été modifiée)"""
+        return self.profiles.get(user_id) or fake_profile(user_id, self.profile_role)
+
+    def update_profile(self, params: dict) -> dict:
+        """Applique l'RPC update_user_profile comme la fonction SQL (full_name recalculé)"""
+        row = dict(self.profile_row(params["id"]))
+        for field in ("first_name", "last_name", "phone"):
+            if params.get(field) is not None:
+                row[field] = params[field]
+        if params.get("full_name") is not None:
+            row["full_name"] = params["full_name"]
+        elif params.get("first_name") is not None or params.get("last_name") is not None:
+            row["full_name"] = " ".join(part for part in (row["first_name"], row["last_name"]) if part).strip()
+        row["updated_at"] = _now()
+        self.profiles[params["id"]] = row
+        return row
+
+    def __enter__(self) -> "SupabaseStub":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
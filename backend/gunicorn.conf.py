@@ -1,8 +1,12 @@
 # Gunicorn configuration file for FastAPI
 # Configuration optimisée pour la production
 
+import gc
 import multiprocessing
 import os
+import time
+
+from api.private_dirs import default_private_dir, ensure_private_dir
 
 # Server Socket
 bind = f"0.0.0.0:{os.getenv('API_PORT', 8000)}"
@@ -25,10 +29,13 @@ keepalive = 60
 max_requests = 1000
 max_requests_jitter = 100
 
-# Preload application (améliore les performances)
-# ATTENTION: peut causer des problèmes avec Supabase en local
-# Désactivé pour éviter les problèmes de connexions partagées
-preload_app = False
+# Preload application : l'application est importée une seule fois dans le master
+# puis partagée (copy-on-write) par les workers, qui démarrent plus vite et
+# consomment moins de mémoire. Les clients Supabase ne sont jamais partagés :
+# post_fork réinitialise l'état propre au processus et chaque worker crée ses
+# propres connexions (voir api/helpers/lifecycle.py).
+# Activer avec GUNICORN_PRELOAD_APP=true
+preload_app = os.getenv("GUNICORN_PRELOAD_APP", "false").lower() == "true"
 
 # Logging
 accesslog = "-"
@@ -47,6 +54,16 @@ limit_request_field_size = 8190
 # Enable statsd for monitoring (optionnel)
 # statsd_host = "localhost:8125"
 
+# Métriques Prometheus multi-process : chaque worker écrit ses métriques dans
+# ce répertoire, /metrics les agrège (doit être défini avant le fork des workers).
+# Par défaut, répertoire privé (0700) propre à l'utilisateur et au déploiement :
+# deux déploiements ne s'effacent pas leurs métriques et un autre utilisateur
+# ne peut pas y déposer de faux fichiers
+prometheus_multiproc_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    default_private_dir("api-metrics")
+)
+
 # Worker restarts
 # Redémarre automatiquement les workers qui consomment trop de mémoire
 # worker_tmp_dir = "/dev/shm"  # Linux only, commenté pour macOS
@@ -71,8 +88,25 @@ proxy_allow_ips = "*"
 sendfile = True
 
 # Configuration d'environnement
+def on_starting(server):
+    """Appelé au démarrage du master, avant le fork des workers"""
+    # Repartir d'un répertoire de métriques vide à chaque démarrage ; le répertoire
+    # doit être privé (refusé s'il appartient à un autre utilisateur)
+    ensure_private_dir(prometheus_multiproc_dir)
+    with os.scandir(prometheus_multiproc_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith(".db") and entry.is_file(follow_symlinks=False):
+                os.unlink(entry.path)
+
 def when_ready(server):
     """Appelé quand le serveur est prêt à recevoir des requêtes"""
+    if preload_app:
+        # SDK Supabase et schéma OpenAPI chargés une fois pour tous les workers
+        from api.helpers import preload_in_master
+        preload_in_master(server.app.wsgi())
+        # Objets de l'application préchargée exclus du GC : leurs pages restent
+        # partagées avec les workers au lieu d'être copiées au premier passage du GC
+        gc.freeze()
     server.log.info("Server is ready. Spawning workers")
 
 def worker_int(worker):
@@ -85,12 +119,28 @@ def pre_fork(server, worker):
 
 def post_fork(server, worker):
     """Appelé après la création d'un worker"""
+    worker.boot_started_at = time.monotonic()
+    if preload_app:
+        # Ne rien hériter du master : clients, limiteurs et tâches propres au worker
+        from api.helpers import reset_after_fork
+        reset_after_fork()
     server.log.info("Worker spawned (pid: %s)", worker.pid)
 
+def post_worker_init(worker):
+    """Appelé dans le worker une fois l'application chargée"""
+    boot_ms = (time.monotonic() - worker.boot_started_at) * 1000
+    worker.log.info("Worker booted in %.0f ms (pid: %s, preload: %s)", boot_ms, worker.pid, preload_app)
+
 def pre_exec(server):
     """Appelé avant l'exécution du serveur"""
     server.log.info("Forked child, re-executing.")
 
 def worker_abort(worker):
     """Appelé quand un worker est aborté"""
-    worker.log.info("worker received SIGABRT signal")
\ No newline at end of file
+    worker.log.info("worker received SIGABRT signal")
+
+def child_exit(server, worker):
+    """Appelé dans le master quand un worker se termine"""
+    # Retirer les gauges "live" du worker mort des métriques agrégées
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
\ No newline at end of file
@@ -0,0 +1,69 @@
+"""
+Fixtures communes : l'API tourne contre le stand-in local de Supabase (benchmarks/stub.py)
+"""
+import os
+import time
+
+import jwt
+import pytest
+
+from benchmarks.common import configure_env
+from benchmarks.stub import SupabaseStub
+
+JWT_SECRET = "test-jwt-secret-test-jwt-secret-0"
+USER_ID = "11111111-1111-1111-1111-111111111111"
+OTHER_USER_ID = "22222222-2222-2222-2222-222222222222"
+
+# La configuration est lue au premier import de `api` : le stand-in doit écouter avant
+supabase_stub = SupabaseStub()
+configure_env(supabase_stub.url)
+os.environ["SUPABASE_JWT_SECRET"] = JWT_SECRET
+os.environ["AUTH_VERIFY_MODE"] = "local"
+os.environ["AUTH_JWKS_REFRESH_INTERVAL"] = "0"
+os.environ["CACHE_BACKEND"] = "local"
+os.environ["PROFILE_READ_BACKEND"] = "postgrest"
+
+
+@pytest.fixture(scope="session")
+def stub():
+    with supabase_stub:
+        yield supabase_stub
+
+
+@pytest.fixture(scope="session")
+def app_client(stub):
+    from fastapi.testclient import TestClient
+
+    from api.app import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def client(app_client, stub):
+    """Client de l'API, caches vidés et journal du stand-in remis à zéro"""
+    from api.helpers import email_lookup_cache, profile_cache, public_profile_cache, token_cache
+
+    for cache in (profile_cache, public_profile_cache, token_cache, email_lookup_cache):
+        cache.clear()
+    stub.profile_role = "user"
+    stub.request_log.clear()
+    stub.profiles.clear()
+    return app_client
+
+
+@pytest.fixture
+def auth_headers():
+    token = jwt.encode(
+        {
+            "sub": USER_ID,
+            "email": "user@example.com",
+            "user_metadata": {"first_name": "Test", "phone": "+33600000000"},
+            "aud": "authenticated",
+            "role": "authenticated",
+            "exp": int(time.time()) + 600,
+        },
+        JWT_SECRET,
+    )
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,49 @@
+"""
+Routes /api/admin
+"""
+import pytest
+
+from api.config import settings
+
+CSV_IMPORT = b"email,first_name,last_name\n" + b"".join(
+    f"user{index}@example.com,User,{index}\n".encode() for index in range(20)
+)
+
+
+@pytest.fixture
+def admin(stub):
+    stub.profile_role = "admin"
+
+
+def import_headers(auth_headers):
+    return {**auth_headers, "Content-Type": "text/csv"}
+
+
+def test_import_streams_one_result_per_row(client, admin, auth_headers):
+    response = client.post("/api/admin/users/import", headers=import_headers(auth_headers), content=CSV_IMPORT)
+
+    assert response.status_code == 200
+    assert response.text.count('"status":"created"') == 20
+
+
+def test_import_over_declared_size_is_rejected(client, stub, admin, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_MAX_SIZE", len(CSV_IMPORT) - 1)
+
+    response = client.post("/api/admin/users/import", headers=import_headers(auth_headers), content=CSV_IMPORT)
+
+    assert response.status_code == 413
+    assert not [target for method, target, _ in stub.request_log if method == "POST"]
+
+
+def test_import_over_streamed_size_is_rejected(client, stub, admin, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "IMPORT_MAX_SIZE", len(CSV_IMPORT) - 1)
+
+    # Corps envoyé par morceaux, sans Content-Length
+    def chunks():
+        for start in range(0, len(CSV_IMPORT), 64):
+            yield CSV_IMPORT[start:start + 64]
+
+    response = client.post("/api/admin/users/import", headers=import_headers(auth_headers), content=chunks())
+
+    assert response.status_code == 413
+    assert not [target for method, target, _ in stub.request_log if method == "POST"]
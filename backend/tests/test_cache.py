@@ -0,0 +1,134 @@
+"""
+Générations de TieredCache : une valeur lue avant une mise à jour n'est jamais remise en cache
+
+Chaque cas tourne sur le niveau local seul et sur le niveau partagé SQLite
+(shm) ; deux TieredCache sur le même fichier jouent deux workers.
+"""
+import pytest
+
+from api.helpers.cache import TieredCache
+from api.helpers.cache_backends import SqliteSharedBackend
+
+pytestmark = pytest.mark.anyio
+
+KEY = "11111111-1111-1111-1111-111111111111"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(params=["local", "shm"])
+def make_cache(request, tmp_path):
+    """Fabrique de caches « workers » partageant le même niveau partagé (shm)"""
+    backend = SqliteSharedBackend(str(tmp_path / "cache" / "cache.sqlite3")) if request.param == "shm" else None
+
+    def make(maxsize: int = 100) -> TieredCache:
+        return TieredCache(
+            "test",
+            maxsize=maxsize,
+            ttl=60,
+            encode=str.encode,
+            decode=bytes.decode,
+            backend=backend
+        )
+
+    yield make
+    if backend is not None:
+        backend.close()
+
+
+def shared_value(cache: TieredCache, key: str):
+    """Valeur du niveau partagé (None sans niveau partagé ou si absente)"""
+    if cache.backend is None:
+        return None
+    entry = cache.backend.get(cache._shared_key(key))
+    return entry[0].decode() if entry else None
+
+
+async def test_read_started_before_invalidation_is_not_cached(make_cache):
+    cache = make_cache()
+    generation = cache.generation(KEY)
+
+    # La mise à jour invalide la clé pendant que la lecture de l'ancienne ligne est en vol
+    await cache.invalidate(KEY)
+    await cache.set(KEY, "old", generation=generation)
+
+    assert await cache.get(KEY) is None
+    assert shared_value(cache, KEY) is None
+
+
+async def test_read_started_before_write_through_does_not_replace_it(make_cache):
+    cache = make_cache()
+    read_generation = cache.generation(KEY)
+
+    await cache.invalidate(KEY)
+    write_generation = cache.generation(KEY)
+    await cache.set(KEY, "new", broadcast=True, generation=write_generation)
+    await cache.set(KEY, "old", generation=read_generation)
+
+    assert await cache.get(KEY) == "new"
+
+
+@pytest.mark.parametrize("first_to_finish", ["a", "b"])
+async def test_overlapping_write_throughs_invalidate(make_cache, first_to_finish):
+    cache = make_cache()
+    await cache.invalidate(KEY)
+    generation_a = cache.generation(KEY)
+    await cache.invalidate(KEY)
+    generation_b = cache.generation(KEY)
+
+    # L'ordre des écritures en base est inconnu : aucune des deux versions n'est gardée
+    writes = {"a": ("from a", generation_a), "b": ("from b", generation_b)}
+    for name in (first_to_finish, "b" if first_to_finish == "a" else "a"):
+        value, generation = writes[name]
+        await cache.set(KEY, value, broadcast=True, generation=generation)
+
+    assert await cache.get(KEY) is None
+    assert shared_value(cache, KEY) is None
+
+
+async def test_forgotten_key_falls_back_to_generation_floor(make_cache):
+    cache = make_cache(maxsize=2)
+    generation = cache.generation(KEY)
+
+    await cache.invalidate(KEY)
+    # Deux autres clés modifiées : la génération de KEY est oubliée et devient le plancher
+    await cache.invalidate("other-1")
+    await cache.invalidate("other-2")
+    assert KEY not in cache._generations
+
+    await cache.set(KEY, "old", generation=generation)
+    assert await cache.get(KEY) is None
+
+    # Une lecture commencée après les modifications est mise en cache normalement
+    await cache.set(KEY, "fresh", generation=cache.generation(KEY))
+    assert await cache.get(KEY) == "fresh"
+
+
+async def test_set_many_skips_keys_changed_during_read(make_cache):
+    cache = make_cache()
+    keys = [KEY, "22222222-2222-2222-2222-222222222222"]
+    generations = {key: cache.generation(key) for key in keys}
+
+    await cache.invalidate(KEY)
+    await cache.set_many({key: "old" for key in keys}, generations)
+
+    assert await cache.get_many(keys) == {keys[1]: "old"}
+    assert shared_value(cache, KEY) is None
+
+
+async def test_fill_does_not_overwrite_another_workers_write_through(make_cache):
+    worker_a = make_cache()
+    worker_b = make_cache()
+    if worker_a.backend is None:
+        pytest.skip("cross-worker behaviour needs a shared tier")
+    read_generation = worker_b.generation(KEY)
+
+    # Le worker A écrit la nouvelle version ; B n'a pas encore reçu l'invalidation
+    await worker_a.invalidate(KEY)
+    await worker_a.set(KEY, "new", broadcast=True, generation=worker_a.generation(KEY))
+    await worker_b.set(KEY, "old", generation=read_generation)
+
+    assert shared_value(worker_a, KEY) == "new"
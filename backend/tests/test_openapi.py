@@ -0,0 +1,64 @@
+"""
+Schéma OpenAPI pré-généré : chargé seulement s'il correspond aux routes et aux modèles
+"""
+import json
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from api.openapi import FINGERPRINT_KEY, build_schema, load_prebuilt_schema
+
+
+class Item(BaseModel):
+    id: str
+
+
+def make_app(extra_route: bool = False) -> FastAPI:
+    app = FastAPI(title="Test", version="1.0.0")
+
+    @app.get("/items", response_model=Item)
+    def get_item():
+        return Item(id="1")
+
+    if extra_route:
+        @app.delete("/items")
+        def delete_item():
+            return None
+
+    return app
+
+
+def write_schema(tmp_path, schema: dict) -> str:
+    path = tmp_path / "openapi.json"
+    path.write_text(json.dumps(schema))
+    return str(path)
+
+
+def test_matching_schema_is_loaded(tmp_path):
+    path = write_schema(tmp_path, build_schema(make_app()))
+    app = make_app()
+
+    assert load_prebuilt_schema(app, path)
+    assert app.openapi()[FINGERPRINT_KEY] == json.loads(open(path).read())[FINGERPRINT_KEY]
+
+
+def test_schema_built_before_a_route_change_is_ignored(tmp_path):
+    path = write_schema(tmp_path, build_schema(make_app()))
+    app = make_app(extra_route=True)
+
+    assert not load_prebuilt_schema(app, path)
+    assert "delete" in app.openapi()["paths"]["/items"]
+
+
+def test_schema_without_fingerprint_is_ignored(tmp_path):
+    app = make_app()
+    path = write_schema(tmp_path, app.openapi())
+
+    assert not load_prebuilt_schema(make_app(), path)
+
+
+def test_api_schema_fingerprint_is_stable():
+    from api.app import app
+    from api.openapi import schema_fingerprint
+
+    assert build_schema(app)[FINGERPRINT_KEY] == schema_fingerprint(app)
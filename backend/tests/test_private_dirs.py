@@ -0,0 +1,85 @@
+"""
+Répertoires privés (cache partagé shm, métriques multi-process)
+"""
+import os
+import runpy
+import stat
+from types import SimpleNamespace
+
+import pytest
+
+from api.private_dirs import default_private_dir, ensure_private_dir, ensure_private_file
+
+
+def test_directory_and_file_are_created_private(tmp_path):
+    directory = ensure_private_dir(str(tmp_path / "private"))
+    path = os.path.join(directory, "cache.sqlite3")
+    ensure_private_file(path)
+
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+
+def test_directory_writable_by_others_is_refused(tmp_path):
+    directory = tmp_path / "shared"
+    directory.mkdir()
+    directory.chmod(0o777)
+
+    with pytest.raises(PermissionError):
+        ensure_private_dir(str(directory))
+
+
+def test_symlinked_directory_is_refused(tmp_path):
+    target = tmp_path / "target"
+    target.mkdir(mode=0o700)
+    link = tmp_path / "link"
+    link.symlink_to(target)
+
+    with pytest.raises(PermissionError):
+        ensure_private_dir(str(link))
+
+
+@pytest.mark.skipif(os.getuid() != 0, reason="chown to another uid needs root")
+def test_directory_owned_by_another_user_is_refused(tmp_path):
+    directory = tmp_path / "foreign"
+    directory.mkdir(mode=0o700)
+    os.chown(directory, 12345, 12345)
+
+    with pytest.raises(PermissionError):
+        ensure_private_dir(str(directory))
+
+
+def test_default_directory_is_per_user_and_deployment():
+    path = default_private_dir("api-metrics")
+
+    assert os.path.basename(path).startswith(f"api-metrics-{os.getuid()}-")
+    assert path != default_private_dir("api-cache")
+
+
+def load_gunicorn_config(monkeypatch, multiproc_dir: str) -> dict:
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", multiproc_dir)
+    config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "gunicorn.conf.py")
+    return runpy.run_path(config_path)
+
+
+def test_gunicorn_start_clears_metrics_of_a_private_directory(tmp_path, monkeypatch):
+    directory = tmp_path / "metrics"
+    directory.mkdir(mode=0o700)
+    (directory / "counter_1.db").write_bytes(b"stale")
+    config = load_gunicorn_config(monkeypatch, str(directory))
+
+    config["on_starting"](SimpleNamespace())
+
+    assert os.listdir(directory) == []
+
+
+def test_gunicorn_start_refuses_a_directory_writable_by_others(tmp_path, monkeypatch):
+    directory = tmp_path / "metrics"
+    directory.mkdir()
+    directory.chmod(0o777)
+    (directory / "counter_1.db").write_bytes(b"planted")
+    config = load_gunicorn_config(monkeypatch, str(directory))
+
+    with pytest.raises(PermissionError):
+        config["on_starting"](SimpleNamespace())
+    assert os.listdir(directory) == ["counter_1.db"]
@@ -0,0 +1,102 @@
+"""
+Projections des requêtes sur user_profiles
+
+Chaque requête envoyée à PostgREST doit demander explicitement les colonnes
+du modèle construit à partir du résultat (jamais `select=*` ni de select
+implicite). Le paramètre est vérifié sur les requêtes reçues par le
+stand-in, ce que l'analyse statique de `python -m api.schemas check` ne
+peut pas faire pour les listes de colonnes construites dynamiquement.
+"""
+from urllib.parse import parse_qs, urlsplit
+
+from api.helpers import model_columns, readiness_probe
+from api.models import PublicProfile, UserProfile, UserRole
+from api.schemas import UserProfileSchema
+
+from conftest import OTHER_USER_ID, USER_ID
+
+PROFILE_PATHS = ("/rest/v1/user_profiles", "/rest/v1/rpc/update_user_profile")
+
+
+def _columns(model):
+    return set(model_columns(model, UserProfileSchema))
+
+
+def profile_requests(stub):
+    """(méthode, colonnes de `select` ou None) des requêtes sur user_profiles"""
+    # La sonde de disponibilité interroge PostgREST en tâche de fond, hors des routes
+    probe = urlsplit(readiness_probe._probe_urls()["postgrest"])
+    requests = []
+    for method, target, _ in stub.request_log:
+        url = urlsplit(target)
+        if url.path not in PROFILE_PATHS or (url.path, url.query) == (probe.path, probe.query):
+            continue
+        select = parse_qs(url.query).get("select")
+        requests.append((method, set(select[0].split(",")) if select else None))
+    return requests
+
+
+def assert_selects(stub, *models):
+    """Les lectures de user_profiles projettent exactement les colonnes des modèles attendus, chacun au moins une fois"""
+    requests = profile_requests(stub)
+    assert requests, "no user_profiles request reached the stub"
+    for method, columns in requests:
+        assert columns is not None, f"{method} request without select"
+        assert "*" not in columns
+    assert {frozenset(columns) for _, columns in requests} == {frozenset(_columns(model)) for model in models}
+
+
+def test_get_profile_selects_user_profile_columns(client, stub, auth_headers):
+    response = client.get("/api/user/profile", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert_selects(stub, UserProfile)
+
+
+def test_update_profile_selects_user_profile_columns(client, stub, auth_headers):
+    response = client.put("/api/user/profile", headers=auth_headers, json={"first_name": "Updated"})
+
+    assert response.status_code == 200
+    assert response.json()["data"]["first_name"] == "Updated"
+    assert_selects(stub, UserProfile)
+
+
+def test_bulk_profiles_select_public_columns(client, stub, auth_headers):
+    response = client.get(f"/api/user/profiles?ids={OTHER_USER_ID}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert set(response.json()[0]) == set(PublicProfile.model_fields)
+    assert_selects(stub, UserRole, PublicProfile)
+
+
+def test_bulk_profiles_for_admin_select_user_profile_columns(client, stub, auth_headers):
+    stub.profile_role = "admin"
+
+    response = client.get(f"/api/user/profiles?ids={USER_ID},{OTHER_USER_ID}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert [profile["id"] for profile in response.json()] == [USER_ID, OTHER_USER_ID]
+    assert set(response.json()[1]) == set(UserProfile.model_fields)
+    assert_selects(stub, UserProfile, UserRole)
+
+
+def test_admin_route_selects_role_only(client, stub, auth_headers):
+    response = client.get("/api/admin/users/export", headers=auth_headers)
+
+    assert response.status_code == 403
+    assert_selects(stub, UserRole)
+
+
+def test_import_upsert_does_not_read_back_rows(client, stub, auth_headers):
+    stub.profile_role = "admin"
+
+    response = client.post(
+        "/api/admin/users/import",
+        headers={**auth_headers, "Content-Type": "text/csv"},
+        content=b"email,first_name,last_name\nnew@example.com,New,User\n",
+    )
+
+    assert response.status_code == 200
+    assert '"status":"created"' in response.text
+    writes = [columns for method, columns in profile_requests(stub) if method == "POST"]
+    assert writes == [None]
@@ -0,0 +1,59 @@
+"""
+Cloisonnement des appels amont (run_upstream)
+"""
+import threading
+
+import anyio
+import pytest
+
+from api.config import settings
+from api.helpers import upstream
+from api.helpers.resilience import UpstreamUnavailable, _build_breaker, breakers
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def auth_bulkhead(monkeypatch):
+    """Cloison AUTH d'une place et délai court ; le disjoncteur est remis à neuf"""
+    limiter = anyio.CapacityLimiter(1)
+    monkeypatch.setitem(upstream._limiters, upstream.AUTH, limiter)
+    monkeypatch.setattr(settings, "AUTH_TIMEOUT", 0.1)
+    monkeypatch.setitem(breakers, upstream.AUTH, _build_breaker(upstream.AUTH))
+    return limiter
+
+
+async def test_timed_out_call_keeps_its_slot_until_the_thread_returns(auth_bulkhead):
+    release = threading.Event()
+    started = []
+
+    def slow_call():
+        release.wait(5)
+        return "slow"
+
+    def fast_call():
+        started.append("fast")
+        return "fast"
+
+    with pytest.raises(UpstreamUnavailable):
+        await upstream.run_auth("test.slow", slow_call)
+    # Le thread tourne encore : sa place n'est pas rendue
+    assert auth_bulkhead.borrowed_tokens == 1
+
+    # Un second appel attend la place, dépasse son délai et n'est jamais lancé
+    with pytest.raises(UpstreamUnavailable):
+        await upstream.run_auth("test.fast", fast_call)
+
+    release.set()
+    with anyio.fail_after(2):
+        while auth_bulkhead.borrowed_tokens:
+            await anyio.sleep(0.01)
+    assert started == []
+
+    assert await upstream.run_auth("test.fast", fast_call) == "fast"
+    assert started == ["fast"]
@@ -0,0 +1,35 @@
+"""
+Routes /api/user
+"""
+from conftest import USER_ID
+
+
+def auth_metadata_updates(stub):
+    """user_metadata envoyées à GoTrue (auth.admin.update_user_by_id), dans l'ordre"""
+    return [
+        body["user_metadata"]
+        for method, target, body in stub.request_log
+        if method == "PUT" and target.startswith(f"/auth/v1/admin/users/{USER_ID}")
+    ]
+
+
+def test_update_profile_derives_auth_full_name_from_updated_row(client, stub, auth_headers):
+    # Même token pour les deux mises à jour : ses métadonnées ne suivent pas la première
+    first = client.put("/api/user/profile", headers=auth_headers, json={"first_name": "Ada"})
+    second = client.put("/api/user/profile", headers=auth_headers, json={"last_name": "Lovelace"})
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()["data"]["full_name"] == "Ada Lovelace"
+    assert [metadata.get("full_name") for metadata in auth_metadata_updates(stub)] == ["Ada User", "Ada Lovelace"]
+
+
+def test_update_profile_keeps_explicit_full_name(client, stub, auth_headers):
+    response = client.put(
+        "/api/user/profile",
+        headers=auth_headers,
+        json={"first_name": "Ada", "full_name": "Countess of Lovelace"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["full_name"] == "Countess of Lovelace"
+    assert auth_metadata_updates(stub) == [{"first_name": "Ada", "full_name": "Countess of Lovelace"}]
@@ -5,6 +5,8 @@ import { ApiException, QueryParams } from '@/types/api';
 export class ApiService {
   private baseUrl: string;
   private apiPrefix: string;
+  // Renouvellement en cours, partagé par les requêtes qui reçoivent un 401 en même temps
+  private refreshPromise: Promise<boolean> | null = null;
 
   constructor() {
     this.baseUrl = config.apiUrl;
@@ -32,6 +34,53 @@ export class ApiService {
   private removeStoredToken(): void {
     if (typeof window === 'undefined') return;
     localStorage.removeItem('access_token');
+    localStorage.removeItem('refresh_token');
+  }
+
+  private getStoredRefreshToken(): string | null {
+    if (typeof window === 'undefined') return null;
+    return localStorage.getItem('refresh_token');
+  }
+
+  private setStoredRefreshToken(token: string): void {
+    if (typeof window === 'undefined') return;
+    localStorage.setItem('refresh_token', token);
+  }
+
+  // Échange le refresh token contre une nouvelle session (sans mot de passe)
+  private async refreshSession(): Promise<boolean> {
+    const refreshToken = this.getStoredRefreshToken();
+    if (!refreshToken) return false;
+
+    const response = await fetch(this.buildUrl('/auth/refresh'), {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    });
+    if (!response.ok) {
+      if (response.status === 401) this.removeStoredToken();
+      return false;
+    }
+
+    const session = await response.json() as { access_token: string; refresh_token?: string };
+    this.setStoredToken(session.access_token);
+    if (session.refresh_token) this.setStoredRefreshToken(session.refresh_token);
+    return true;
+  }
+
+  // Exécute la requête ; sur 401, renouvelle la session une fois puis rejoue la requête
+  private async request(endpoint: string, init: RequestInit, params?: QueryParams): Promise<Response> {
+    const url = this.buildUrl(endpoint, params);
+    const response = await fetch(url, { ...init, headers: this.getAuthHeaders() });
+    if (response.status !== 401 || endpoint.startsWith('/auth/') || !this.getStoredRefreshToken()) {
+      return response;
+    }
+
+    this.refreshPromise ??= this.refreshSession().finally(() => {
+      this.refreshPromise = null;
+    });
+    if (!(await this.refreshPromise)) return response;
+    return fetch(url, { ...init, headers: this.getAuthHeaders() });
   }
 
   private buildUrl(endpoint: string, params?: QueryParams): string {
@@ -71,22 +120,14 @@ export class ApiService {
   }
 
   async get<T>(endpoint: string, params?: QueryParams): Promise<T> {
-    const url = this.buildUrl(endpoint, params);
-    
-    const response = await fetch(url, {
-      method: 'GET',
-      headers: this.getAuthHeaders(),
-    });
+    const response = await this.request(endpoint, { method: 'GET' }, params);
 
     return this.handleResponse<T>(response);
   }
 
   async post<T>(endpoint: string, data?: unknown): Promise<T> {
-    const url = this.buildUrl(endpoint);
-    
-    const response = await fetch(url, {
+    const response = await this.request(endpoint, {
       method: 'POST',
-      headers: this.getAuthHeaders(),
       body: data ? JSON.stringify(data) : undefined,
     });
 
@@ -94,11 +135,8 @@ export class ApiService {
   }
 
   async put<T>(endpoint: string, data?: unknown): Promise<T> {
-    const url = this.buildUrl(endpoint);
-    
-    const response = await fetch(url, {
+    const response = await this.request(endpoint, {
       method: 'PUT',
-      headers: this.getAuthHeaders(),
       body: data ? JSON.stringify(data) : undefined,
     });
 
@@ -106,12 +144,7 @@ export class ApiService {
   }
 
   async delete<T>(endpoint: string): Promise<T> {
-    const url = this.buildUrl(endpoint);
-    
-    const response = await fetch(url, {
-      method: 'DELETE',
-      headers: this.getAuthHeaders(),
-    });
+    const response = await this.request(endpoint, { method: 'DELETE' });
 
     return this.handleResponse<T>(response);
   }
@@ -125,6 +158,10 @@ export class ApiService {
     this.setStoredToken(token);
   }
 
+  setRefreshToken(token: string): void {
+    this.setStoredRefreshToken(token);
+  }
+
   clearToken(): void {
     this.removeStoredToken();
   }
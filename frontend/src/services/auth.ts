@@ -18,6 +18,9 @@ export class AuthService {
     if (response.access_token) {
       apiService.setToken(response.access_token);
     }
+    if (response.refresh_token) {
+      apiService.setRefreshToken(response.refresh_token);
+    }
     
     return response;
   }
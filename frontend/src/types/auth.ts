@@ -42,6 +42,9 @@ export interface ProfileUpdateData {
 
 export interface AuthResponse {
   access_token: string;
+  refresh_token?: string;
+  expires_in?: number;
+  expires_at?: number;
   user: User;
 }
 